@@ -0,0 +1,204 @@
+"""Per-node-type dispatch cost of the tree-walking interpreter.
+
+Evaluates one small node of every statement and expression type many times
+through ``Interpreter._execute`` / ``_evaluate`` and prints the mean cost per
+visit, both for the handler tables ("table") and for ``MatchInterpreter``,
+the ``match`` over node types the tables replaced ("match"). Children are
+literals or variables, so the numbers are dominated by dispatch; quickening
+is turned off for the measured nodes so every visit takes the generic path.
+
+    python -m benchmarks.dispatch [--number N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import timeit
+from collections.abc import Callable
+from functools import partial
+
+from rift import ast_nodes as ast
+from rift.callable import RiftClass
+from rift.environment import Environment
+from rift.instance import RiftInstance
+from rift.interpreter import Interpreter
+from rift.parser import Parser
+from rift.resolver import Resolver
+from rift.scanner import Scanner
+
+SETUP = """
+let x = nil;
+class A { m() { return nil; } }
+class B < A {
+  init() { this.field = nil; }
+  sup() { return super.m; }
+  self() { return this; }
+  ret() { return nil; }
+}
+let b = B();
+fn f() { return nil; }
+"""
+
+# (label, source of one global statement; the measured node is the statement
+# itself or, for expression statements, its expression)
+GLOBAL_NODES = [
+    ("LiteralExpr", "nil;"),
+    ("GroupingExpr", "(nil);"),
+    ("UnaryExpr", "!true;"),
+    ("BinaryExpr", "true == true;"),
+    ("VariableExpr", "x;"),
+    ("AssignExpr", "x = nil;"),
+    ("LogicalExpr", "true and nil;"),
+    ("CallExpr", "f();"),
+    ("GetExpr", "b.field;"),
+    ("SetExpr", "b.field = nil;"),
+    ("ExpressionStmt", "nil;"),
+    ("LetStmt", "let y = nil;"),
+    ("BlockStmt", "{}"),
+    ("IfStmt", "if (false) nil;"),
+    ("WhileStmt", "while (false) nil;"),
+    ("FunctionStmt", "fn g() {}"),
+    ("ClassStmt", "class C {}"),
+]
+
+# (label, method of B whose single return statement holds the node)
+METHOD_NODES = [
+    ("ThisExpr", "self"),
+    ("SuperExpr", "sup"),
+    ("ReturnStmt", "ret"),
+]
+
+
+class MatchInterpreter(Interpreter):
+    """Dispatch by one ``match`` per visit, cases tried in order.
+
+    It calls the same handlers as the tables, so only the dispatch differs.
+    Quickened and fused nodes are not handled: the measured nodes are generic.
+    """
+
+    def _execute(self, stmt: ast.Stmt) -> object:
+        match stmt:
+            case ast.ExpressionStmt():
+                return self._expression_stmt(stmt)
+            case ast.PrintStmt():
+                return self._print_stmt(stmt)
+            case ast.LetStmt():
+                return self._let_stmt(stmt)
+            case ast.BlockStmt():
+                return self._block_stmt(stmt)
+            case ast.IfStmt():
+                return self._if_stmt(stmt)
+            case ast.WhileStmt():
+                return self._while_stmt(stmt)
+            case ast.FunctionStmt():
+                return self._function_stmt(stmt)
+            case ast.ReturnStmt():
+                return self._return_stmt(stmt)
+            case ast.ClassStmt():
+                return self._class_stmt(stmt)
+        raise TypeError(stmt)
+
+    def _evaluate(self, expr: ast.Expr) -> object:
+        match expr:
+            case ast.LiteralExpr():
+                return self._literal_expr(expr)
+            case ast.GroupingExpr():
+                return self._grouping_expr(expr)
+            case ast.UnaryExpr():
+                return self._unary_expr(expr)
+            case ast.BinaryExpr():
+                return self._binary_expr(expr)
+            case ast.VariableExpr():
+                return self._variable_expr(expr)
+            case ast.AssignExpr():
+                return self._assign_expr(expr)
+            case ast.LogicalExpr():
+                return self._logical_expr(expr)
+            case ast.CallExpr():
+                return self._call_expr(expr)
+            case ast.GetExpr():
+                return self._get_expr(expr)
+            case ast.SetExpr():
+                return self._set_expr(expr)
+            case ast.ThisExpr():
+                return self._this_expr(expr)
+            case ast.SuperExpr():
+                return self._super_expr(expr)
+        raise TypeError(expr)
+
+
+def _parse(interpreter: Interpreter, source: str) -> list[ast.Stmt]:
+    scanner = Scanner(source)
+    scanner.scan_tokens()
+    statements = Parser(scanner.tokens).parse()
+    resolver = Resolver(interpreter)
+    resolver.resolve(statements)
+    assert not resolver.errors, resolver.errors
+    return statements
+
+
+def _generic(node: object) -> None:
+    # keep quickening from swapping in a specialized class mid-measurement
+    node.__dict__["unstable"] = True
+
+
+def _visits(interpreter: Interpreter) -> list[tuple[str, Callable[[], object]]]:
+    setup = _parse(interpreter, SETUP)
+    interpreter.interpret(setup)
+    visits: list[tuple[str, Callable[[], object]]] = []
+    for label, source in GLOBAL_NODES:
+        (stmt,) = _parse(interpreter, source)
+        if label.endswith("Expr"):
+            assert isinstance(stmt, ast.ExpressionStmt)
+            expr = stmt.expression
+            _generic(expr)
+            visits.append((label, partial(interpreter._evaluate, expr)))
+        else:
+            visits.append((label, partial(interpreter._execute, stmt)))
+    b_class = next(s for s in setup if isinstance(s, ast.ClassStmt) and s.name.lexeme == "B")
+    methods = {m.name.lexeme: m for m in b_class.methods}
+    instance = interpreter.globals.cells["b"].value
+    klass = interpreter.globals.cells["B"].value
+    assert isinstance(klass, RiftClass)
+    for label, method_name in METHOD_NODES:
+        (ret,) = methods[method_name].body
+        assert isinstance(ret, ast.ReturnStmt) and ret.value is not None
+        # the environment the method body runs in: params -> this -> super
+        method = klass.find_method(method_name)
+        assert method is not None and isinstance(instance, RiftInstance)
+        bound = method.bind(instance)
+        env = Environment(bound.closure)
+        if label.endswith("Expr"):
+            expr = ret.value
+            _generic(expr)
+            visits.append((label, partial(_in, interpreter, env, expr)))
+        else:
+            visits.append((label, partial(interpreter._execute, ret)))
+    return visits
+
+
+def _in(interpreter: Interpreter, env: Environment, expr: ast.Expr) -> object:
+    interpreter._environment = env
+    return interpreter._evaluate(expr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=200_000, help="visits per node type")
+    parser.add_argument("--repeat", type=int, default=5, help="runs; the fastest counts")
+    args = parser.parse_args()
+
+    results: dict[str, list[float]] = {}
+    for engine in (MatchInterpreter, Interpreter):
+        interpreter = engine(jit=False, tiering=False)
+        for label, visit in _visits(interpreter):
+            best = min(timeit.repeat(visit, number=args.number, repeat=args.repeat))
+            interpreter._environment = interpreter.globals
+            results.setdefault(label, []).append(best / args.number * 1e9)
+    print(f"{'':16} {'match':>9} {'table':>9}")
+    for label, (before, after) in results.items():
+        print(f"{label:16} {before:6.0f} ns {after:6.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
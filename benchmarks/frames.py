@@ -0,0 +1,76 @@
+"""Call environments allocated and reused on recursive ``fib_rec(25)``.
+
+Runs the function with the engines that give calls an ``Environment`` (or the
+ones given), once recycling call environments through the interpreter's
+``frame_pool`` and once with the function's frame marked as escaping, so
+every call allocates. Prints the fastest of several interleaved timings and
+how many environments each run allocated.
+
+    python -m benchmarks.frames [--engine NAME ...]
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import time
+
+from rift import ast_nodes as ast
+from rift.__main__ import create_interpreter
+from rift.interpreter import Interpreter
+from rift.parser import Parser
+from rift.resolver import Resolver
+from rift.scanner import Scanner
+
+SOURCE = """
+fn fib_rec(n) { if (n < 2) return n; return fib_rec(n - 1) + fib_rec(n - 2); }
+print(fib_rec(25));
+"""
+
+# the engines whose calls run in an Environment
+ENGINES = ["tree", "closure", "stackless"]
+
+
+def _once(engine: str, pooled: bool) -> tuple[float, Interpreter]:
+    interpreter = create_interpreter(engine)
+    scanner = Scanner(SOURCE)
+    scanner.scan_tokens()
+    statements = Parser(scanner.tokens).parse()
+    Resolver(interpreter).resolve(statements)
+    fib = statements[0]
+    assert isinstance(fib, ast.FunctionStmt) and not fib.frame_escapes
+    fib.frame_escapes = not pooled
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        interpreter.interpret(statements)
+    return time.perf_counter() - started, interpreter
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--engine", action="append", choices=ENGINES, help="engine(s)")
+    parser.add_argument("--repeat", type=int, default=5, help="timings; the fastest counts")
+    args = parser.parse_args()
+
+    print(f"{'engine':10} {'allocating':>10} {'pooled':>10} {'change':>8} {'allocated':>20}")
+    for engine in args.engine or ENGINES:
+        best = {True: float("inf"), False: float("inf")}
+        pool = None
+        # alternate the two so drift on a busy machine hits both alike
+        for _ in range(args.repeat):
+            for pooled in (False, True):
+                elapsed, interpreter = _once(engine, pooled)
+                best[pooled] = min(best[pooled], elapsed)
+                if pooled:
+                    pool = interpreter.frame_pool
+        assert pool is not None
+        calls = pool.hits + pool.misses
+        print(
+            f"{engine:10} {best[False] * 1e3:8.1f}ms {best[True] * 1e3:8.1f}ms "
+            f"{(best[True] / best[False] - 1) * 100:+7.1f}% {pool.misses:>9} of {calls:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Cost of fuel metering on examples/fibonacci.rf.
+
+Runs the example with every engine (or the ones given) without a budget and
+with a budget too large to run out, and compares both with the same engine
+on a tree without any metering: ``--baseline``, by default the commit before
+metering was added. Unmetered runs still pay the charge (they count down
+from infinity), so only the baseline shows what metering costs. Each run
+is a fresh interpreter in a subprocess of its own tree; the three are
+alternated so drift on a busy machine hits all alike, and the fastest of
+the timings counts.
+
+    python -m benchmarks.fuel [--engine NAME ...] [--baseline REV]
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import subprocess
+import sys
+import tarfile
+import tempfile
+from pathlib import Path
+
+from rift.__main__ import ENGINES
+
+ROOT = Path(__file__).resolve().parent.parent
+EXAMPLE = ROOT / "examples" / "fibonacci.rf"
+BUDGET = 10**12
+
+# times `number` runs in the tree on sys.path; argv: engine, number, fuel or ""
+WORKER = """
+import contextlib, io, sys, timeit
+from rift.__main__ import create_interpreter, run
+
+engine, number, fuel = sys.argv[1], int(sys.argv[2]), sys.argv[3]
+source = sys.stdin.read()
+kwargs = {"fuel": int(fuel)} if fuel else {}
+
+def once():
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert run(source, create_interpreter(engine, **kwargs))
+
+print(timeit.timeit(once, number=number) / number)
+"""
+
+
+def _before_metering() -> str:
+    """The commit before the one that added OutOfFuelError."""
+    log = subprocess.run(
+        ["git", "log", "--reverse", "--format=%H", "-S", "OutOfFuelError", "--", "rift/errors.py"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return log.stdout.split()[0] + "^"
+
+
+def _export(rev: str, into: Path) -> None:
+    archive = subprocess.run(
+        ["git", "archive", "--format=tar", rev, "rift"], cwd=ROOT, capture_output=True, check=True
+    )
+    with tarfile.open(fileobj=io.BytesIO(archive.stdout)) as tar:
+        tar.extractall(into)
+
+
+def _time(tree: Path, engine: str, number: int, fuel: int | None, source: str) -> float:
+    worker = subprocess.run(
+        [sys.executable, "-c", WORKER, engine, str(number), "" if fuel is None else str(fuel)],
+        cwd=tree,
+        input=source,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(worker.stdout)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--engine", action="append", choices=sorted(ENGINES), help="engine(s)")
+    parser.add_argument("--baseline", help="revision without metering (default: the last one)")
+    parser.add_argument("--number", type=int, default=50, help="runs per timing")
+    parser.add_argument("--repeat", type=int, default=9, help="timings; the fastest counts")
+    args = parser.parse_args()
+
+    source = EXAMPLE.read_text(encoding="utf-8")
+    baseline = args.baseline or _before_metering()
+    print(f"baseline: {baseline}")
+    print(f"{'engine':10} {'baseline':>10} {'unmetered':>17} {'metered':>17}")
+    with tempfile.TemporaryDirectory() as tmp:
+        _export(baseline, Path(tmp))
+        runs = [(Path(tmp), None), (ROOT, None), (ROOT, BUDGET)]
+        for engine in args.engine or list(ENGINES):
+            best = [float("inf")] * len(runs)
+            for _ in range(args.repeat):
+                for i, (tree, fuel) in enumerate(runs):
+                    best[i] = min(best[i], _time(tree, engine, args.number, fuel, source))
+            base, plain, metered = best
+            print(
+                f"{engine:10} {base * 1e3:8.2f}ms "
+                f"{plain * 1e3:8.2f}ms {(plain / base - 1) * 100:+6.1f}% "
+                f"{metered * 1e3:8.2f}ms {(metered / base - 1) * 100:+6.1f}%"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Startup cost of a large generated script, eager vs lazy parsing.
+
+Generates a script with many helper functions of which only a few are
+called, then times scan + parse + resolve + run with and without
+``--lazy`` parsing of function bodies.
+
+    python -m benchmarks.startup [--functions N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import timeit
+
+from rift.__main__ import run
+from rift.interpreter import Interpreter
+
+HELPER = """
+fn helper{i}(a, b) {{
+  let total = 0;
+  let i = 0;
+  while (i < a) {{
+    if (i % 2 == 0) total = total + b * i; else total = total - i;
+    i = i + 1;
+  }}
+  return total + {i};
+}}
+"""
+
+
+def script(functions: int, called: int) -> str:
+    helpers = "".join(HELPER.format(i=i) for i in range(functions))
+    calls = "".join(f"print(helper{i}(10, 2));\n" for i in range(called))
+    return helpers + calls
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--functions", type=int, default=500, help="helpers in the script")
+    parser.add_argument("--called", type=int, default=5, help="helpers actually called")
+    parser.add_argument("--repeat", type=int, default=5, help="runs; the fastest counts")
+    args = parser.parse_args()
+
+    source = script(args.functions, args.called)
+    for label, lazy in (("eager", False), ("lazy", True)):
+
+        def once(lazy: bool = lazy) -> None:
+            with contextlib.redirect_stdout(io.StringIO()):
+                assert run(source, Interpreter(), lazy=lazy)
+
+        best = min(timeit.repeat(once, number=1, repeat=args.repeat))
+        print(f"{label:6} {best * 1e3:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
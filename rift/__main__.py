@@ -2,20 +2,75 @@
 
 from __future__ import annotations
 
+import argparse
 import sys
+from collections.abc import Callable
 from pathlib import Path
 
+from rift import inline_cache
+from rift.closure_compiler import ClosureInterpreter
 from rift.interpreter import Interpreter
 from rift.parser import Parser
 from rift.resolver import Resolver
 from rift.scanner import Scanner
+from rift.stackless import StacklessInterpreter
+from rift.transpile import PyInterpreter
+from rift.transpile import main as transpile_main
 from rift.errors import RiftRuntimeError
-
-
-def run(source: str, interpreter: Interpreter | None = None) -> bool:
-    """Run source code. Returns False if any scan/parse/resolve error occurred."""
+from rift.vm import VM
+
+# execution engines selectable with --engine; "tree" is the reference
+ENGINES: dict[str, type[Interpreter]] = {
+    "tree": Interpreter,
+    "closure": ClosureInterpreter,
+    "vm": VM,
+    "py": PyInterpreter,
+    "stackless": StacklessInterpreter,
+}
+DEFAULT_ENGINE = "tree"
+# engines whose call depth is bounded by --max-depth instead of the Python stack
+DEPTH_LIMITED_ENGINES: dict[str, Callable[[int], Interpreter]] = {
+    "stackless": StacklessInterpreter,
+    "vm": VM,
+}
+
+
+def create_interpreter(
+    engine: str | None = None,
+    max_depth: int | None = None,
+    tco: bool = True,
+    fuel: int | None = None,
+    ic_stats: bool = False,
+) -> Interpreter:
+    """Instantiate an engine, applying --max-depth where the engine supports it."""
+    name = engine or DEFAULT_ENGINE
+    if max_depth is not None and name in DEPTH_LIMITED_ENGINES:
+        interpreter = DEPTH_LIMITED_ENGINES[name](max_depth)
+    else:
+        interpreter = ENGINES[name]()
+    if not tco:
+        interpreter.tco = False
+    if fuel is not None:
+        interpreter.fuel = fuel
+    if ic_stats:
+        interpreter.inline_caches = []
+    return interpreter
+
+
+def run(
+    source: str,
+    interpreter: Interpreter | None = None,
+    engine: str | None = None,
+    lazy: bool = False,
+) -> bool:
+    """Run source code. Returns False if any scan/parse/resolve error occurred.
+
+    With ``lazy``, function bodies are only syntax-checked up front and parsed
+    when first called; resolve errors inside them are then reported at that
+    point instead of before the program runs.
+    """
     if interpreter is None:
-        interpreter = Interpreter()
+        interpreter = create_interpreter(engine)
 
     scanner = Scanner(source)
     scanner.scan_tokens()
@@ -24,7 +79,7 @@ def run(source: str, interpreter: Interpreter | None = None) -> bool:
             print(scan_err, file=sys.stderr)
         return False
 
-    parser = Parser(scanner.tokens)
+    parser = Parser(scanner.tokens, lazy)
     try:
         statements = parser.parse()
     except Exception:
@@ -51,20 +106,38 @@ def run(source: str, interpreter: Interpreter | None = None) -> bool:
     return True
 
 
-def run_file(path: str) -> None:
+def run_file(
+    path: str,
+    engine: str | None = None,
+    max_depth: int | None = None,
+    tco: bool = True,
+    lazy: bool = False,
+    fuel: int | None = None,
+    ic_stats: bool = False,
+) -> None:
     """Read and run a .rf file."""
     p = Path(path)
     if not p.exists():
         print(f"rift: file not found: {path}", file=sys.stderr)
         sys.exit(1)
     source = p.read_text(encoding="utf-8")
-    ok = run(source)
+    interpreter = create_interpreter(engine, max_depth, tco, fuel, ic_stats)
+    ok = run(source, interpreter, lazy=lazy)
+    if interpreter.inline_caches is not None:
+        print(inline_cache.report(interpreter.inline_caches), file=sys.stderr)
     sys.exit(0 if ok else 1)
 
 
-def run_prompt() -> None:
+def run_prompt(
+    engine: str | None = None,
+    max_depth: int | None = None,
+    tco: bool = True,
+    lazy: bool = False,
+    fuel: int | None = None,
+    ic_stats: bool = False,
+) -> None:
     """Interactive REPL."""
-    interpreter = Interpreter()
+    interpreter = create_interpreter(engine, max_depth, tco, fuel, ic_stats)
     print("Rift 0.1.0 - type exit or quit to leave")
     buf: list[str] = []
     while True:
@@ -86,7 +159,7 @@ def run_prompt() -> None:
         scanner.scan_tokens()
         if scanner.errors:
             continue
-        parser = Parser(scanner.tokens)
+        parser = Parser(scanner.tokens, lazy)
         try:
             statements = parser.parse()
         except Exception:
@@ -107,17 +180,57 @@ def run_prompt() -> None:
             interpreter.interpret(statements)
         except RiftRuntimeError as e:
             print(e, file=sys.stderr)
+    if interpreter.inline_caches is not None:
+        print(inline_cache.report(interpreter.inline_caches), file=sys.stderr)
 
 
 def main() -> None:
-    argv = sys.argv[1:]
-    if len(argv) == 0:
-        run_prompt()
-    elif len(argv) == 1:
-        run_file(argv[0])
+    if sys.argv[1:2] == ["transpile"]:
+        sys.exit(transpile_main(sys.argv[2:]))
+    parser = argparse.ArgumentParser(prog="rift", description="Run a Rift script or start a REPL.")
+    parser.add_argument("script", nargs="?", help="path to a .rf file")
+    parser.add_argument(
+        "--engine",
+        choices=sorted(ENGINES),
+        default=DEFAULT_ENGINE,
+        help=f"execution engine (default: {DEFAULT_ENGINE})",
+    )
+    parser.add_argument(
+        "--max-depth",
+        type=int,
+        help=f"maximum Rift call depth ({', '.join(sorted(DEPTH_LIMITED_ENGINES))} engines only)",
+    )
+    parser.add_argument(
+        "--lazy",
+        action="store_true",
+        help="parse function bodies on first call (resolve errors in them surface late)",
+    )
+    parser.add_argument(
+        "--fuel",
+        type=int,
+        help="stop with a runtime error after this many loop iterations and calls",
+    )
+    parser.add_argument(
+        "--ic-stats",
+        action="store_true",
+        help="report the hit rate of every property inline cache on exit (tree, closure, "
+        "stackless engines)",
+    )
+    parser.add_argument(
+        "--no-tco",
+        dest="tco",
+        action="store_false",
+        help="run `return f(...)` as a nested call instead of a proper tail call",
+    )
+    args = parser.parse_args()
+    if args.max_depth is not None and args.engine not in DEPTH_LIMITED_ENGINES:
+        parser.error(f"--max-depth is not supported by the {args.engine} engine")
+    if args.script is None:
+        run_prompt(args.engine, args.max_depth, args.tco, args.lazy, args.fuel, args.ic_stats)
     else:
-        print("usage: rift [script.rf]", file=sys.stderr)
-        sys.exit(1)
+        run_file(
+            args.script, args.engine, args.max_depth, args.tco, args.lazy, args.fuel, args.ic_stats
+        )
 
 
 if __name__ == "__main__":
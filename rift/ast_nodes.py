@@ -1,14 +1,29 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from rift.jit import CompiledLoop
+    from rift.tiering import CompiledBody, GlobalCell
     from rift.tokens import Token
 
 
 # -- expressions --
 
+@dataclass(kw_only=True)
+class Resolved:
+    """A name reference; the resolver records where the name lives.
+
+    A local is ``depth`` scopes out at ``slot``; a global (``depth`` -1) is
+    read through ``cell``.
+    """
+
+    depth: int = field(default=-1, compare=False, repr=False)
+    slot: int = field(default=0, compare=False, repr=False)
+    cell: GlobalCell | None = field(default=None, compare=False, repr=False)
+
+
 @dataclass
 class BinaryExpr:
     left: Expr
@@ -33,12 +48,12 @@ class GroupingExpr:
 
 
 @dataclass
-class VariableExpr:
+class VariableExpr(Resolved):
     name: Token
 
 
 @dataclass
-class AssignExpr:
+class AssignExpr(Resolved):
     name: Token
     value: Expr
 
@@ -71,12 +86,12 @@ class SetExpr:
 
 
 @dataclass
-class ThisExpr:
+class ThisExpr(Resolved):
     keyword: Token
 
 
 @dataclass
-class SuperExpr:
+class SuperExpr(Resolved):
     keyword: Token
     method: Token
 
@@ -99,6 +114,17 @@ Expr = (
 
 # -- statements --
 
+@dataclass(kw_only=True)
+class Declaration:
+    """A statement that binds a name.
+
+    The value goes to ``slot`` of the environment the statement runs in; with
+    ``slot`` -1 it is a global.
+    """
+
+    slot: int = field(default=-1, compare=False, repr=False)
+
+
 @dataclass
 class ExpressionStmt:
     expression: Expr
@@ -110,7 +136,7 @@ class PrintStmt:
 
 
 @dataclass
-class LetStmt:
+class LetStmt(Declaration):
     name: Token
     initializer: Expr | None
 
@@ -118,6 +144,14 @@ class LetStmt:
 @dataclass
 class BlockStmt:
     statements: list[Stmt]
+    # slots of the environment the block runs in, or None if it needs none:
+    # the resolver folds blocks whose variables no closure captures into the
+    # enclosing frame
+    scope_size: int | None = field(default=None, kw_only=True, compare=False, repr=False)
+    # slots of a folded block's variables in an environment some closure may
+    # keep: engines clear them when the block exits, so the closure does not
+    # keep their values too
+    clear_on_exit: range | None = field(default=None, kw_only=True, compare=False, repr=False)
 
 
 @dataclass
@@ -131,13 +165,25 @@ class IfStmt:
 class WhileStmt:
     condition: Expr
     body: Stmt
+    keyword: Token  # 'while', or 'for' when desugared
+    # the loop JIT's state: iterations run so far and, once the loop got
+    # hot, its compiled form (None if it could not be compiled)
+    back_edges: int = field(default=0, kw_only=True, compare=False, repr=False)
+    compiled: CompiledLoop | None = field(default=None, kw_only=True, compare=False, repr=False)
 
 
 @dataclass
-class FunctionStmt:
+class FunctionStmt(Declaration):
     name: Token
     params: list[Token]
     body: list[Stmt]
+    # slots of a call's environment: the parameters, then the body's locals
+    frame_size: int = field(default=0, kw_only=True, compare=False, repr=False)
+    # whether a function or class declared in the body may keep that
+    # environment alive after the call returns
+    frame_escapes: bool = field(default=True, kw_only=True, compare=False, repr=False)
+    # the body compiled once the function got hot, shared by all its closures
+    compiled: CompiledBody | None = field(default=None, kw_only=True, compare=False, repr=False)
 
 
 @dataclass
@@ -147,7 +193,7 @@ class ReturnStmt:
 
 
 @dataclass
-class ClassStmt:
+class ClassStmt(Declaration):
     name: Token
     superclass: VariableExpr | None
     methods: list[FunctionStmt]
@@ -3,9 +3,13 @@ from __future__ import annotations
 from typing import TYPE_CHECKING, Protocol, Callable
 
 from rift.environment import Environment
-from rift.errors import ReturnException
+from rift.completion import NORMAL, TailCall
+from rift.errors import OutOfFuelError
+from rift.instance import Shape
+from rift.tiering import HOT_FUNCTION, FunctionProfile
 
 if TYPE_CHECKING:
+    from rift.environment import EnvironmentPool
     from rift.interpreter import Interpreter
     from rift.instance import RiftInstance
     from rift import ast_nodes as ast
@@ -22,33 +26,101 @@ class RiftFunction:
         declaration: ast.FunctionStmt,
         closure: Environment,
         is_initializer: bool = False,
+        profile: FunctionProfile | None = None,
     ) -> None:
         self.declaration = declaration
         self.closure = closure
         self.is_initializer = is_initializer
+        self.profile = profile if profile is not None else FunctionProfile()
 
-    def call(self, interpreter: Interpreter, arguments: list[object]) -> object:
-        env = Environment(self.closure)
-        for param, arg in zip(self.declaration.params, arguments):
-            env.define(param.lexeme, arg)
-        try:
-            interpreter._execute_block(self.declaration.body, env)
-        except ReturnException as ret:
+    def call(
+        self,
+        interpreter: Interpreter,
+        arguments: list[object],
+        this: RiftInstance | None = None,
+    ) -> object:
+        """Run the function with ``arguments`` as the start of its frame.
+
+        Given ``this``, it runs as a method of that instance: ``bind(this).call``
+        without the bound copy. The ``this`` scope comes from the frame pool
+        when the frame cannot escape, since then neither can the scope.
+        The body runs from this one Python frame, tail calls included, so a
+        Rift call nests as few Python frames as possible.
+        """
+        function = self
+        closure = self.closure
+        scope_pool = None
+        if this is not None:
+            scope_pool = None if self.declaration.frame_escapes else interpreter.frame_pool
+            if scope_pool is None:
+                closure = Environment(closure, [this])
+            else:
+                closure = scope_pool.acquire(closure, [this])
+        scope = closure
+        while True:
+            interpreter.fuel -= 1
+            if interpreter.fuel < 0:
+                raise OutOfFuelError(function.declaration.name)
+            declaration = function.declaration
+            pool = None if declaration.frame_escapes else interpreter.frame_pool
+            env = function.frame(arguments, pool, closure)
+            profile = function.profile
+            profile.calls += 1
+            tier = profile.tier
+            if tier is not None and not tier.valid:
+                # deoptimized: back to the tree-walker until hot again
+                tier = profile.tier = None
+                profile.calls = 1
+            if tier is None and profile.calls >= HOT_FUNCTION and interpreter._tiering is not None:
+                tier = profile.tier = interpreter._tiering.compile(declaration)
+            if tier is not None:
+                completion = tier.body(env)
+            else:
+                completion = interpreter._execute_block(declaration.body, env)
+            if pool is not None:
+                pool.release(env)
             # init always returns 'this'
-            if self.is_initializer:
-                return self.closure.get_at(0, "this")
-            return ret.value
-        if self.is_initializer:
-            return self.closure.get_at(0, "this")
-        return None
+            if function.is_initializer:
+                result = closure.slots[0]
+                break
+            if type(completion) is not TailCall:
+                result = None if completion is NORMAL else completion
+                break
+            # the tail call replaces this activation instead of nesting
+            function, arguments = completion.function, completion.arguments
+            closure = function.closure
+        if scope_pool is not None:
+            scope_pool.release(scope)
+        return result
 
     def arity(self) -> int:
         return len(self.declaration.params)
 
+    def frame(
+        self,
+        arguments: list[object],
+        pool: EnvironmentPool | None = None,
+        closure: Environment | None = None,
+    ) -> Environment:
+        """The environment of one call, taking ownership of ``arguments``.
+
+        It comes from ``pool`` when nothing can keep it past the call; the
+        caller then hands it back with ``pool.release``. ``closure`` replaces
+        the function's own, as a method's ``this`` scope does.
+        """
+        # the parameters are the first slots (arity was checked), the body's
+        # other locals follow
+        extra = self.declaration.frame_size - len(arguments)
+        if extra:
+            arguments.extend([None] * extra)
+        enclosing = self.closure if closure is None else closure
+        if pool is None or self.declaration.frame_escapes:
+            return Environment(enclosing, arguments)
+        return pool.acquire(enclosing, arguments)
+
     def bind(self, instance: RiftInstance) -> RiftFunction:
-        env = Environment(self.closure)
-        env.define("this", instance)
-        return RiftFunction(self.declaration, env, self.is_initializer)
+        env = Environment(self.closure, [instance])
+        return RiftFunction(self.declaration, env, self.is_initializer, self.profile)
 
     def __repr__(self) -> str:
         return f"<fn {self.declaration.name.lexeme}>"
@@ -63,29 +135,29 @@ class RiftClass:
     ) -> None:
         self.name = name
         self.superclass = superclass
-        self.methods = methods
+        # every method, inherited ones included, as the VM's INHERIT copies
+        # them: classes never change once created
+        self.methods: dict[str, RiftFunction] = (
+            methods if superclass is None else {**superclass.methods, **methods}
+        )
+        self.initializer = self.methods.get("init")
+        self._arity = 0 if self.initializer is None else self.initializer.arity()
+        # root of the field layouts of this class's instances
+        self.shape: Shape = Shape()
 
     def call(self, interpreter: Interpreter, arguments: list[object]) -> object:
         from rift.instance import RiftInstance
 
         instance = RiftInstance(self)
-        initializer = self.find_method("init")
-        if initializer is not None:
-            initializer.bind(instance).call(interpreter, arguments)
+        if self.initializer is not None:
+            self.initializer.call(interpreter, arguments, instance)
         return instance
 
     def arity(self) -> int:
-        initializer = self.find_method("init")
-        if initializer is not None:
-            return initializer.arity()
-        return 0
+        return self._arity
 
     def find_method(self, name: str) -> RiftFunction | None:
-        if name in self.methods:
-            return self.methods[name]
-        if self.superclass is not None:
-            return self.superclass.find_method(name)
-        return None
+        return self.methods.get(name)
 
     def __repr__(self) -> str:
         return f"<class {self.name}>"
@@ -0,0 +1,742 @@
+"""Closure compilation: turns the resolved AST into nested Python closures.
+
+Every node is visited once at compile time and replaced by a closure that
+already knows its node type, operator, resolved scope distance and children.
+Running the program is then a chain of direct closure calls with no per-visit
+``match`` or operator re-dispatch.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+
+from rift import ast_nodes as ast
+from rift.callable import NativeFunction, RiftClass, RiftFunction
+from rift.completion import NORMAL, TailCall
+from rift.environment import Environment
+from rift.errors import OutOfFuelError, RiftRuntimeError
+from rift.inline_cache import GetCache, SetCache
+from rift.instance import RiftInstance
+from rift.interpreter import Interpreter
+from rift.stdlib import stringify
+from rift.tiering import UNDEFINED, Assumption, CompiledBody
+from rift.tokens import Token, TokenType
+
+ExprCode = Callable[[Environment], object]
+StmtCode = Callable[[Environment], object]  # returns a completion
+
+_CALLABLE_TYPES = (RiftFunction, RiftClass, NativeFunction)
+
+
+class CompiledFunction(RiftFunction):
+    """A RiftFunction whose body runs as a precompiled closure."""
+
+    def __init__(
+        self,
+        declaration: ast.FunctionStmt,
+        closure: Environment,
+        body: StmtCode,
+        is_initializer: bool = False,
+    ) -> None:
+        super().__init__(declaration, closure, is_initializer)
+        self.body = body
+        # a tier that never deoptimizes: every call runs the compiled body
+        self.profile.tier = CompiledBody(body)
+
+    def bind(self, instance: RiftInstance) -> RiftFunction:
+        env = Environment(self.closure, [instance])
+        return CompiledFunction(self.declaration, env, self.body, self.is_initializer)
+
+
+class ClosureCompiler:
+    """Compiles statements against the scope distances an Interpreter recorded.
+
+    With ``speculate`` set, calls to a global that currently holds a callable
+    of the right arity are bound to that value, guarded by an ``Assumption``
+    (collected in ``assumed``) that the global is not redefined.
+    """
+
+    def __init__(self, interpreter: Interpreter, speculate: bool = False) -> None:
+        self.interpreter = interpreter
+        self.speculate = speculate
+        self.assumed: list[Assumption] = []
+
+    def compile(self, statements: list[ast.Stmt]) -> StmtCode:
+        return self._sequence(statements)
+
+    def compile_function_body(self, declaration: ast.FunctionStmt) -> StmtCode:
+        return self._sequence(declaration.body)
+
+    # -- statements --
+
+    def _sequence(self, statements: list[ast.Stmt]) -> StmtCode:
+        codes = [self._stmt(s) for s in statements]
+        if not codes:
+            return _noop
+        if len(codes) == 1:
+            return codes[0]
+        if len(codes) == 2:
+            first, second = codes
+
+            def run_two(env: Environment) -> object:
+                completion = first(env)
+                if completion is not NORMAL:
+                    return completion
+                return second(env)
+
+            return run_two
+
+        def run_all(env: Environment) -> object:
+            for code in codes:
+                completion = code(env)
+                if completion is not NORMAL:
+                    return completion
+            return NORMAL
+
+        return run_all
+
+    def _stmt(self, stmt: ast.Stmt) -> StmtCode:
+        match stmt:
+            case ast.ExpressionStmt(expression):
+                expr_code = self._expr(expression)
+
+                def expression_stmt(env: Environment) -> object:
+                    expr_code(env)
+                    return NORMAL
+
+                return expression_stmt
+            case ast.PrintStmt(expression):
+                value_code = self._expr(expression)
+
+                def print_stmt(env: Environment) -> object:
+                    print(stringify(value_code(env)))
+                    return NORMAL
+
+                return print_stmt
+            case ast.LetStmt(name, initializer):
+                init_code = _nil if initializer is None else self._expr(initializer)
+                if stmt.slot < 0:
+                    cell = self.interpreter.globals.cell(name.lexeme)
+
+                    def let_global(env: Environment) -> object:
+                        cell.define(init_code(env))
+                        return NORMAL
+
+                    return let_global
+                slot = stmt.slot
+
+                def let_stmt(env: Environment) -> object:
+                    env.slots[slot] = init_code(env)
+                    return NORMAL
+
+                return let_stmt
+            case ast.BlockStmt(statements, scope_size=size, clear_on_exit=cleared):
+                body = self._sequence(statements)
+                if size is None and cleared is None:
+                    return body
+                if size is None:
+                    assert cleared is not None
+
+                    def folded_block(env: Environment) -> object:
+                        completion = body(env)
+                        slots = env.slots
+                        for slot in cleared:
+                            slots[slot] = None
+                        return completion
+
+                    return folded_block
+
+                def block(env: Environment) -> object:
+                    return body(Environment(env, [None] * size))
+
+                return block
+            case ast.IfStmt(condition, then_branch, else_branch):
+                cond = self._expr(condition)
+                then_code = self._stmt(then_branch)
+                if else_branch is None:
+
+                    def if_stmt(env: Environment) -> object:
+                        value = cond(env)
+                        if value is not None and value is not False:
+                            return then_code(env)
+                        return NORMAL
+
+                    return if_stmt
+                else_code = self._stmt(else_branch)
+
+                def if_else(env: Environment) -> object:
+                    value = cond(env)
+                    if value is not None and value is not False:
+                        return then_code(env)
+                    return else_code(env)
+
+                return if_else
+            case ast.WhileStmt(condition, body, keyword):
+                cond = self._expr(condition)
+                body_code = self._stmt(body)
+                interpreter = self.interpreter
+
+                def while_stmt(env: Environment) -> object:
+                    while True:
+                        value = cond(env)
+                        if value is None or value is False:
+                            return NORMAL
+                        completion = body_code(env)
+                        if completion is not NORMAL:
+                            return completion
+                        interpreter.fuel -= 1
+                        if interpreter.fuel < 0:
+                            raise OutOfFuelError(keyword)
+
+                return while_stmt
+            case ast.FunctionStmt(name, _, _):
+                return self._function(stmt)
+            case ast.ReturnStmt(_, value):
+                if value is None:
+
+                    def return_nil(env: Environment) -> object:
+                        return None
+
+                    return return_nil
+                if self.interpreter.tco and isinstance(value, ast.CallExpr):
+                    return self._tail_call(value)
+                ret_code = self._expr(value)
+
+                # the returned value is the statement's completion
+                return ret_code
+            case ast.ClassStmt(name, superclass_expr, methods):
+                return self._class(stmt, name, superclass_expr, methods)
+        raise AssertionError(f"unknown statement {stmt!r}")
+
+    def _tail_call(self, call: ast.CallExpr) -> StmtCode:
+        callee_code = self._expr(call.callee)
+        args = [self._expr(a) for a in call.arguments]
+        interpreter = self.interpreter
+        paren = call.paren
+        argc = len(args)
+
+        def tail_call(env: Environment) -> object:
+            fn = callee_code(env)
+            arguments = [a(env) for a in args]
+            if isinstance(fn, RiftFunction) and fn.arity() == argc:
+                return TailCall(fn, arguments)
+            return interpreter._call_function(fn, arguments, paren)
+
+        speculation = self._known_global(call.callee, argc)
+        if speculation is None or not isinstance(known := speculation[0], RiftFunction):
+            return tail_call
+        assumption = speculation[1]
+
+        def tail_call_known(env: Environment) -> object:
+            if assumption.valid:
+                return TailCall(known, [a(env) for a in args])
+            return tail_call(env)
+
+        return tail_call_known
+
+    def _function(self, declaration: ast.FunctionStmt) -> StmtCode:
+        body = self.compile_function_body(declaration)
+        define = self._define(declaration)
+
+        def function_stmt(env: Environment) -> object:
+            define(env, CompiledFunction(declaration, env, body))
+            return NORMAL
+
+        return function_stmt
+
+    def _define(
+        self, declaration: ast.FunctionStmt | ast.ClassStmt
+    ) -> Callable[[Environment, object], None]:
+        if declaration.slot < 0:
+            cell = self.interpreter.globals.cell(declaration.name.lexeme)
+
+            def define_global(env: Environment, value: object) -> None:
+                cell.define(value)
+
+            return define_global
+        slot = declaration.slot
+
+        def define_local(env: Environment, value: object) -> None:
+            env.slots[slot] = value
+
+        return define_local
+
+    def _class(
+        self,
+        stmt: ast.ClassStmt,
+        name: Token,
+        superclass_expr: ast.VariableExpr | None,
+        methods: list[ast.FunctionStmt],
+    ) -> StmtCode:
+        superclass_code = self._expr(superclass_expr) if superclass_expr is not None else None
+        method_bodies = [(m, self.compile_function_body(m)) for m in methods]
+        class_name = name.lexeme
+        define = self._define(stmt)
+
+        def class_stmt(env: Environment) -> object:
+            superclass: RiftClass | None = None
+            if superclass_code is not None:
+                assert superclass_expr is not None
+                resolved = superclass_code(env)
+                if not isinstance(resolved, RiftClass):
+                    raise RiftRuntimeError(superclass_expr.name, "superclass must be a class")
+                superclass = resolved
+
+            method_env = env
+            if superclass is not None:
+                method_env = Environment(env, [superclass])
+
+            method_map: dict[str, RiftFunction] = {}
+            for method, body in method_bodies:
+                is_init = method.name.lexeme == "init"
+                method_map[method.name.lexeme] = CompiledFunction(method, method_env, body, is_init)
+
+            # defined last, as in Interpreter._class_stmt
+            define(env, RiftClass(class_name, superclass, method_map))
+            return NORMAL
+
+        return class_stmt
+
+    # -- expressions --
+
+    def _expr(self, expr: ast.Expr) -> ExprCode:
+        match expr:
+            case ast.LiteralExpr(value):
+                constant = value
+
+                def literal(env: Environment) -> object:
+                    return constant
+
+                return literal
+            case ast.GroupingExpr(expression):
+                return self._expr(expression)
+            case ast.UnaryExpr(operator, operand):
+                return self._unary(operator, self._expr(operand))
+            case ast.BinaryExpr(left, operator, right):
+                return self._binary(operator, self._expr(left), self._expr(right))
+            case ast.VariableExpr(name):
+                return self._variable(expr, name)
+            case ast.AssignExpr(name, value):
+                return self._assign(expr, name, self._expr(value))
+            case ast.LogicalExpr(left, operator, right):
+                left_code = self._expr(left)
+                right_code = self._expr(right)
+                if operator.type == TokenType.OR:
+
+                    def logical_or(env: Environment) -> object:
+                        value = left_code(env)
+                        if value is not None and value is not False:
+                            return value
+                        return right_code(env)
+
+                    return logical_or
+
+                def logical_and(env: Environment) -> object:
+                    value = left_code(env)
+                    if value is None or value is False:
+                        return value
+                    return right_code(env)
+
+                return logical_and
+            case ast.CallExpr(ast.GetExpr(obj, name), arguments, paren):
+                return self._method_call(obj, name, [self._expr(a) for a in arguments], paren)
+            case ast.CallExpr(callee, arguments, paren):
+                callee_code = self._expr(callee)
+                args = [self._expr(a) for a in arguments]
+                if isinstance(callee, ast.VariableExpr):
+                    return self._call_global(callee, callee_code, args, paren)
+                return self._call(callee_code, args, paren)
+            case ast.GetExpr(obj, name):
+                obj_code = self._expr(obj)
+                get_cache = GetCache(name, self.interpreter.inline_caches)
+
+                def get(env: Environment) -> object:
+                    instance = obj_code(env)
+                    if isinstance(instance, RiftInstance):
+                        if instance.shape is get_cache.shape:
+                            return instance.values[get_cache.slot]
+                        return get_cache.get(instance)
+                    raise RiftRuntimeError(name, "only instances have properties")
+
+                return get
+            case ast.SetExpr(obj, name, value):
+                obj_code = self._expr(obj)
+                value_code = self._expr(value)
+                set_cache = SetCache(name, self.interpreter.inline_caches)
+
+                def set_(env: Environment) -> object:
+                    instance = obj_code(env)
+                    if not isinstance(instance, RiftInstance):
+                        raise RiftRuntimeError(name, "only instances have fields")
+                    result = value_code(env)
+                    if instance.shape is set_cache.shape:
+                        instance.values[set_cache.slot] = result
+                    else:
+                        set_cache.set(instance, result)
+                    return result
+
+                return set_
+            case ast.ThisExpr(keyword):
+                return self._variable(expr, keyword)
+            case ast.SuperExpr(keyword, method):
+                return self._super(expr, method)
+        raise AssertionError(f"unknown expression {expr!r}")
+
+    def _unary(self, operator: Token, operand: ExprCode) -> ExprCode:
+        if operator.type == TokenType.MINUS:
+
+            def negate(env: Environment) -> object:
+                value = operand(env)
+                if type(value) is not float:
+                    raise RiftRuntimeError(operator, "operand must be a number")
+                return -value
+
+            return negate
+
+        def not_(env: Environment) -> object:
+            value = operand(env)
+            return value is None or value is False
+
+        return not_
+
+    def _binary(self, op: Token, left: ExprCode, right: ExprCode) -> ExprCode:
+        match op.type:
+            case TokenType.PLUS:
+
+                def add(env: Environment) -> object:
+                    a = left(env)
+                    b = right(env)
+                    if type(a) is float and type(b) is float:
+                        return a + b
+                    if type(a) is str and type(b) is str:
+                        return a + b
+                    raise RiftRuntimeError(op, "operands must be two numbers or two strings")
+
+                return add
+            case TokenType.MINUS:
+
+                def subtract(env: Environment) -> object:
+                    a = left(env)
+                    b = right(env)
+                    if type(a) is not float or type(b) is not float:
+                        raise RiftRuntimeError(op, "operands must be numbers")
+                    return a - b
+
+                return subtract
+            case TokenType.STAR:
+
+                def multiply(env: Environment) -> object:
+                    a = left(env)
+                    b = right(env)
+                    if type(a) is not float or type(b) is not float:
+                        raise RiftRuntimeError(op, "operands must be numbers")
+                    return a * b
+
+                return multiply
+            case TokenType.SLASH:
+
+                def divide(env: Environment) -> object:
+                    a = left(env)
+                    b = right(env)
+                    if type(a) is not float or type(b) is not float:
+                        raise RiftRuntimeError(op, "operands must be numbers")
+                    if b == 0:
+                        raise RiftRuntimeError(op, "division by zero")
+                    return a / b
+
+                return divide
+            case TokenType.PERCENT:
+
+                def modulo(env: Environment) -> object:
+                    a = left(env)
+                    b = right(env)
+                    if type(a) is not float or type(b) is not float:
+                        raise RiftRuntimeError(op, "operands must be numbers")
+                    if b == 0:
+                        raise RiftRuntimeError(op, "modulo by zero")
+                    return a % b
+
+                return modulo
+            case TokenType.GREATER:
+
+                def greater(env: Environment) -> object:
+                    a = left(env)
+                    b = right(env)
+                    if type(a) is not float or type(b) is not float:
+                        raise RiftRuntimeError(op, "operands must be numbers")
+                    return a > b
+
+                return greater
+            case TokenType.GREATER_EQUAL:
+
+                def greater_equal(env: Environment) -> object:
+                    a = left(env)
+                    b = right(env)
+                    if type(a) is not float or type(b) is not float:
+                        raise RiftRuntimeError(op, "operands must be numbers")
+                    return a >= b
+
+                return greater_equal
+            case TokenType.LESS:
+
+                def less(env: Environment) -> object:
+                    a = left(env)
+                    b = right(env)
+                    if type(a) is not float or type(b) is not float:
+                        raise RiftRuntimeError(op, "operands must be numbers")
+                    return a < b
+
+                return less
+            case TokenType.LESS_EQUAL:
+
+                def less_equal(env: Environment) -> object:
+                    a = left(env)
+                    b = right(env)
+                    if type(a) is not float or type(b) is not float:
+                        raise RiftRuntimeError(op, "operands must be numbers")
+                    return a <= b
+
+                return less_equal
+            case TokenType.EQUAL_EQUAL:
+
+                def equal(env: Environment) -> object:
+                    return left(env) == right(env)
+
+                return equal
+            case TokenType.BANG_EQUAL:
+
+                def not_equal(env: Environment) -> object:
+                    return left(env) != right(env)
+
+                return not_equal
+        raise AssertionError(f"unknown binary operator {op!r}")
+
+    def _variable(self, expr: ast.Resolved, name: Token) -> ExprCode:
+        distance, slot, cell = expr.depth, expr.slot, expr.cell
+        if cell is not None:
+
+            def global_var(env: Environment) -> object:
+                value = cell.value
+                if value is UNDEFINED:
+                    raise cell.undefined(name)
+                return value
+
+            return global_var
+        if distance == 0:
+
+            def local0(env: Environment) -> object:
+                return env.slots[slot]
+
+            return local0
+        if distance == 1:
+
+            def local1(env: Environment) -> object:
+                return env.enclosing.slots[slot]  # type: ignore[union-attr]
+
+            return local1
+
+        def local_n(env: Environment) -> object:
+            return env.get_at(distance, slot)
+
+        return local_n
+
+    def _assign(self, expr: ast.Resolved, name: Token, value_code: ExprCode) -> ExprCode:
+        distance, slot, cell = expr.depth, expr.slot, expr.cell
+        if cell is not None:
+
+            def assign_global(env: Environment) -> object:
+                value = value_code(env)
+                cell.assign(name, value)
+                return value
+
+            return assign_global
+        if distance == 0:
+
+            def assign0(env: Environment) -> object:
+                value = value_code(env)
+                env.slots[slot] = value
+                return value
+
+            return assign0
+
+        def assign_n(env: Environment) -> object:
+            value = value_code(env)
+            env.assign_at(distance, slot, value)
+            return value
+
+        return assign_n
+
+    def _method_call(
+        self, obj: ast.Expr, name: Token, args: list[ExprCode], paren: Token
+    ) -> ExprCode:
+        """``obj.name(args)``, calling a method without binding it first."""
+        obj_code = self._expr(obj)
+        cache = GetCache(name, self.interpreter.inline_caches)
+        interpreter = self.interpreter
+
+        def method_call(env: Environment) -> object:
+            instance = obj_code(env)
+            if not isinstance(instance, RiftInstance):
+                raise RiftRuntimeError(name, "only instances have properties")
+            method = cache.method(instance)
+            if method is None:
+                # a field holding a callable, or an undefined property
+                function = instance.get(name)
+                return interpreter._call_function(function, [a(env) for a in args], paren)
+            arguments = [a(env) for a in args]
+            if method.arity() != len(arguments):
+                raise RiftRuntimeError(
+                    paren, f"expected {method.arity()} arguments but got {len(arguments)}"
+                )
+            return method.call(interpreter, arguments, instance)
+
+        return method_call
+
+    def _call(self, callee: ExprCode, args: list[ExprCode], paren: Token) -> ExprCode:
+        interpreter = self.interpreter
+        argc = len(args)
+        # the callee last checked here: most sites only ever call one
+        checked: list[RiftFunction | RiftClass | NativeFunction] = []
+
+        def check(fn: object) -> RiftFunction | RiftClass | NativeFunction:
+            if checked and fn is checked[0]:
+                return checked[0]
+            if not isinstance(fn, _CALLABLE_TYPES):
+                raise RiftRuntimeError(paren, "can only call functions and classes")
+            if fn.arity() != argc:
+                raise RiftRuntimeError(paren, f"expected {fn.arity()} arguments but got {argc}")
+            checked[:] = [fn]
+            return fn
+
+        if argc == 0:
+
+            def call0(env: Environment) -> object:
+                return check(callee(env)).call(interpreter, [])
+
+            return call0
+        if argc == 1:
+            (arg0,) = args
+
+            def call1(env: Environment) -> object:
+                fn = callee(env)
+                arguments = [arg0(env)]
+                return check(fn).call(interpreter, arguments)
+
+            return call1
+        if argc == 2:
+            arg0, arg1 = args
+
+            def call2(env: Environment) -> object:
+                fn = callee(env)
+                arguments = [arg0(env), arg1(env)]
+                return check(fn).call(interpreter, arguments)
+
+            return call2
+        if argc == 3:
+            arg0, arg1, arg2 = args
+
+            def call3(env: Environment) -> object:
+                fn = callee(env)
+                arguments = [arg0(env), arg1(env), arg2(env)]
+                return check(fn).call(interpreter, arguments)
+
+            return call3
+
+        def call_n(env: Environment) -> object:
+            fn = callee(env)
+            arguments = [a(env) for a in args]
+            return check(fn).call(interpreter, arguments)
+
+        return call_n
+
+    def _call_global(
+        self, callee: ast.VariableExpr, callee_code: ExprCode, args: list[ExprCode], paren: Token
+    ) -> ExprCode:
+        generic = self._call(callee_code, args, paren)
+        speculation = self._known_global(callee, len(args))
+        if speculation is None:
+            return generic
+        known, assumption = speculation
+        interpreter = self.interpreter
+        call = known.call
+
+        if not args:
+
+            def call_known0(env: Environment) -> object:
+                if assumption.valid:
+                    return call(interpreter, [])
+                return generic(env)
+
+            return call_known0
+        if len(args) == 1:
+            (arg0,) = args
+
+            def call_known1(env: Environment) -> object:
+                if assumption.valid:
+                    return call(interpreter, [arg0(env)])
+                return generic(env)
+
+            return call_known1
+        if len(args) == 2:
+            arg0, arg1 = args
+
+            def call_known2(env: Environment) -> object:
+                if assumption.valid:
+                    return call(interpreter, [arg0(env), arg1(env)])
+                return generic(env)
+
+            return call_known2
+
+        def call_known_n(env: Environment) -> object:
+            if assumption.valid:
+                return call(interpreter, [a(env) for a in args])
+            return generic(env)
+
+        return call_known_n
+
+    def _known_global(
+        self, callee: ast.Expr, argc: int
+    ) -> tuple[RiftFunction | RiftClass | NativeFunction, Assumption] | None:
+        """The callable a global callee holds now, if calls to it can speculate."""
+        if not self.speculate or not isinstance(callee, ast.VariableExpr):
+            return None
+        cell = callee.cell
+        if cell is None:
+            return None
+        known = cell.value
+        if not isinstance(known, _CALLABLE_TYPES) or known.arity() != argc:
+            return None
+        assumption = cell.assume()
+        self.assumed.append(assumption)
+        return known, assumption
+
+    def _super(self, expr: ast.SuperExpr, method: Token) -> ExprCode:
+        distance = expr.depth
+
+        def super_(env: Environment) -> object:
+            superclass = env.get_at(distance, 0)
+            assert isinstance(superclass, RiftClass)
+            # 'this' is always one scope inside 'super', and alone in each
+            instance = env.get_at(distance - 1, 0)
+            assert isinstance(instance, RiftInstance)
+            m = superclass.find_method(method.lexeme)
+            if m is None:
+                raise RiftRuntimeError(method, f"undefined property '{method.lexeme}'")
+            return m.bind(instance)
+
+        return super_
+
+
+def _noop(env: Environment) -> object:
+    return NORMAL
+
+
+def _nil(env: Environment) -> object:
+    return None
+
+
+class ClosureInterpreter(Interpreter):
+    """Engine that compiles each program to closures once, then runs them."""
+
+    def interpret(self, statements: list[ast.Stmt]) -> None:
+        ClosureCompiler(self).compile(statements)(self.globals)
@@ -0,0 +1,482 @@
+"""Bytecode compiler: lowers the resolved AST into function prototypes for rift.vm."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from enum import Enum, auto
+
+from rift import ast_nodes as ast
+from rift.tiering import GlobalCell, GlobalEnvironment
+from rift.tokens import Token, TokenType
+
+# -- opcodes --
+# Plain ints rather than an IntEnum so the VM dispatch loop compares machine
+# integers instead of enum members. Operands follow their opcode inline.
+
+OP_CONSTANT = 0  # const index
+OP_NIL = 1
+OP_TRUE = 2
+OP_FALSE = 3
+OP_POP = 4
+OP_GET_LOCAL = 5  # slot
+OP_SET_LOCAL = 6  # slot
+OP_GET_GLOBAL = 7  # const index of cell
+OP_DEFINE_GLOBAL = 8  # const index of cell
+OP_SET_GLOBAL = 9  # const index of cell
+OP_GET_UPVALUE = 10  # upvalue index
+OP_SET_UPVALUE = 11  # upvalue index
+OP_GET_PROPERTY = 12  # const index of name
+OP_SET_PROPERTY = 13  # const index of name
+OP_GET_SUPER = 14  # const index of name
+OP_EQUAL = 15
+OP_NOT_EQUAL = 16
+OP_GREATER = 17
+OP_GREATER_EQUAL = 18
+OP_LESS = 19
+OP_LESS_EQUAL = 20
+OP_ADD = 21
+OP_SUBTRACT = 22
+OP_MULTIPLY = 23
+OP_DIVIDE = 24
+OP_MODULO = 25
+OP_NOT = 26
+OP_NEGATE = 27
+OP_PRINT = 28
+OP_JUMP = 29  # target offset
+OP_JUMP_IF_FALSE = 30  # target offset, leaves condition on the stack
+OP_JUMP_IF_TRUE = 31  # target offset, leaves condition on the stack
+OP_POP_JUMP_IF_FALSE = 32  # target offset, pops the condition
+OP_LOOP = 33  # target offset (loop back-edge)
+OP_CALL = 34  # arg count
+OP_INVOKE = 35  # const index of name, arg count
+OP_SUPER_INVOKE = 36  # const index of name, arg count
+OP_CLOSURE = 37  # const index of proto, then (is_local, index) per upvalue
+OP_CLOSE_UPVALUE = 38
+OP_RETURN = 39
+OP_CLASS = 40  # const index of name
+OP_INHERIT = 41
+OP_METHOD = 42  # const index of name
+
+OP_NAMES: dict[int, str] = {
+    value: name[3:]
+    for name, value in globals().items()
+    if name.startswith("OP_") and isinstance(value, int)
+}
+
+# number of inline operands per opcode (OP_CLOSURE is variable-length)
+_OPERAND_COUNT: dict[int, int] = {
+    OP_CONSTANT: 1, OP_GET_LOCAL: 1, OP_SET_LOCAL: 1, OP_GET_GLOBAL: 1,
+    OP_DEFINE_GLOBAL: 1, OP_SET_GLOBAL: 1, OP_GET_UPVALUE: 1, OP_SET_UPVALUE: 1,
+    OP_GET_PROPERTY: 1, OP_SET_PROPERTY: 1, OP_GET_SUPER: 1, OP_JUMP: 1,
+    OP_JUMP_IF_FALSE: 1, OP_JUMP_IF_TRUE: 1, OP_POP_JUMP_IF_FALSE: 1, OP_LOOP: 1,
+    OP_CALL: 1, OP_INVOKE: 2, OP_SUPER_INVOKE: 2, OP_CLASS: 1, OP_METHOD: 1,
+}
+
+_BINARY_OPS: dict[TokenType, int] = {
+    TokenType.PLUS: OP_ADD,
+    TokenType.MINUS: OP_SUBTRACT,
+    TokenType.STAR: OP_MULTIPLY,
+    TokenType.SLASH: OP_DIVIDE,
+    TokenType.PERCENT: OP_MODULO,
+    TokenType.GREATER: OP_GREATER,
+    TokenType.GREATER_EQUAL: OP_GREATER_EQUAL,
+    TokenType.LESS: OP_LESS,
+    TokenType.LESS_EQUAL: OP_LESS_EQUAL,
+    TokenType.EQUAL_EQUAL: OP_EQUAL,
+    TokenType.BANG_EQUAL: OP_NOT_EQUAL,
+}
+
+
+class FunctionKind(Enum):
+    SCRIPT = auto()
+    FUNCTION = auto()
+    METHOD = auto()
+    INITIALIZER = auto()
+
+
+@dataclass
+class FunctionProto:
+    """Compiled code for one function body (or the top-level script)."""
+
+    name: str
+    arity: int
+    kind: FunctionKind
+    code: list[int] = field(default_factory=list)
+    constants: list[object] = field(default_factory=list)
+    # code offset of an instruction that can fail -> token to report it at
+    tokens: dict[int, Token] = field(default_factory=dict)
+    upvalue_count: int = 0
+    name_token: Token | None = None  # the declaration's name; None for the script
+
+    def __repr__(self) -> str:
+        return f"<proto {self.name}>"
+
+
+@dataclass
+class _Local:
+    name: str
+    depth: int
+    captured: bool = False
+
+
+@dataclass
+class _FunctionState:
+    proto: FunctionProto
+    enclosing: _FunctionState | None
+    locals: list[_Local] = field(default_factory=list)
+    upvalues: list[tuple[bool, int]] = field(default_factory=list)  # (is_local, index)
+    scope_depth: int = 0
+
+
+class Compiler:
+    """Compiles a resolved statement list into a script FunctionProto.
+
+    Locals live in stack slots relative to the frame base; variables captured
+    by inner functions become upvalues; everything at scope depth 0 is global,
+    referenced through its cell in ``globals_``.
+    Assumes the program already passed the Resolver, so scope errors are not
+    re-checked here.
+    """
+
+    def __init__(self, globals_: GlobalEnvironment | None = None) -> None:
+        self._globals = GlobalEnvironment() if globals_ is None else globals_
+        self._state = _FunctionState(FunctionProto("script", 0, FunctionKind.SCRIPT), None)
+        # slot 0 of every frame holds the callee
+        self._state.locals.append(_Local("", 0))
+
+    def compile(self, statements: list[ast.Stmt]) -> FunctionProto:
+        for stmt in statements:
+            self._stmt(stmt)
+        self._emit_return()
+        return self._state.proto
+
+    # -- statements --
+
+    def _stmt(self, stmt: ast.Stmt) -> None:
+        match stmt:
+            case ast.ExpressionStmt(expression):
+                self._expr(expression)
+                self._emit(OP_POP)
+            case ast.PrintStmt(expression):
+                self._expr(expression)
+                self._emit(OP_PRINT)
+            case ast.LetStmt(name, initializer):
+                if initializer is not None:
+                    self._expr(initializer)
+                else:
+                    self._emit(OP_NIL)
+                self._define_variable(name)
+            case ast.BlockStmt(statements):
+                self._begin_scope()
+                for inner in statements:
+                    self._stmt(inner)
+                self._end_scope()
+            case ast.IfStmt(condition, then_branch, else_branch):
+                self._expr(condition)
+                else_jump = self._emit_jump(OP_POP_JUMP_IF_FALSE)
+                self._stmt(then_branch)
+                if else_branch is not None:
+                    end_jump = self._emit_jump(OP_JUMP)
+                    self._patch_jump(else_jump)
+                    self._stmt(else_branch)
+                    self._patch_jump(end_jump)
+                else:
+                    self._patch_jump(else_jump)
+            case ast.WhileStmt(condition, body, keyword):
+                loop_start = len(self._code)
+                self._expr(condition)
+                exit_jump = self._emit_jump(OP_POP_JUMP_IF_FALSE)
+                self._stmt(body)
+                self._emit(OP_LOOP, loop_start, token=keyword)
+                self._patch_jump(exit_jump)
+            case ast.FunctionStmt(name, _, _):
+                if self._state.scope_depth > 0:
+                    # mark initialized up front so the body can recurse
+                    self._state.locals.append(_Local(name.lexeme, self._state.scope_depth))
+                    self._function(stmt, FunctionKind.FUNCTION)
+                else:
+                    self._function(stmt, FunctionKind.FUNCTION)
+                    self._emit(OP_DEFINE_GLOBAL, self._global_constant(name))
+            case ast.ReturnStmt(_, value):
+                if value is None:
+                    self._emit_return()
+                else:
+                    self._expr(value)
+                    self._emit(OP_RETURN)
+            case ast.ClassStmt(name, superclass, methods):
+                self._class(name, superclass, methods)
+
+    def _class(
+        self,
+        name: Token,
+        superclass: ast.VariableExpr | None,
+        methods: list[ast.FunctionStmt],
+    ) -> None:
+        name_const = self._name_constant(name)
+        self._emit(OP_CLASS, name_const)
+        self._define_variable(name)
+
+        if superclass is not None:
+            self._named_variable(superclass.name, get=True)
+            self._begin_scope()
+            self._state.locals.append(_Local("super", self._state.scope_depth))
+            self._named_variable(name, get=True)
+            self._emit(OP_INHERIT, token=superclass.name)
+
+        self._named_variable(name, get=True)
+        for method in methods:
+            kind = FunctionKind.METHOD
+            if method.name.lexeme == "init":
+                kind = FunctionKind.INITIALIZER
+            self._function(method, kind)
+            self._emit(OP_METHOD, self._name_constant(method.name))
+        self._emit(OP_POP)
+
+        if superclass is not None:
+            self._end_scope()
+
+    def _function(self, function: ast.FunctionStmt, kind: FunctionKind) -> None:
+        proto = FunctionProto(
+            function.name.lexeme, len(function.params), kind, name_token=function.name
+        )
+        state = _FunctionState(proto, self._state, scope_depth=1)
+        receiver = "this" if kind in (FunctionKind.METHOD, FunctionKind.INITIALIZER) else ""
+        state.locals.append(_Local(receiver, 1))
+        for param in function.params:
+            state.locals.append(_Local(param.lexeme, 1))
+
+        self._state = state
+        for stmt in function.body:
+            self._stmt(stmt)
+        self._emit_return()
+        assert state.enclosing is not None
+        self._state = state.enclosing
+
+        proto.upvalue_count = len(state.upvalues)
+        operands: list[int] = [self._make_constant(proto)]
+        for is_local, index in state.upvalues:
+            operands.append(1 if is_local else 0)
+            operands.append(index)
+        self._emit(OP_CLOSURE, *operands)
+
+    # -- expressions --
+
+    def _expr(self, expr: ast.Expr) -> None:
+        match expr:
+            case ast.LiteralExpr(value):
+                if value is None:
+                    self._emit(OP_NIL)
+                elif value is True:
+                    self._emit(OP_TRUE)
+                elif value is False:
+                    self._emit(OP_FALSE)
+                else:
+                    self._emit(OP_CONSTANT, self._make_constant(value))
+            case ast.GroupingExpr(expression):
+                self._expr(expression)
+            case ast.UnaryExpr(operator, operand):
+                self._expr(operand)
+                if operator.type == TokenType.MINUS:
+                    self._emit(OP_NEGATE, token=operator)
+                else:
+                    self._emit(OP_NOT)
+            case ast.BinaryExpr(left, operator, right):
+                self._expr(left)
+                self._expr(right)
+                self._emit(_BINARY_OPS[operator.type], token=operator)
+            case ast.VariableExpr(name):
+                self._named_variable(name, get=True)
+            case ast.AssignExpr(name, value):
+                self._expr(value)
+                self._named_variable(name, get=False)
+            case ast.LogicalExpr(left, operator, right):
+                self._expr(left)
+                jump_op = OP_JUMP_IF_TRUE if operator.type == TokenType.OR else OP_JUMP_IF_FALSE
+                end_jump = self._emit_jump(jump_op)
+                self._emit(OP_POP)
+                self._expr(right)
+                self._patch_jump(end_jump)
+            case ast.CallExpr(callee, arguments, paren):
+                self._call(callee, arguments, paren)
+            case ast.GetExpr(obj, name):
+                self._expr(obj)
+                self._emit(OP_GET_PROPERTY, self._name_constant(name), token=name)
+            case ast.SetExpr(obj, name, value):
+                self._expr(obj)
+                self._expr(value)
+                self._emit(OP_SET_PROPERTY, self._name_constant(name), token=name)
+            case ast.ThisExpr(keyword):
+                self._named_variable(keyword, get=True)
+            case ast.SuperExpr(keyword, method):
+                self._named_variable(_synthetic(keyword, "this"), get=True)
+                self._named_variable(_synthetic(keyword, "super"), get=True)
+                self._emit(OP_GET_SUPER, self._name_constant(method), token=method)
+
+    def _call(self, callee: ast.Expr, arguments: list[ast.Expr], paren: Token) -> None:
+        match callee:
+            case ast.GetExpr(obj, name):
+                # obj.method(args) skips materializing a bound method
+                self._expr(obj)
+                for arg in arguments:
+                    self._expr(arg)
+                self._emit(OP_INVOKE, self._name_constant(name), len(arguments), token=paren)
+                self._mark_name_operand(name)
+            case ast.SuperExpr(keyword, method):
+                self._named_variable(_synthetic(keyword, "this"), get=True)
+                for arg in arguments:
+                    self._expr(arg)
+                self._named_variable(_synthetic(keyword, "super"), get=True)
+                self._emit(
+                    OP_SUPER_INVOKE, self._name_constant(method), len(arguments), token=paren
+                )
+                self._mark_name_operand(method)
+            case _:
+                self._expr(callee)
+                for arg in arguments:
+                    self._expr(arg)
+                self._emit(OP_CALL, len(arguments), token=paren)
+
+    # -- variables --
+
+    def _define_variable(self, name: Token) -> None:
+        if self._state.scope_depth > 0:
+            # the value already on the stack becomes the local's slot
+            self._state.locals.append(_Local(name.lexeme, self._state.scope_depth))
+            return
+        self._emit(OP_DEFINE_GLOBAL, self._global_constant(name))
+
+    def _named_variable(self, name: Token, *, get: bool) -> None:
+        slot = _resolve_local(self._state, name.lexeme)
+        if slot != -1:
+            self._emit(OP_GET_LOCAL if get else OP_SET_LOCAL, slot)
+            return
+        index = _resolve_upvalue(self._state, name.lexeme)
+        if index != -1:
+            self._emit(OP_GET_UPVALUE if get else OP_SET_UPVALUE, index)
+            return
+        self._emit(OP_GET_GLOBAL if get else OP_SET_GLOBAL, self._global_constant(name), token=name)
+
+    def _begin_scope(self) -> None:
+        self._state.scope_depth += 1
+
+    def _end_scope(self) -> None:
+        state = self._state
+        state.scope_depth -= 1
+        while state.locals and state.locals[-1].depth > state.scope_depth:
+            local = state.locals.pop()
+            self._emit(OP_CLOSE_UPVALUE if local.captured else OP_POP)
+
+    # -- emit helpers --
+
+    @property
+    def _code(self) -> list[int]:
+        return self._state.proto.code
+
+    def _emit(self, op: int, *operands: int, token: Token | None = None) -> None:
+        if token is not None:
+            self._state.proto.tokens[len(self._code)] = token
+        self._code.append(op)
+        self._code.extend(operands)
+
+    def _mark_name_operand(self, name: Token) -> None:
+        # invokes report call errors at the opcode and property errors at
+        # the name operand that follows it
+        self._state.proto.tokens[len(self._code) - 2] = name
+
+    def _emit_jump(self, op: int) -> int:
+        self._emit(op, -1)
+        return len(self._code) - 1
+
+    def _patch_jump(self, operand_offset: int) -> None:
+        self._code[operand_offset] = len(self._code)
+
+    def _emit_return(self) -> None:
+        if self._state.proto.kind == FunctionKind.INITIALIZER:
+            # init always returns 'this'
+            self._emit(OP_GET_LOCAL, 0)
+        else:
+            self._emit(OP_NIL)
+        self._emit(OP_RETURN)
+
+    def _make_constant(self, value: object) -> int:
+        constants = self._state.proto.constants
+        if isinstance(value, (float, str)):
+            for i, existing in enumerate(constants):
+                if type(existing) is type(value) and existing == value:
+                    return i
+        elif isinstance(value, GlobalCell):
+            for i, existing in enumerate(constants):
+                if existing is value:
+                    return i
+        constants.append(value)
+        return len(constants) - 1
+
+    def _name_constant(self, name: Token) -> int:
+        return self._make_constant(name.lexeme)
+
+    def _global_constant(self, name: Token) -> int:
+        return self._make_constant(self._globals.cell(name.lexeme))
+
+
+def _synthetic(token: Token, lexeme: str) -> Token:
+    return Token(TokenType.IDENTIFIER, lexeme, None, token.line, token.column)
+
+
+def _resolve_local(state: _FunctionState, name: str) -> int:
+    for i in range(len(state.locals) - 1, -1, -1):
+        if state.locals[i].name == name:
+            return i
+    return -1
+
+
+def _resolve_upvalue(state: _FunctionState, name: str) -> int:
+    if state.enclosing is None:
+        return -1
+    local = _resolve_local(state.enclosing, name)
+    if local != -1:
+        state.enclosing.locals[local].captured = True
+        return _add_upvalue(state, True, local)
+    upvalue = _resolve_upvalue(state.enclosing, name)
+    if upvalue != -1:
+        return _add_upvalue(state, False, upvalue)
+    return -1
+
+
+def _add_upvalue(state: _FunctionState, is_local: bool, index: int) -> int:
+    for i, existing in enumerate(state.upvalues):
+        if existing == (is_local, index):
+            return i
+    state.upvalues.append((is_local, index))
+    return len(state.upvalues) - 1
+
+
+def disassemble(proto: FunctionProto) -> str:
+    """Human-readable listing of a prototype and the functions nested in it."""
+    lines = [f"== {proto.name} =="]
+    nested: list[FunctionProto] = []
+    ip = 0
+    code = proto.code
+    while ip < len(code):
+        op = code[ip]
+        text = f"{ip:04d} {OP_NAMES[op]}"
+        if op == OP_CLOSURE:
+            fn = proto.constants[code[ip + 1]]
+            assert isinstance(fn, FunctionProto)
+            nested.append(fn)
+            text += f" {fn!r}"
+            ip += 2 + 2 * fn.upvalue_count
+        else:
+            count = _OPERAND_COUNT.get(op, 0)
+            operands = code[ip + 1 : ip + 1 + count]
+            if op in (OP_CONSTANT, OP_GET_GLOBAL, OP_DEFINE_GLOBAL, OP_SET_GLOBAL,
+                      OP_GET_PROPERTY, OP_SET_PROPERTY, OP_GET_SUPER, OP_CLASS,
+                      OP_METHOD, OP_INVOKE, OP_SUPER_INVOKE):
+                text += f" {proto.constants[operands[0]]!r}"
+                operands = operands[1:]
+            text += "".join(f" {o}" for o in operands)
+            ip += 1 + count
+        lines.append(text)
+    for fn in nested:
+        lines.append("")
+        lines.append(disassemble(fn))
+    return "\n".join(lines)
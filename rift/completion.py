@@ -0,0 +1,28 @@
+"""Statement completions: how ``return`` unwinds without raising.
+
+Executing a statement produces ``NORMAL`` when control falls through to the
+next statement. Any other result is a return in progress: the returned value,
+or a ``TailCall`` when the statement was ``return f(...)`` and the caller
+should run ``f`` in place of the current activation. Blocks, loops and
+conditionals hand a non-``NORMAL`` completion straight up to the function
+call, which turns it into the call's value.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Final
+
+if TYPE_CHECKING:
+    from rift.callable import RiftFunction
+
+# never a Rift value, so it cannot be confused with a returned one
+NORMAL: Final = object()
+
+
+@dataclass(eq=False)
+class TailCall:
+    """Completion of ``return f(...)``: the caller's activation runs f next."""
+
+    function: RiftFunction
+    arguments: list[object]
@@ -1,38 +1,28 @@
 from __future__ import annotations
 
-from rift.errors import RiftRuntimeError
-from rift.tokens import Token
-
 
 class Environment:
-    def __init__(self, enclosing: Environment | None = None) -> None:
-        self.values: dict[str, object] = {}
-        self.enclosing = enclosing
+    """One runtime scope: a function call, or a block some closure captures from.
 
-    def define(self, name: str, value: object) -> None:
-        self.values[name] = value
+    Its variables live in slots the resolver numbered, and the environment is
+    created with all of them, so a declaration just stores into its slot.
+    Globals, which are looked up by name, live in ``GlobalEnvironment``
+    instead.
+    """
 
-    def get(self, name: Token) -> object:
-        if name.lexeme in self.values:
-            return self.values[name.lexeme]
-        if self.enclosing is not None:
-            return self.enclosing.get(name)
-        raise RiftRuntimeError(name, f"undefined variable '{name.lexeme}'")
+    __slots__ = ("enclosing", "slots")
 
-    def assign(self, name: Token, value: object) -> None:
-        if name.lexeme in self.values:
-            self.values[name.lexeme] = value
-            return
-        if self.enclosing is not None:
-            self.enclosing.assign(name, value)
-            return
-        raise RiftRuntimeError(name, f"undefined variable '{name.lexeme}'")
+    def __init__(
+        self, enclosing: Environment | None = None, slots: list[object] | None = None
+    ) -> None:
+        self.slots: list[object] = [] if slots is None else slots
+        self.enclosing = enclosing
 
-    def get_at(self, distance: int, name: str) -> object:
-        return self._ancestor(distance).values[name]
+    def get_at(self, distance: int, slot: int) -> object:
+        return self._ancestor(distance).slots[slot]
 
-    def assign_at(self, distance: int, name: Token, value: object) -> None:
-        self._ancestor(distance).values[name.lexeme] = value
+    def assign_at(self, distance: int, slot: int, value: object) -> None:
+        self._ancestor(distance).slots[slot] = value
 
     def _ancestor(self, distance: int) -> Environment:
         env: Environment = self
@@ -40,3 +30,42 @@ class Environment:
             assert env.enclosing is not None
             env = env.enclosing
         return env
+
+
+# the slots of a pooled environment, so a stale write fails loudly
+RELEASED: list[object] = []
+
+
+class EnvironmentPool:
+    """Spare call environments, for calls whose environment cannot escape.
+
+    The resolver clears ``FunctionStmt.frame_escapes`` for bodies that declare
+    no function or class, the only things that keep an environment past its
+    call; such a call takes its environment from here and hands it back on
+    return. ``hits`` counts environments reused, ``misses`` those allocated.
+    The pool never holds more environments than were live at once, so it needs
+    no bound.
+    """
+
+    __slots__ = ("free", "hits", "misses")
+
+    def __init__(self) -> None:
+        self.free: list[Environment] = []
+        self.hits = 0
+        self.misses = 0
+
+    def acquire(self, enclosing: Environment, slots: list[object]) -> Environment:
+        if self.free:
+            self.hits += 1
+            env = self.free.pop()
+            env.enclosing = enclosing
+            env.slots = slots
+            return env
+        self.misses += 1
+        return Environment(enclosing, slots)
+
+    def release(self, env: Environment) -> None:
+        # drop the references, or the pool would keep values and scopes alive
+        env.enclosing = None
+        env.slots = RELEASED
+        self.free.append(env)
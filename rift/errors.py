@@ -35,9 +35,16 @@ class RiftRuntimeError(Exception):
         return f"[line {self.token.line}] Runtime error: {self.msg}"
 
 
-class ReturnException(Exception):
-    """Control flow mechanism for function returns."""
+@dataclass
+class OutOfFuelError(RiftRuntimeError):
+    """The interpreter's fuel budget ran out (see ``Interpreter.fuel``)."""
+
+    msg: str = "out of fuel"
+
+
+class DeferredParseError(ParseError, RiftRuntimeError):
+    """Error in a lazily parsed function body, found when it first runs.
 
-    def __init__(self, value: object) -> None:
-        super().__init__()
-        self.value = value
+    Reported like a parse error, but raised while the program is running, so
+    every engine unwinds it like a runtime error.
+    """
@@ -0,0 +1,464 @@
+"""Fused ("superinstruction") nodes for common Rift idioms.
+
+After a program is resolved, ``fuse`` walks it and rewrites a few hot shapes
+in place (``__class__`` swap) into nodes the tree-walker runs in one step:
+
+- ``x = x + e`` (also ``-`` and ``*``) on a local ``x``: the increments of
+  desugared ``for`` loops
+- ``a < b`` and the other arithmetic and comparison operators on two locals
+- ``this.field`` reads and ``this.field = e`` writes, with an inline cache
+- method calls ``obj.name(args)``, which run the method found through an
+  inline cache with ``this`` bound to ``obj`` instead of first building the
+  bound method the ``obj.name`` read alone would return
+- calls to a global native function such as ``clock()``
+- counting ``for`` loops, ``for (let i = a; i < n; i = i + k)``, whose body
+  neither assigns ``i`` nor mentions it in a nested function: the counter
+  runs as a Python float and only its value is stored for the body to read
+
+Each fused node reads its locals straight from the environment chain instead
+of evaluating its ``VariableExpr`` and ``ThisExpr`` children. Like quickened
+nodes, fused classes subclass the node they replace, so every other consumer
+of the AST still sees the original node type and fields.
+"""
+
+from __future__ import annotations
+
+import operator
+from collections.abc import Callable, Iterator
+from typing import TYPE_CHECKING
+
+from rift import ast_nodes as ast
+from rift.callable import NativeFunction
+from rift.completion import NORMAL
+from rift.environment import Environment
+from rift.errors import OutOfFuelError, RiftRuntimeError
+from rift.inline_cache import GetCache, SetCache
+from rift.instance import RiftInstance
+from rift.parser import LazyFunctionStmt
+from rift.tokens import Token, TokenType
+
+if TYPE_CHECKING:
+    from rift.interpreter import Interpreter
+    from rift.tiering import Assumption
+
+_UPDATE_OPS: dict[TokenType, Callable[[float, float], object]] = {
+    TokenType.PLUS: operator.add,
+    TokenType.MINUS: operator.sub,
+    TokenType.STAR: operator.mul,
+}
+_COMPARE_OPS: dict[TokenType, Callable[[float, float], bool]] = {
+    TokenType.GREATER: operator.gt,
+    TokenType.GREATER_EQUAL: operator.ge,
+    TokenType.LESS: operator.lt,
+    TokenType.LESS_EQUAL: operator.le,
+}
+_LOCAL_OPS: dict[TokenType, Callable[[float, float], object]] = {**_UPDATE_OPS, **_COMPARE_OPS}
+
+
+class Fused:
+    """Mixin of every fused node class."""
+
+    def execute(self, interpreter: Interpreter) -> object:
+        raise NotImplementedError
+
+
+class LocalUpdateExpr(Fused, ast.AssignExpr):
+    """``x = x <op> e`` where both ``x`` are the same local."""
+
+    fn: Callable[[float, float], object]
+
+    def execute(self, interpreter: Interpreter) -> object:
+        assert isinstance(self.value, ast.BinaryExpr)
+        slots = interpreter._environment._ancestor(self.depth).slots
+        slot = self.slot
+        left = slots[slot]
+        right = interpreter._evaluate(self.value.right)
+        if type(left) is float and type(right) is float:
+            value = self.fn(left, right)
+        else:
+            value = interpreter._eval_binary(self.value.operator, left, right)
+        slots[slot] = value
+        return value
+
+
+class LocalBinaryExpr(Fused, ast.BinaryExpr):
+    """Arithmetic or comparison of two local variables."""
+
+    left_at: tuple[int, int]  # (distance, slot)
+    right_at: tuple[int, int]
+    fn: Callable[[float, float], object]
+
+    def execute(self, interpreter: Interpreter) -> object:
+        env = interpreter._environment
+        left = env.get_at(*self.left_at)
+        right = env.get_at(*self.right_at)
+        if type(left) is float and type(right) is float:
+            return self.fn(left, right)
+        return interpreter._eval_binary(self.operator, left, right)
+
+
+class ThisGetExpr(Fused, ast.GetExpr):
+    """``this.name`` inside a method, through an inline cache."""
+
+    distance: int
+    cache: GetCache
+
+    def execute(self, interpreter: Interpreter) -> object:
+        instance = interpreter._environment.get_at(self.distance, 0)
+        assert isinstance(instance, RiftInstance)
+        cache = self.cache
+        if instance.shape is cache.shape:
+            return instance.values[cache.slot]
+        return cache.get(instance)
+
+
+class ThisSetExpr(Fused, ast.SetExpr):
+    """``this.name = e`` inside a method, through an inline cache."""
+
+    distance: int
+    cache: SetCache
+
+    def execute(self, interpreter: Interpreter) -> object:
+        instance = interpreter._environment.get_at(self.distance, 0)
+        assert isinstance(instance, RiftInstance)
+        value = interpreter._evaluate(self.value)
+        cache = self.cache
+        if instance.shape is cache.shape:
+            instance.values[cache.slot] = value
+        else:
+            cache.set(instance, value)
+        return value
+
+
+class MethodCallExpr(Fused, ast.CallExpr):
+    """``obj.name(args)``, calling a method of ``obj`` without binding it."""
+
+    cache: GetCache
+
+    def execute(self, interpreter: Interpreter) -> object:
+        callee = self.callee
+        assert isinstance(callee, ast.GetExpr)
+        obj = interpreter._evaluate(callee.object)
+        if isinstance(obj, RiftInstance):
+            method = self.cache.method(obj)
+            if method is not None:
+                args = interpreter._arguments(self.arguments)
+                if len(args) != method.arity():
+                    raise RiftRuntimeError(
+                        self.paren, f"expected {method.arity()} arguments but got {len(args)}"
+                    )
+                return method.call(interpreter, args, obj)
+        # a field holding a callable, or an error to raise
+        function = interpreter._get_property(obj, callee.name)
+        args = interpreter._arguments(self.arguments)
+        return interpreter._call_function(function, args, self.paren)
+
+
+class NativeCallExpr(Fused, ast.CallExpr):
+    """Call of a global that held a native function of matching arity.
+
+    The global is tracked by an ``Assumption``; once it is redefined or
+    assigned, the node takes the generic call path for good.
+    """
+
+    native: NativeFunction
+    assumption: Assumption
+
+    def execute(self, interpreter: Interpreter) -> object:
+        # the callee is read before the arguments, which may rebind the global
+        if self.assumption.valid:
+            return self.native.func(*interpreter._arguments(self.arguments))
+        callee = interpreter._evaluate(self.callee)
+        args = interpreter._arguments(self.arguments)
+        return interpreter._call_function(callee, args, self.paren)
+
+
+class CountingLoopStmt(Fused, ast.BlockStmt):
+    """The block a counting ``for`` loop desugars to, run with a Python counter.
+
+    Slots stay as the resolver laid them out: the counter lives in ``slot``
+    of the block's environment, or of the enclosing one when the block has
+    none. The loop body declares nothing (the increment is its only other
+    statement), so it runs in that same environment.
+    """
+
+    slot: int
+    start: ast.Expr
+    limit: ast.Expr
+    compare: Token
+    test: Callable[[float, float], bool]
+    step: float
+    body: ast.Stmt
+    loop: ast.WhileStmt
+
+    def execute(self, interpreter: Interpreter) -> object:
+        previous = interpreter._environment
+        size = self.scope_size
+        outer = previous if size is None else Environment(previous, [None] * size)
+        try:
+            interpreter._environment = outer
+            counter = interpreter._evaluate(self.start)
+            slots, slot = outer.slots, self.slot
+            slots[slot] = counter
+            if type(counter) is not float:
+                # the comparison would fail or mean something else: no counter
+                return interpreter._execute(self.loop)
+            limit_expr, test, step, body = self.limit, self.test, self.step, self.body
+            constant = limit_expr.value if isinstance(limit_expr, ast.LiteralExpr) else None
+            loop_jit = interpreter._loop_jit
+            while True:
+                limit = constant if constant is not None else interpreter._evaluate(limit_expr)
+                if type(limit) is float:
+                    if not test(counter, limit):
+                        return NORMAL
+                elif not interpreter._is_truthy(
+                    interpreter._eval_binary(self.compare, counter, limit)
+                ):
+                    return NORMAL
+                completion = interpreter._execute(body)
+                if completion is not NORMAL:
+                    return completion
+                interpreter.fuel -= 1
+                if interpreter.fuel < 0:
+                    raise OutOfFuelError(self.loop.keyword)
+                counter += step
+                slots[slot] = counter
+                # a hot loop may finish in compiled code
+                if loop_jit is not None and loop_jit.back_edge(self.loop, outer):
+                    return NORMAL
+        finally:
+            interpreter._environment = previous
+            if self.clear_on_exit is not None:
+                for slot in self.clear_on_exit:
+                    outer.slots[slot] = None
+
+
+def fuse(statements: list[ast.Stmt], interpreter: Interpreter) -> None:
+    """Rewrite the fusable nodes of resolved ``statements`` in place."""
+    _Fuser(interpreter).statements(statements)
+
+
+class _Fuser:
+    def __init__(self, interpreter: Interpreter) -> None:
+        self._interpreter = interpreter
+
+    def statements(self, statements: list[ast.Stmt]) -> None:
+        for stmt in statements:
+            self._stmt(stmt)
+
+    def _stmt(self, stmt: ast.Stmt) -> None:
+        match stmt:
+            case ast.ExpressionStmt(expr) | ast.PrintStmt(expr):
+                self._expr(expr)
+            case ast.LetStmt(_, initializer):
+                if initializer is not None:
+                    self._expr(initializer)
+            case ast.BlockStmt(statements):
+                self._counting_loop(stmt)
+                self.statements(statements)
+            case ast.IfStmt(condition, then_branch, else_branch):
+                self._expr(condition)
+                self._stmt(then_branch)
+                if else_branch is not None:
+                    self._stmt(else_branch)
+            case ast.WhileStmt(condition, body):
+                self._expr(condition)
+                self._stmt(body)
+            case ast.ReturnStmt(_, value):
+                if value is not None:
+                    self._expr(value)
+            case ast.FunctionStmt():
+                self._function(stmt)
+            case ast.ClassStmt(_, _, methods):
+                for method in methods:
+                    self._function(method)
+
+    def _counting_loop(self, block: ast.BlockStmt) -> None:
+        match block.statements:
+            case [
+                ast.LetStmt(name, start) as let,
+                ast.WhileStmt(
+                    ast.BinaryExpr(ast.VariableExpr(), compare, limit) as condition,
+                    ast.BlockStmt(
+                        [
+                            body,
+                            ast.ExpressionStmt(
+                                ast.AssignExpr(
+                                    _,
+                                    ast.BinaryExpr(
+                                        ast.VariableExpr(),
+                                        step_op,
+                                        ast.LiteralExpr(float() as step),
+                                    ) as update,
+                                ) as increment
+                            ),
+                        ]
+                    ) as inner,
+                ) as loop,
+            ]:
+                pass
+            case _:
+                return
+        assert isinstance(update.left, ast.VariableExpr)
+        counter = (0, let.slot)
+        if (
+            start is None
+            or compare.type not in _COMPARE_OPS
+            or step_op.type not in (TokenType.PLUS, TokenType.MINUS)
+            or inner.scope_size is not None
+            or _binding(condition.left) != counter
+            or _binding(increment) != counter
+            or _binding(update.left) != counter
+            or increment.name.lexeme != name.lexeme
+            or update.left.name.lexeme != name.lexeme
+            # the limit is evaluated every iteration, so it must not assign i either
+            or not _counter_is_private(limit, name.lexeme)
+            or not _counter_is_private(body, name.lexeme)
+        ):
+            return
+        block.__class__ = CountingLoopStmt
+        block.__dict__.update(
+            slot=counter[1],
+            start=start,
+            limit=limit,
+            compare=compare,
+            test=_COMPARE_OPS[compare.type],
+            step=step if step_op.type == TokenType.PLUS else -step,
+            body=body,
+            loop=loop,
+        )
+
+    def _function(self, function: ast.FunctionStmt) -> None:
+        if isinstance(function, LazyFunctionStmt) and not function.parsed:
+            # runs after the resolver's hook, once the body is resolved
+            function.on_parse.append(self.statements)
+        else:
+            self.statements(function.body)
+
+    def _expr(self, expr: ast.Expr) -> None:
+        # children first: a fused parent no longer visits them generically,
+        # but the ones it still evaluates may fuse themselves
+        match expr:
+            case ast.GroupingExpr(inner) | ast.UnaryExpr(_, inner) | ast.GetExpr(inner, _):
+                self._expr(inner)
+            case ast.BinaryExpr(left, _, right) | ast.LogicalExpr(left, _, right):
+                self._expr(left)
+                self._expr(right)
+            case ast.AssignExpr(_, value):
+                self._expr(value)
+            case ast.SetExpr(obj, _, value):
+                self._expr(obj)
+                self._expr(value)
+            case ast.CallExpr(ast.GetExpr(obj, _), arguments, _):
+                # a method call does not evaluate its callee node
+                self._expr(obj)
+                for argument in arguments:
+                    self._expr(argument)
+            case ast.CallExpr(callee, arguments, _):
+                self._expr(callee)
+                for argument in arguments:
+                    self._expr(argument)
+        match expr:
+            case ast.AssignExpr(name, ast.BinaryExpr(ast.VariableExpr() as read, op, _)):
+                if (
+                    expr.depth >= 0
+                    and read.name.lexeme == name.lexeme
+                    and _binding(read) == _binding(expr)
+                    and op.type in _UPDATE_OPS
+                ):
+                    expr.__class__ = LocalUpdateExpr
+                    expr.__dict__["fn"] = _UPDATE_OPS[op.type]
+            case ast.BinaryExpr(ast.VariableExpr() as left, op, ast.VariableExpr() as right):
+                if left.depth >= 0 and right.depth >= 0 and op.type in _LOCAL_OPS:
+                    expr.__class__ = LocalBinaryExpr
+                    expr.__dict__.update(
+                        left_at=_binding(left), right_at=_binding(right), fn=_LOCAL_OPS[op.type]
+                    )
+            case ast.GetExpr(ast.ThisExpr() as this, _):
+                expr.__class__ = ThisGetExpr
+                caches = self._interpreter.inline_caches
+                expr.__dict__.update(distance=this.depth, cache=GetCache(expr.name, caches))
+            case ast.SetExpr(ast.ThisExpr() as this, _, _):
+                expr.__class__ = ThisSetExpr
+                caches = self._interpreter.inline_caches
+                expr.__dict__.update(distance=this.depth, cache=SetCache(expr.name, caches))
+            case ast.CallExpr(ast.GetExpr() as callee, _, _):
+                expr.__class__ = MethodCallExpr
+                caches = self._interpreter.inline_caches
+                expr.__dict__["cache"] = GetCache(callee.name, caches)
+            case ast.CallExpr(ast.VariableExpr() as callee, arguments, _):
+                cell = callee.cell
+                if cell is None:
+                    return
+                native = cell.value
+                if isinstance(native, NativeFunction) and native.arity() == len(arguments):
+                    expr.__class__ = NativeCallExpr
+                    expr.__dict__.update(native=native, assumption=cell.assume())
+
+
+def _binding(expr: ast.Expr) -> tuple[int, int] | None:
+    """(depth, slot) of a resolved local reference, else None."""
+    if isinstance(expr, ast.Resolved) and expr.depth >= 0:
+        return expr.depth, expr.slot
+    return None
+
+
+def _counter_is_private(code: ast.Stmt | ast.Expr, name: str) -> bool:
+    """True if ``code`` cannot assign ``name`` or capture it in a closure."""
+    for node in _walk(code):
+        match node:
+            case ast.AssignExpr(assigned, _) if assigned.lexeme == name:
+                return False
+            case ast.FunctionStmt():
+                if isinstance(node, LazyFunctionStmt) and not node.parsed:
+                    return False  # can't tell without parsing it
+                for inner in _walk(node):
+                    if isinstance(inner, ast.VariableExpr) and inner.name.lexeme == name:
+                        return False
+    return True
+
+
+def _walk(node: ast.Stmt | ast.Expr) -> Iterator[ast.Stmt | ast.Expr]:
+    """Yield a node and all nodes below it, including function bodies."""
+    yield node
+    match node:
+        case (
+            ast.ExpressionStmt(child)
+            | ast.PrintStmt(child)
+            | ast.GroupingExpr(child)
+            | ast.UnaryExpr(_, child)
+            | ast.AssignExpr(_, child)
+            | ast.GetExpr(child, _)
+        ):
+            yield from _walk(child)
+        case ast.LetStmt(_, optional) | ast.ReturnStmt(_, optional):
+            if optional is not None:
+                yield from _walk(optional)
+        case ast.BlockStmt(statements):
+            for stmt in statements:
+                yield from _walk(stmt)
+        case ast.IfStmt(condition, then_branch, else_branch):
+            yield from _walk(condition)
+            yield from _walk(then_branch)
+            if else_branch is not None:
+                yield from _walk(else_branch)
+        case ast.WhileStmt(condition, body):
+            yield from _walk(condition)
+            yield from _walk(body)
+        case ast.FunctionStmt():
+            if not (isinstance(node, LazyFunctionStmt) and not node.parsed):
+                for stmt in node.body:
+                    yield from _walk(stmt)
+        case ast.ClassStmt(_, _, methods):
+            for method in methods:
+                yield from _walk(method)
+        case ast.BinaryExpr(left, _, right) | ast.LogicalExpr(left, _, right):
+            yield from _walk(left)
+            yield from _walk(right)
+        case ast.SetExpr(obj, _, value):
+            yield from _walk(obj)
+            yield from _walk(value)
+        case ast.CallExpr(callee, arguments, _):
+            yield from _walk(callee)
+            for argument in arguments:
+                yield from _walk(argument)
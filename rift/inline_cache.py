@@ -0,0 +1,150 @@
+"""Inline caches for property reads and writes on ``RiftInstance``.
+
+Every ``obj.name`` and ``obj.name = e`` site the tree-walker quickens or
+fuses, and every one the closure compiler compiles, owns a cache of where
+``name`` lives for each receiver shape it has seen: a field's slot, a method
+of the shape's class, or (for writes) the shape an added field leads to. A
+shape never changes and belongs to one class, whose methods never change
+either, so entries never go stale and the shape's identity is the only guard.
+
+A site starts monomorphic: its first field entry is also kept in ``shape``
+and ``slot``, which the site checks inline before calling into the cache.
+Up to ``MAX_SHAPES`` shapes are cached; after that the site is megamorphic
+and takes the uncached path for good.
+
+Setting ``Interpreter.inline_caches`` to a list (``rift --ic-stats``) makes
+every new cache register there and count its hits and misses. Counting caches
+leave the inline entry empty, so every access reaches them.
+"""
+
+from __future__ import annotations
+
+from rift.callable import RiftFunction
+from rift.instance import RiftInstance, Shape
+from rift.tokens import Token
+
+# shapes a site caches before it gives up on caching
+MAX_SHAPES = 4
+
+
+class PropertyCache:
+    """The state shared by get and set caches."""
+
+    __slots__ = ("_inline", "entries", "hits", "misses", "name", "shape", "slot")
+
+    def __init__(self, name: Token, registry: list[PropertyCache] | None = None) -> None:
+        self.name = name
+        # the monomorphic entry, checked by the site itself
+        self.shape: Shape | None = None
+        self.slot = 0
+        # None once the site is megamorphic
+        self.entries: dict[Shape, int | RiftFunction | Shape] | None = {}
+        self.hits = 0
+        self.misses = 0
+        self._inline = registry is None
+        if registry is not None:
+            registry.append(self)
+
+    def _add(self, shape: Shape, entry: int | RiftFunction | Shape) -> None:
+        assert self.entries is not None
+        if len(self.entries) == MAX_SHAPES:
+            self.entries = None
+            return
+        self.entries[shape] = entry
+        if type(entry) is int and self.shape is None and self._inline:
+            self.shape = shape
+            self.slot = entry
+
+    @property
+    def state(self) -> str:
+        if self.entries is None:
+            return "megamorphic"
+        return "polymorphic" if len(self.entries) > 1 else "monomorphic"
+
+
+class GetCache(PropertyCache):
+    __slots__ = ()
+
+    def get(self, instance: RiftInstance) -> object:
+        """``instance.name``, for a receiver the inline entry did not match."""
+        entry = self._find(instance)
+        if type(entry) is int:
+            return instance.values[entry]
+        if entry is None:
+            return instance.get(self.name)
+        assert isinstance(entry, RiftFunction)
+        return entry.bind(instance)
+
+    def method(self, instance: RiftInstance) -> RiftFunction | None:
+        """The unbound method ``instance.name`` names, or None for a field.
+
+        None also stands for a missing property or a megamorphic site; the
+        caller then takes the uncached path, which raises as usual.
+        """
+        entry = self._find(instance)
+        return entry if isinstance(entry, RiftFunction) else None
+
+    def _find(self, instance: RiftInstance) -> int | RiftFunction | None:
+        # a field's slot or a method, or None when the site does not know
+        shape = instance.shape
+        if self.entries is not None:
+            entry = self.entries.get(shape)
+            if entry is not None:
+                self.hits += 1
+                assert not isinstance(entry, Shape)
+                return entry
+        self.misses += 1
+        if self.entries is None:
+            return None
+        slot = shape.slots.get(self.name.lexeme)
+        if slot is not None:
+            self._add(shape, slot)
+            return slot
+        method = instance.klass.find_method(self.name.lexeme)
+        if method is not None:
+            self._add(shape, method)
+        return method
+
+
+class SetCache(PropertyCache):
+    __slots__ = ()
+
+    def set(self, instance: RiftInstance, value: object) -> None:
+        """``instance.name = value``, for a receiver the inline entry did not match."""
+        shape = instance.shape
+        if self.entries is not None:
+            entry = self.entries.get(shape)
+            if entry is not None:
+                self.hits += 1
+                if type(entry) is int:
+                    instance.values[entry] = value
+                else:
+                    assert isinstance(entry, Shape)
+                    instance.shape = entry
+                    instance.values.append(value)
+                return
+        self.misses += 1
+        instance.set(self.name, value)
+        if self.entries is not None:
+            slot = shape.slots.get(self.name.lexeme)
+            self._add(shape, instance.shape if slot is None else slot)
+
+
+def report(caches: list[PropertyCache]) -> str:
+    """Hit rates of ``caches``, one line per site and a total."""
+    lines = []
+    hits = total = 0
+    for cache in sorted(caches, key=lambda c: (c.name.line, c.name.lexeme)):
+        count = cache.hits + cache.misses
+        if not count:
+            continue
+        hits += cache.hits
+        total += count
+        kind = "get" if isinstance(cache, GetCache) else "set"
+        lines.append(
+            f"[line {cache.name.line}] {kind} .{cache.name.lexeme}: "
+            f"{cache.hits}/{count} hits ({cache.hits / count:.1%}), {cache.state}"
+        )
+    rate = f"{hits / total:.1%}" if total else "n/a"
+    lines.append(f"inline caches: {hits}/{total} hits ({rate}) at {len(lines)} sites")
+    return "\n".join(lines)
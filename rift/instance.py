@@ -9,14 +9,43 @@ if TYPE_CHECKING:
     from rift.callable import RiftClass
 
 
+class Shape:
+    """Field layout shared by the instances that gained the same fields in order.
+
+    ``slots`` maps each field name to its index in ``RiftInstance.values``.
+    Adding a field moves an instance to the shape one transition further on,
+    so instances built the same way (typically by the same ``init``) share
+    every shape along the way. Each class has its own root shape, so a shape
+    also tells the instance's class.
+    """
+
+    __slots__ = ("slots", "transitions")
+
+    def __init__(self, slots: dict[str, int] | None = None) -> None:
+        self.slots: dict[str, int] = {} if slots is None else slots
+        self.transitions: dict[str, Shape] = {}
+
+    def adding(self, name: str) -> Shape:
+        """The shape after adding field ``name``, which this shape lacks."""
+        shape = self.transitions.get(name)
+        if shape is None:
+            shape = self.transitions[name] = Shape({**self.slots, name: len(self.slots)})
+        return shape
+
+
 class RiftInstance:
+    __slots__ = ("klass", "shape", "values")
+
     def __init__(self, klass: RiftClass) -> None:
         self.klass = klass
-        self.fields: dict[str, object] = {}
+        self.shape = klass.shape
+        # field values, in the order the shape gives them
+        self.values: list[object] = []
 
     def get(self, name: Token) -> object:
-        if name.lexeme in self.fields:
-            return self.fields[name.lexeme]
+        slot = self.shape.slots.get(name.lexeme)
+        if slot is not None:
+            return self.values[slot]
 
         method = self.klass.find_method(name.lexeme)
         if method is not None:
@@ -25,7 +54,12 @@ class RiftInstance:
         raise RiftRuntimeError(name, f"undefined property '{name.lexeme}'")
 
     def set(self, name: Token, value: object) -> None:
-        self.fields[name.lexeme] = value
+        slot = self.shape.slots.get(name.lexeme)
+        if slot is None:
+            self.shape = self.shape.adding(name.lexeme)
+            self.values.append(value)
+        else:
+            self.values[slot] = value
 
     def __repr__(self) -> str:
         return f"<{self.klass.name} instance>"
@@ -1,177 +1,402 @@
 from __future__ import annotations
 
+import math
+from collections.abc import Callable
+from functools import partial
+from typing import Any
+
 from rift import ast_nodes as ast
 from rift.callable import NativeFunction, RiftClass, RiftFunction
-from rift.environment import Environment
-from rift.errors import ReturnException, RiftRuntimeError
+from rift.completion import NORMAL, TailCall
+from rift.environment import Environment, EnvironmentPool
+from rift.errors import OutOfFuelError, RiftRuntimeError
+from rift.fuse import Fused, fuse
+from rift.inline_cache import PropertyCache
 from rift.instance import RiftInstance
+from rift.jit import LoopJit
+from rift.quicken import (
+    Quickened,
+    quicken_binary,
+    quicken_call,
+    quicken_get,
+    quicken_set,
+    quicken_unary,
+)
 from rift.stdlib import define_natives, stringify
+from rift.tiering import UNDEFINED, GlobalEnvironment, Tiering
 from rift.tokens import Token, TokenType
 
 
+class _Dispatch(dict[type, Callable[[Any], object]]):
+    """Handler table keyed by node class.
+
+    A class without its own entry resolves on first sight: a quickened or
+    fused node to its own ``execute``, bound to the interpreter through a
+    ``partial`` so no Python frame sits in between, any other to the handler
+    of its nearest registered base.
+    """
+
+    def __init__(
+        self, interpreter: Interpreter, handlers: dict[type, Callable[[Any], object]]
+    ) -> None:
+        super().__init__(handlers)
+        self._interpreter = interpreter
+
+    def __missing__(self, cls: type) -> Callable[[Any], object]:
+        handler: Callable[[Any], object]
+        if issubclass(cls, (Quickened, Fused)):
+            handler = self[cls] = partial(cls.execute, interpreter=self._interpreter)
+            return handler
+        for base in cls.__mro__[1:]:
+            if base in self:
+                handler = self[cls] = self[base]
+                return handler
+        raise TypeError(f"no handler for {cls.__name__}")
+
+
 class Interpreter:
-    def __init__(self) -> None:
-        self.globals = Environment()
-        self._environment = self.globals
-        self._locals: dict[int, int] = {}  # expr id -> depth
+    def __init__(
+        self,
+        jit: bool = True,
+        tiering: bool = True,
+        tco: bool = True,
+        fusion: bool = True,
+        fuel: int | None = None,
+    ) -> None:
+        self.globals = GlobalEnvironment()
+        self._environment: Environment = self.globals
+        self._loop_jit = LoopJit(self) if jit else None
+        self._tiering = Tiering(self) if tiering else None
+        # run `return f(...)` as a proper tail call
+        self.tco = tco
+        # rewrite common idioms into fused nodes before running them
+        self.fusion = fusion
+        # work left before OutOfFuelError: one unit per loop iteration and per
+        # call. Unmetered runs count down from infinity, so every engine pays
+        # the same decrement and compare and has no extra branch.
+        self.fuel: float = math.inf if fuel is None else fuel
+        # environments recycled between calls that no closure can outlive
+        self.frame_pool = EnvironmentPool()
+        # when a list, property inline caches register here and count their
+        # hits (rift --ic-stats)
+        self.inline_caches: list[PropertyCache] | None = None
+        # bound per instance so engines that override a handler get theirs
+        self._stmt_handlers = _Dispatch(self, {
+            ast.ExpressionStmt: self._expression_stmt,
+            ast.PrintStmt: self._print_stmt,
+            ast.LetStmt: self._let_stmt,
+            ast.BlockStmt: self._block_stmt,
+            ast.IfStmt: self._if_stmt,
+            ast.WhileStmt: self._while_stmt,
+            ast.FunctionStmt: self._function_stmt,
+            ast.ReturnStmt: self._return_stmt,
+            ast.ClassStmt: self._class_stmt,
+        })
+        self._expr_handlers = _Dispatch(self, {
+            ast.LiteralExpr: self._literal_expr,
+            ast.GroupingExpr: self._grouping_expr,
+            ast.UnaryExpr: self._unary_expr,
+            ast.BinaryExpr: self._binary_expr,
+            ast.VariableExpr: self._variable_expr,
+            ast.AssignExpr: self._assign_expr,
+            ast.LogicalExpr: self._logical_expr,
+            ast.CallExpr: self._call_expr,
+            ast.GetExpr: self._get_expr,
+            ast.SetExpr: self._set_expr,
+            ast.ThisExpr: self._this_expr,
+            ast.SuperExpr: self._super_expr,
+        })
         define_natives(self.globals)
 
     def interpret(self, statements: list[ast.Stmt]) -> None:
+        if self.fusion:
+            fuse(statements, self)
         for stmt in statements:
             self._execute(stmt)
 
-    def resolve(self, expr: ast.Expr, depth: int) -> None:
-        self._locals[id(expr)] = depth
-
-    def _execute(self, stmt: ast.Stmt) -> None:
-        match stmt:
-            case ast.ExpressionStmt(expression):
-                self._evaluate(expression)
-            case ast.PrintStmt(expression):
-                value = self._evaluate(expression)
-                print(stringify(value))
-            case ast.LetStmt(name, initializer):
-                initial_value: object = None
-                if initializer is not None:
-                    initial_value = self._evaluate(initializer)
-                self._environment.define(name.lexeme, initial_value)
-            case ast.BlockStmt(statements):
-                self._execute_block(statements, Environment(self._environment))
-            case ast.IfStmt(condition, then_branch, else_branch):
-                if self._is_truthy(self._evaluate(condition)):
-                    self._execute(then_branch)
-                elif else_branch is not None:
-                    self._execute(else_branch)
-            case ast.WhileStmt(condition, body):
-                while self._is_truthy(self._evaluate(condition)):
-                    self._execute(body)
-            case ast.FunctionStmt(name, _, _):
-                function = RiftFunction(stmt, self._environment)
-                self._environment.define(name.lexeme, function)
-            case ast.ReturnStmt(_, value):
-                ret_val: object = None
-                if value is not None:
-                    ret_val = self._evaluate(value)
-                raise ReturnException(ret_val)
-            case ast.ClassStmt(name, superclass_expr, methods):
-                superclass: RiftClass | None = None
-                if superclass_expr is not None:
-                    resolved_superclass = self._evaluate(superclass_expr)
-                    if not isinstance(resolved_superclass, RiftClass):
-                        raise RiftRuntimeError(
-                            superclass_expr.name, "superclass must be a class"
-                        )
-                    superclass = resolved_superclass
-
-                self._environment.define(name.lexeme, None)
-
-                if superclass is not None:
-                    self._environment = Environment(self._environment)
-                    self._environment.define("super", superclass)
-
-                method_map: dict[str, RiftFunction] = {}
-                for method in methods:
-                    is_init = method.name.lexeme == "init"
-                    fn = RiftFunction(method, self._environment, is_init)
-                    method_map[method.name.lexeme] = fn
-
-                klass = RiftClass(name.lexeme, superclass, method_map)
-
-                if superclass is not None:
-                    assert self._environment.enclosing is not None
-                    self._environment = self._environment.enclosing
-
-                self._environment.assign(name, klass)
-
-    def _execute_block(self, statements: list[ast.Stmt], environment: Environment) -> None:
+    def resolve(self, expr: ast.Resolved, depth: int, slot: int) -> None:
+        expr.depth = depth
+        expr.slot = slot
+        expr.cell = None
+
+    def resolve_global(self, expr: ast.Resolved, name: str) -> None:
+        expr.depth = -1
+        expr.cell = self.globals.cell(name)
+
+    # returns the statement's completion: NORMAL or a return in progress
+    def _execute(self, stmt: ast.Stmt) -> object:
+        return self._stmt_handlers[type(stmt)](stmt)
+
+    # Handlers on the path a Rift call recurses through (blocks, if, let,
+    # expression and return statements, binary operators and calls) index
+    # the tables themselves instead of calling _execute or _evaluate: every
+    # Python frame per Rift call lowers the Rift recursion depth reachable
+    # before a RecursionError.
+
+    def _execute_block(self, statements: list[ast.Stmt], environment: Environment) -> object:
         previous = self._environment
+        handlers = self._stmt_handlers
         try:
             self._environment = environment
             for stmt in statements:
-                self._execute(stmt)
+                completion = handlers[type(stmt)](stmt)
+                if completion is not NORMAL:
+                    return completion
+            return NORMAL
         finally:
             self._environment = previous
 
     def _evaluate(self, expr: ast.Expr) -> object:
-        match expr:
-            case ast.LiteralExpr(value):
-                return value
-            case ast.GroupingExpr(expression):
-                return self._evaluate(expression)
-            case ast.UnaryExpr(operator, operand):
-                right = self._evaluate(operand)
-                match operator.type:
-                    case TokenType.MINUS:
-                        self._check_number_operand(operator, right)
-                        return -float(right)  # type: ignore[arg-type]
-                    case TokenType.BANG:
-                        return not self._is_truthy(right)
-                return None
-            case ast.BinaryExpr(left_node, operator, right_node):
-                left = self._evaluate(left_node)
-                right = self._evaluate(right_node)
-                return self._eval_binary(operator, left, right)
-            case ast.VariableExpr(name):
-                return self._lookup_variable(name, expr)
-            case ast.AssignExpr(name, value_expr):
-                value = self._evaluate(value_expr)
-                distance = self._locals.get(id(expr))
-                if distance is not None:
-                    self._environment.assign_at(distance, name, value)
-                else:
-                    self.globals.assign(name, value)
-                return value
-            case ast.LogicalExpr(left_node, operator, right_node):
-                left = self._evaluate(left_node)
-                if operator.type == TokenType.OR:
-                    if self._is_truthy(left):
-                        return left
-                else:
-                    if not self._is_truthy(left):
-                        return left
-                return self._evaluate(right_node)
-            case ast.CallExpr(callee_expr, arguments, paren):
-                callee = self._evaluate(callee_expr)
-                args = [self._evaluate(a) for a in arguments]
-
-                if not isinstance(callee, (RiftFunction, RiftClass, NativeFunction)):
-                    raise RiftRuntimeError(paren, "can only call functions and classes")
-
-                if len(args) != callee.arity():
-                    raise RiftRuntimeError(
-                        paren,
-                        f"expected {callee.arity()} arguments but got {len(args)}",
-                    )
-                return callee.call(self, args)
-            case ast.GetExpr(obj_expr, name):
-                obj = self._evaluate(obj_expr)
-                if isinstance(obj, RiftInstance):
-                    return obj.get(name)
-                raise RiftRuntimeError(name, "only instances have properties")
-            case ast.SetExpr(obj_expr, name, value_expr):
-                obj = self._evaluate(obj_expr)
-                if not isinstance(obj, RiftInstance):
-                    raise RiftRuntimeError(name, "only instances have fields")
-                value = self._evaluate(value_expr)
-                obj.set(name, value)
-                return value
-            case ast.ThisExpr(keyword):
-                return self._lookup_variable(keyword, expr)
-            case ast.SuperExpr(keyword, method):
-                distance = self._locals.get(id(expr))
-                assert distance is not None
-                superclass = self._environment.get_at(distance, "super")
-                assert isinstance(superclass, RiftClass)
-                # 'this' is always one scope inside 'super'
-                instance = self._environment.get_at(distance - 1, "this")
-                assert isinstance(instance, RiftInstance)
-                m = superclass.find_method(method.lexeme)
-                if m is None:
-                    raise RiftRuntimeError(
-                        method, f"undefined property '{method.lexeme}'"
-                    )
-                return m.bind(instance)
-        return None  # unreachable
+        return self._expr_handlers[type(expr)](expr)
+
+    # -- statements --
+
+    def _expression_stmt(self, stmt: ast.ExpressionStmt) -> object:
+        expression = stmt.expression
+        self._expr_handlers[type(expression)](expression)
+        return NORMAL
+
+    def _print_stmt(self, stmt: ast.PrintStmt) -> object:
+        print(stringify(self._evaluate(stmt.expression)))
+        return NORMAL
+
+    def _let_stmt(self, stmt: ast.LetStmt) -> object:
+        initial_value: object = None
+        initializer = stmt.initializer
+        if initializer is not None:
+            initial_value = self._expr_handlers[type(initializer)](initializer)
+        self._define(stmt, initial_value)
+        return NORMAL
+
+    def _block_stmt(self, stmt: ast.BlockStmt) -> object:
+        if stmt.scope_size is not None:
+            environment = Environment(self._environment, [None] * stmt.scope_size)
+            return self._execute_block(stmt.statements, environment)
+        # the block's variables, if any, have slots in the current environment
+        for inner in stmt.statements:
+            completion = self._execute(inner)
+            if completion is not NORMAL:
+                if stmt.clear_on_exit is not None:
+                    self._clear(stmt.clear_on_exit)
+                return completion
+        if stmt.clear_on_exit is not None:
+            self._clear(stmt.clear_on_exit)
+        return NORMAL
+
+    def _clear(self, slots: range) -> None:
+        # a folded block exits while a closure may keep its environment
+        values = self._environment.slots
+        for slot in slots:
+            values[slot] = None
+
+    def _if_stmt(self, stmt: ast.IfStmt) -> object:
+        if self._is_truthy(self._evaluate(stmt.condition)):
+            branch: ast.Stmt | None = stmt.then_branch
+        else:
+            branch = stmt.else_branch
+        if branch is None:
+            return NORMAL
+        return self._stmt_handlers[type(branch)](branch)
+
+    def _while_stmt(self, stmt: ast.WhileStmt) -> object:
+        condition, body = stmt.condition, stmt.body
+        loop_jit = self._loop_jit
+        while self._is_truthy(self._evaluate(condition)):
+            completion = self._execute(body)
+            if completion is not NORMAL:
+                return completion
+            self.fuel -= 1
+            if self.fuel < 0:
+                raise OutOfFuelError(stmt.keyword)
+            # a hot loop may finish in compiled code
+            if loop_jit is not None and loop_jit.back_edge(stmt, self._environment):
+                break
+        return NORMAL
+
+    def _function_stmt(self, stmt: ast.FunctionStmt) -> object:
+        self._define(stmt, RiftFunction(stmt, self._environment))
+        return NORMAL
+
+    def _return_stmt(self, stmt: ast.ReturnStmt) -> object:
+        value = stmt.value
+        if value is None:
+            return None
+        if self.tco and isinstance(value, ast.CallExpr):
+            return self._tail_call(value)
+        return self._expr_handlers[type(value)](value)
+
+    def _class_stmt(self, stmt: ast.ClassStmt) -> object:
+        name, superclass_expr = stmt.name, stmt.superclass
+        superclass: RiftClass | None = None
+        if superclass_expr is not None:
+            resolved_superclass = self._evaluate(superclass_expr)
+            if not isinstance(resolved_superclass, RiftClass):
+                raise RiftRuntimeError(superclass_expr.name, "superclass must be a class")
+            superclass = resolved_superclass
+
+        if superclass is not None:
+            self._environment = Environment(self._environment, [superclass])
+
+        method_map: dict[str, RiftFunction] = {}
+        for method in stmt.methods:
+            is_init = method.name.lexeme == "init"
+            fn = RiftFunction(method, self._environment, is_init)
+            method_map[method.name.lexeme] = fn
+
+        klass = RiftClass(name.lexeme, superclass, method_map)
+
+        if superclass is not None:
+            assert self._environment.enclosing is not None
+            self._environment = self._environment.enclosing
+
+        # defined only now: nothing in between can see the name
+        self._define(stmt, klass)
+        return NORMAL
+
+    def _define(
+        self, declaration: ast.LetStmt | ast.FunctionStmt | ast.ClassStmt, value: object
+    ) -> None:
+        if declaration.slot >= 0:
+            self._environment.slots[declaration.slot] = value
+        else:
+            self.globals.define(declaration.name.lexeme, value)
+
+    def _burn(self, token: Token) -> None:
+        """Charge one unit of fuel; for engines that can't inline the check."""
+        self.fuel -= 1
+        if self.fuel < 0:
+            raise OutOfFuelError(token)
+
+    # -- expressions --
+
+    def _literal_expr(self, expr: ast.LiteralExpr) -> object:
+        return expr.value
+
+    def _grouping_expr(self, expr: ast.GroupingExpr) -> object:
+        return self._evaluate(expr.expression)
+
+    def _unary_expr(self, expr: ast.UnaryExpr) -> object:
+        operator = expr.operator
+        right = self._evaluate(expr.operand)
+        quicken_unary(expr, right)
+        if operator.type == TokenType.MINUS:
+            self._check_number_operand(operator, right)
+            return -float(right)  # type: ignore[arg-type]
+        return not self._is_truthy(right)
+
+    def _binary_expr(self, expr: ast.BinaryExpr) -> object:
+        handlers = self._expr_handlers
+        left = handlers[type(expr.left)](expr.left)
+        right = handlers[type(expr.right)](expr.right)
+        quicken_binary(expr, left, right)
+        return self._eval_binary(expr.operator, left, right)
+
+    def _variable_expr(self, expr: ast.VariableExpr) -> object:
+        return self._lookup_variable(expr.name, expr)
+
+    def _assign_expr(self, expr: ast.AssignExpr) -> object:
+        value = self._evaluate(expr.value)
+        if expr.depth >= 0:
+            self._environment.assign_at(expr.depth, expr.slot, value)
+        else:
+            expr.cell.assign(expr.name, value)  # type: ignore[union-attr]
+        return value
+
+    def _logical_expr(self, expr: ast.LogicalExpr) -> object:
+        left = self._evaluate(expr.left)
+        if expr.operator.type == TokenType.OR:
+            if self._is_truthy(left):
+                return left
+        else:
+            if not self._is_truthy(left):
+                return left
+        return self._evaluate(expr.right)
+
+    def _call_expr(self, expr: ast.CallExpr) -> object:
+        callee = self._evaluate(expr.callee)
+        args = self._arguments(expr.arguments)
+        return self._callable(callee, args, expr.paren, expr).call(self, args)
+
+    def _get_expr(self, expr: ast.GetExpr) -> object:
+        obj = self._evaluate(expr.object)
+        quicken_get(expr, obj, self)
+        return self._get_property(obj, expr.name)
+
+    def _set_expr(self, expr: ast.SetExpr) -> object:
+        obj = self._evaluate(expr.object)
+        if not isinstance(obj, RiftInstance):
+            raise RiftRuntimeError(expr.name, "only instances have fields")
+        quicken_set(expr, obj, self)
+        value = self._evaluate(expr.value)
+        obj.set(expr.name, value)
+        return value
+
+    def _this_expr(self, expr: ast.ThisExpr) -> object:
+        return self._lookup_variable(expr.keyword, expr)
+
+    def _super_expr(self, expr: ast.SuperExpr) -> object:
+        method = expr.method
+        distance = expr.depth
+        superclass = self._environment.get_at(distance, 0)
+        assert isinstance(superclass, RiftClass)
+        # 'this' is always one scope inside 'super', and alone in each
+        instance = self._environment.get_at(distance - 1, 0)
+        assert isinstance(instance, RiftInstance)
+        m = superclass.find_method(method.lexeme)
+        if m is None:
+            raise RiftRuntimeError(method, f"undefined property '{method.lexeme}'")
+        return m.bind(instance)
+
+    # -- helpers --
+
+    def _tail_call(self, call: ast.CallExpr) -> object:
+        callee = self._evaluate(call.callee)
+        args = self._arguments(call.arguments)
+        if isinstance(callee, RiftFunction) and callee.arity() == len(args):
+            return TailCall(callee, args)
+        return self._call_function(callee, args, call.paren)
+
+    def _arguments(self, nodes: list[ast.Expr]) -> list[object]:
+        """The values of a call's arguments, in a new list the callee may keep."""
+        # a list comprehension is a function call of its own before
+        # Python 3.12, so the usual counts get a display instead
+        evaluate = self._evaluate
+        argc = len(nodes)
+        if argc == 0:
+            return []
+        if argc == 1:
+            return [evaluate(nodes[0])]
+        if argc == 2:
+            return [evaluate(nodes[0]), evaluate(nodes[1])]
+        if argc == 3:
+            return [evaluate(nodes[0]), evaluate(nodes[1]), evaluate(nodes[2])]
+        return [evaluate(a) for a in nodes]
+
+    def _call_function(
+        self, callee: object, args: list[object], paren: Token, site: ast.CallExpr | None = None
+    ) -> object:
+        return self._callable(callee, args, paren, site).call(self, args)
+
+    def _callable(
+        self, callee: object, args: list[object], paren: Token, site: ast.CallExpr | None = None
+    ) -> RiftFunction | RiftClass | NativeFunction:
+        """``callee``, checked to be callable with ``args``; quickens ``site``."""
+        if not isinstance(callee, (RiftFunction, RiftClass, NativeFunction)):
+            raise RiftRuntimeError(paren, "can only call functions and classes")
+
+        if len(args) != callee.arity():
+            raise RiftRuntimeError(
+                paren,
+                f"expected {callee.arity()} arguments but got {len(args)}",
+            )
+        if site is not None:
+            quicken_call(site, callee)
+        return callee
+
+    def _get_property(self, obj: object, name: Token) -> object:
+        if isinstance(obj, RiftInstance):
+            return obj.get(name)
+        raise RiftRuntimeError(name, "only instances have properties")
 
     def _eval_binary(self, op: Token, left: object, right: object) -> object:
         match op.type:
@@ -217,11 +442,17 @@ class Interpreter:
                 return not self._is_equal(left, right)
         return None  # unreachable
 
-    def _lookup_variable(self, name: Token, expr: ast.Expr) -> object:
-        distance = self._locals.get(id(expr))
-        if distance is not None:
-            return self._environment.get_at(distance, name.lexeme)
-        return self.globals.get(name)
+    def _lookup_variable(self, name: Token, expr: ast.Resolved) -> object:
+        depth = expr.depth
+        if depth == 0:
+            return self._environment.slots[expr.slot]
+        if depth > 0:
+            return self._environment.get_at(depth, expr.slot)
+        cell = expr.cell
+        value = cell.value  # type: ignore[union-attr]
+        if value is UNDEFINED:
+            raise cell.undefined(name)  # type: ignore[union-attr]
+        return value
 
     @staticmethod
     def _is_truthy(value: object) -> bool:
@@ -0,0 +1,351 @@
+"""Tracing JIT for hot while-loops in the tree-walker.
+
+``Interpreter`` reports every back-edge of a ``while`` loop to ``LoopJit``.
+Once a loop has run ``HOT_LOOP`` iterations, the JIT records a trace: the
+node kinds the loop contains and the types of every outer variable it
+touches. If the loop only uses straight-line code (no calls, property access,
+functions or classes) and every value type can be derived from the recorded
+ones, it is compiled into a Python function where numbers are plain floats
+and operators need no type checks.
+
+Compiled loops are entered between iterations, so a loop that turns hot is
+switched over mid-run. Each entry is guarded on the recorded types; on a
+mismatch the tree-walker simply keeps going. The compiled function reads
+outer variables into Python locals and writes assigned ones back to their
+environments on exit, including when a runtime error escapes. The
+interpreter's fuel is handled the same way: read into a local on entry,
+charged once per iteration of every loop, written back on exit.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from rift import ast_nodes as ast
+from rift.environment import Environment
+from rift.errors import OutOfFuelError, RiftRuntimeError
+from rift.stdlib import stringify
+from rift.tokens import Token, TokenType
+
+if TYPE_CHECKING:
+    from rift.interpreter import Interpreter
+    from rift.tiering import GlobalCell
+
+# back-edges before a loop is traced and compiled
+HOT_LOOP = 50
+
+_TYPE_NAMES = {float: "num", bool: "bool", str: "str", type(None): "nil"}
+_GUARDS = {
+    "num": "type({v}) is not float",
+    "bool": "type({v}) is not bool",
+    "str": "type({v}) is not str",
+    "nil": "{v} is not None",
+}
+_NUM_OPS = {
+    TokenType.MINUS: "-",
+    TokenType.STAR: "*",
+}
+_COMPARE_OPS = {
+    TokenType.GREATER: ">",
+    TokenType.GREATER_EQUAL: ">=",
+    TokenType.LESS: "<",
+    TokenType.LESS_EQUAL: "<=",
+}
+
+
+class _Unsupported(Exception):
+    """The loop uses a node or a type combination the JIT does not compile."""
+
+
+def _zero_division(token: Token, message: str) -> object:
+    raise RiftRuntimeError(token, message)
+
+
+def _out_of_fuel(token: Token) -> None:
+    raise OutOfFuelError(token)
+
+
+@dataclass
+class CompiledLoop:
+    """A loop compiled against the outer variable types seen when it got hot."""
+
+    # distance from the loop's environment of each scope holding an outer
+    # local; the loop takes one slot list per entry. Globals are read through
+    # cells bound into the compiled code instead.
+    scopes: list[int]
+    run: Callable[..., bool]
+    source: str
+
+
+class LoopJit:
+    def __init__(self, interpreter: Interpreter) -> None:
+        self._interpreter = interpreter
+
+    def back_edge(self, stmt: ast.WhileStmt, environment: Environment) -> bool:
+        """Count one iteration; True if the rest of the loop ran compiled."""
+        count = stmt.back_edges = stmt.back_edges + 1
+        if count < HOT_LOOP:
+            return False
+        if count == HOT_LOOP:
+            # the one attempt: a loop that fails to compile stays interpreted
+            try:
+                stmt.compiled = _LoopCompiler(self._interpreter, stmt).compile(environment)
+            except _Unsupported:
+                pass
+        loop = stmt.compiled
+        if loop is None:
+            return False
+        return loop.run(*[environment._ancestor(d).slots for d in loop.scopes])
+
+    def compiled(self, stmt: ast.WhileStmt) -> CompiledLoop | None:
+        return stmt.compiled
+
+
+class _LoopCompiler:
+    """Type-specializes one while loop into Python source."""
+
+    def __init__(self, interpreter: Interpreter, stmt: ast.WhileStmt) -> None:
+        self._interpreter = interpreter
+        self._stmt = stmt
+        self._lines: list[str] = []
+        self._indent = 2
+        self._tokens: list[Token] = []
+        # outer variable (distance from loop env, slot) or (None, global name)
+        # -> python name
+        self._outer: dict[tuple[int | None, int | str], str] = {}
+        self._outer_types: dict[str, str] = {}
+        self._assigned: set[str] = set()
+        # environments inside the loop: slot -> (python name, type) of the
+        # variables the loop declares. The first is the loop's own
+        # environment, which blocks without an environment declare into.
+        self._scopes: list[dict[int, tuple[str, str]]] = [{}]
+        self._environment: Environment | None = None
+        # global read or written by the loop -> its cell
+        self._globals: dict[str, GlobalCell] = {}
+        self._names = 0
+
+    def compile(self, environment: Environment) -> CompiledLoop:
+        self._environment = environment
+        self._loop(self._stmt)
+
+        scopes = sorted({d for d, _ in self._outer if d is not None})
+        params = [f"_e{i}" for i in range(len(scopes))]
+        header = [f"def _loop({', '.join(params)}):"]
+        for (distance, key), py_name in self._outer.items():
+            header.append(f"    {py_name} = {self._outer_ref(params, scopes, distance, key)}")
+            guard = _GUARDS[self._outer_types[py_name]].format(v=py_name)
+            header.append(f"    if {guard}:")
+            header.append("        return False")
+        header.append("    _fuel = _I.fuel")
+        header.append("    try:")
+        footer = ["    finally:", "        _I.fuel = _fuel"]
+        for (distance, key), py_name in self._outer.items():
+            if py_name in self._assigned:
+                footer.append(
+                    f"        {self._outer_ref(params, scopes, distance, key)} = {py_name}"
+                )
+        footer.append("    return True")
+        source = "\n".join(header + self._lines + footer) + "\n"
+
+        namespace: dict[str, object] = {
+            "_T": self._tokens,
+            "_zero_division": _zero_division,
+            "_out_of_fuel": _out_of_fuel,
+            "_I": self._interpreter,
+            "_str": stringify,
+        }
+        for name, cell in self._globals.items():
+            namespace[f"_c_{name}"] = cell
+        exec(compile(source, "<rift-jit>", "exec"), namespace)  # noqa: S102
+        run = namespace["_loop"]
+        assert callable(run)
+        return CompiledLoop(scopes, run, source)
+
+    @staticmethod
+    def _outer_ref(
+        params: list[str], scopes: list[int], distance: int | None, key: int | str
+    ) -> str:
+        """Python expression for an outer variable's storage."""
+        if distance is None:
+            return f"_c_{key}.value"
+        return f"{params[scopes.index(distance)]}[{key}]"
+
+    # -- output --
+
+    def _line(self, text: str) -> None:
+        self._lines.append("    " * self._indent + text)
+
+    def _nested(self, stmt: ast.Stmt) -> None:
+        self._indent += 1
+        start = len(self._lines)
+        self._stmt_code(stmt)
+        if len(self._lines) == start:
+            self._line("pass")
+        self._indent -= 1
+
+    def _loop(self, stmt: ast.WhileStmt) -> None:
+        self._line(f"while {self._condition(stmt.condition)}:")
+        self._nested(stmt.body)
+        self._indent += 1
+        self._line("_fuel -= 1")
+        self._line(f"if _fuel < 0: _out_of_fuel({self._tok(stmt.keyword)})")
+        self._indent -= 1
+
+    def _tok(self, token: Token) -> str:
+        self._tokens.append(token)
+        return f"_T[{len(self._tokens) - 1}]"
+
+    # -- statements --
+
+    def _stmt_code(self, stmt: ast.Stmt) -> None:
+        match stmt:
+            case ast.ExpressionStmt(expression):
+                match expression:
+                    case ast.AssignExpr(name, value):
+                        code, kind = self._expr(value)
+                        self._line(f"{self._assign_target(expression, name, kind)} = {code}")
+                    case _:
+                        self._line(self._expr(expression)[0])
+            case ast.PrintStmt(expression):
+                self._line(f"print(_str({self._expr(expression)[0]}))")
+            case ast.LetStmt(name, initializer):
+                code, kind = ("None", "nil") if initializer is None else self._expr(initializer)
+                self._names += 1
+                py_name = f"l{self._names}_{name.lexeme}"
+                self._line(f"{py_name} = {code}")
+                self._scopes[-1][stmt.slot] = (py_name, kind)
+            case ast.BlockStmt(statements, scope_size=size):
+                if size is not None:
+                    self._scopes.append({})
+                for inner in statements:
+                    self._stmt_code(inner)
+                if size is not None:
+                    self._scopes.pop()
+            case ast.IfStmt(condition, then_branch, else_branch):
+                self._line(f"if {self._condition(condition)}:")
+                self._nested(then_branch)
+                if else_branch is not None:
+                    self._line("else:")
+                    self._nested(else_branch)
+            case ast.WhileStmt():
+                self._loop(stmt)
+            case _:
+                raise _Unsupported(type(stmt).__name__)
+
+    # -- expressions --
+
+    def _condition(self, expr: ast.Expr) -> str:
+        code, kind = self._expr(expr)
+        return code if kind == "bool" else f"({code}) is not None"
+
+    def _expr(self, expr: ast.Expr) -> tuple[str, str]:
+        """Return (python expression, type: "num" | "bool" | "str" | "nil")."""
+        match expr:
+            case ast.LiteralExpr(value):
+                return repr(value), _TYPE_NAMES[type(value)]
+            case ast.GroupingExpr(expression):
+                code, kind = self._expr(expression)
+                return f"({code})", kind
+            case ast.UnaryExpr(operator, operand):
+                code, kind = self._expr(operand)
+                if operator.type == TokenType.BANG:
+                    return (f"(not {code})" if kind == "bool" else f"({code} is None)"), "bool"
+                if kind != "num":
+                    raise _Unsupported("unary minus on non-number")
+                return f"(-{code})", "num"
+            case ast.BinaryExpr(left, operator, right):
+                return self._binary(operator, self._expr(left), self._expr(right))
+            case ast.VariableExpr(name):
+                return self._variable(expr, name)
+            case ast.AssignExpr(name, value):
+                code, kind = self._expr(value)
+                return f"({self._assign_target(expr, name, kind)} := {code})", kind
+            case ast.LogicalExpr(left, operator, right):
+                left_code, left_kind = self._expr(left)
+                right_code, right_kind = self._expr(right)
+                if left_kind != right_kind:
+                    raise _Unsupported("logical operands of different types")
+                if left_kind == "bool":
+                    word = "or" if operator.type == TokenType.OR else "and"
+                    return f"({left_code} {word} {right_code})", "bool"
+                # nil is always falsy and numbers/strings always truthy
+                short_circuits = (left_kind == "nil") == (operator.type == TokenType.AND)
+                if short_circuits:
+                    return left_code, left_kind
+                return f"({left_code}, {right_code})[1]", left_kind
+        raise _Unsupported(type(expr).__name__)
+
+    def _binary(self, op: Token, left: tuple[str, str], right: tuple[str, str]) -> tuple[str, str]:
+        (a, a_kind), (b, b_kind) = left, right
+        if op.type == TokenType.EQUAL_EQUAL:
+            return f"({a} == {b})", "bool"
+        if op.type == TokenType.BANG_EQUAL:
+            return f"({a} != {b})", "bool"
+        if op.type == TokenType.PLUS and a_kind == b_kind == "str":
+            return f"({a} + {b})", "str"
+        if a_kind != "num" or b_kind != "num":
+            raise _Unsupported("arithmetic on non-numbers")
+        if op.type == TokenType.PLUS:
+            return f"({a} + {b})", "num"
+        if op.type in _NUM_OPS:
+            return f"({a} {_NUM_OPS[op.type]} {b})", "num"
+        if op.type in _COMPARE_OPS:
+            return f"({a} {_COMPARE_OPS[op.type]} {b})", "bool"
+        # the dividend is evaluated first, as the tree-walker does, even
+        # though the divisor must be tested before dividing
+        self._names += 1
+        dividend, divisor = f"_l{self._names}", f"_d{self._names}"
+        operands = f"(({dividend} := {a}), ({divisor} := {b}))[1]"
+        if op.type == TokenType.SLASH:
+            fail = f"_zero_division({self._tok(op)}, 'division by zero')"
+            return f"({dividend} / {divisor} if {operands} else {fail})", "num"
+        fail = f"_zero_division({self._tok(op)}, 'modulo by zero')"
+        return f"({dividend} % {divisor} if {operands} else {fail})", "num"
+
+    def _variable(self, expr: ast.Resolved, name: Token) -> tuple[str, str]:
+        local = self._block_local(expr)
+        if local is not None:
+            return local
+        py_name = self._outer_name(expr, name)
+        return py_name, self._outer_types[py_name]
+
+    def _assign_target(self, expr: ast.Resolved, name: Token, kind: str) -> str:
+        local = self._block_local(expr)
+        if local is not None:
+            py_name, local_kind = local
+        else:
+            py_name = self._outer_name(expr, name)
+            local_kind = self._outer_types[py_name]
+            self._assigned.add(py_name)
+        if kind != local_kind:
+            raise _Unsupported(f"'{name.lexeme}' changes type inside the loop")
+        return py_name
+
+    def _block_local(self, expr: ast.Resolved) -> tuple[str, str] | None:
+        if expr.depth < 0 or expr.depth >= len(self._scopes):
+            return None
+        return self._scopes[-1 - expr.depth].get(expr.slot)
+
+    def _outer_name(self, expr: ast.Resolved, name: Token) -> str:
+        cell = expr.cell
+        distance = None if cell is not None else expr.depth - len(self._scopes) + 1
+        key = (None, name.lexeme) if distance is None else (distance, expr.slot)
+        py_name = self._outer.get(key)
+        if py_name is None:
+            assert self._environment is not None
+            if cell is not None:
+                self._globals[name.lexeme] = cell
+                value = cell.value
+            else:
+                assert distance is not None
+                value = self._environment.get_at(distance, expr.slot)
+            kind = _TYPE_NAMES.get(type(value))
+            if kind is None:
+                raise _Unsupported(f"'{name.lexeme}' holds a {type(value).__name__}")
+            scope = "g" if distance is None else str(distance)
+            py_name = f"o{scope}_{name.lexeme}"
+            self._outer[key] = py_name
+            self._outer_types[py_name] = kind
+        return py_name
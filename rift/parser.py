@@ -1,15 +1,151 @@
 from __future__ import annotations
 
+from collections.abc import Callable
+
 from rift.tokens import Token, TokenType
-from rift.errors import ParseError
+from rift.errors import DeferredParseError, ParseError
 from rift import ast_nodes as ast
 
 
-class Parser:
-    def __init__(self, tokens: list[Token]) -> None:
+class LazyFunctionStmt(ast.FunctionStmt):
+    """A function whose body is parsed on first access of ``body``.
+
+    The pre-parser only checks the body's syntax with a Recognizer, which
+    builds no nodes, and keeps where it starts in the token list. Passes that
+    would walk the body (the resolver, node fusion) append an ``on_parse`` hook
+    instead; the hooks run in order on the freshly parsed statements before
+    they are handed out. A resolve error found then is a DeferredParseError.
+    """
+
+    def __init__(self, name: Token, params: list[Token], tokens: list[Token], start: int) -> None:
+        # 'body' is left unset so that __getattr__ sees the first access
+        self.name = name
+        self.params = params
+        self._tokens = tokens
+        self._start = start  # index of the first token after '{'
+        self.on_parse: list[Callable[[list[ast.Stmt]], None]] = []
+        self._frame_size = len(params)
+        self._frame_escapes = True
+
+    @property
+    def parsed(self) -> bool:
+        return "body" in self.__dict__
+
+    @property
+    def frame_size(self) -> int:
+        # the resolver sizes the frame from the body, so parse it first
+        if not self.parsed:
+            self.__getattr__("body")
+        return self._frame_size
+
+    @frame_size.setter
+    def frame_size(self, size: int) -> None:
+        self._frame_size = size
+
+    @property
+    def frame_escapes(self) -> bool:
+        if not self.parsed:
+            self.__getattr__("body")
+        return self._frame_escapes
+
+    @frame_escapes.setter
+    def frame_escapes(self, escapes: bool) -> None:
+        self._frame_escapes = escapes
+
+    def __getattr__(self, attr: str) -> list[ast.Stmt]:
+        if attr != "body":
+            raise AttributeError(attr)
+        parser = Parser(self._tokens, lazy=True)
+        parser.current = self._start
+        parser._checked = True
+        try:
+            body = parser._block_statements()
+        except ParseError:
+            body = []  # recorded in parser.errors
+        if parser.errors:
+            raise DeferredParseError(parser.errors[0].token, parser.errors[0].msg)
+        for hook in self.on_parse:
+            hook(body)
+        self.on_parse.clear()
+        self.body = body
+        return body
+
+    def __repr__(self) -> str:
+        return f"LazyFunctionStmt(name={self.name!r}, parsed={self.parsed})"
+
+
+class _TokenCursor:
+    """Position in a token list, with the helpers both parsers step through it with."""
+
+    def __init__(self, tokens: list[Token], current: int, errors: list[ParseError]) -> None:
         self.tokens = tokens
-        self.current = 0
-        self.errors: list[ParseError] = []
+        self.current = current
+        self.errors = errors
+
+    def _match(self, *types: TokenType) -> bool:
+        for t in types:
+            if self._check(t):
+                self._advance()
+                return True
+        return False
+
+    def _check(self, token_type: TokenType) -> bool:
+        if self._is_at_end():
+            return False
+        return self._peek().type == token_type
+
+    def _advance(self) -> Token:
+        if not self._is_at_end():
+            self.current += 1
+        return self._previous()
+
+    def _peek(self) -> Token:
+        return self.tokens[self.current]
+
+    def _previous(self) -> Token:
+        return self.tokens[self.current - 1]
+
+    def _is_at_end(self) -> bool:
+        return self._peek().type == TokenType.EOF
+
+    def _consume(self, token_type: TokenType, message: str) -> Token:
+        if self._check(token_type):
+            return self._advance()
+        raise self._error(self._peek(), message)
+
+    def _error(self, token: Token, message: str) -> ParseError:
+        err = ParseError(token, message)
+        self.errors.append(err)
+        return err
+
+    def _synchronize(self) -> None:
+        self._advance()
+        while not self._is_at_end():
+            if self._previous().type == TokenType.SEMICOLON:
+                return
+            if self._peek().type in (
+                TokenType.CLASS, TokenType.FN, TokenType.LET,
+                TokenType.FOR, TokenType.IF, TokenType.WHILE,
+                TokenType.PRINT, TokenType.RETURN,
+            ):
+                return
+            self._advance()
+
+
+class Parser(_TokenCursor):
+    """Recursive-descent parser.
+
+    With ``lazy`` set, function and method bodies are only checked by a
+    Recognizer and become LazyFunctionStmt nodes, parsed the first time they
+    are needed. Syntax errors in them are still reported by ``parse``.
+    """
+
+    def __init__(self, tokens: list[Token], lazy: bool = False) -> None:
+        super().__init__(tokens, 0, [])
+        self.lazy = lazy
+        # set when parsing a body the Recognizer already checked: its nested
+        # bodies were checked with it
+        self._checked = False
 
     def parse(self) -> list[ast.Stmt]:
         statements: list[ast.Stmt] = []
@@ -62,6 +198,17 @@ class Parser:
                     break
         self._consume(TokenType.RIGHT_PAREN, f"expected ')' after {kind} parameters")
         self._consume(TokenType.LEFT_BRACE, f"expected '{{' before {kind} body")
+        if self.lazy:
+            start = self.current
+            if self._checked:
+                self._skip_block()
+            else:
+                recognizer = Recognizer(self.tokens, start, self.errors)
+                try:
+                    recognizer.block()
+                finally:
+                    self.current = recognizer.current
+            return LazyFunctionStmt(name, params, self.tokens, start)
         body = self._block_statements()
         return ast.FunctionStmt(name, params, body)
 
@@ -116,14 +263,16 @@ class Parser:
         return ast.ReturnStmt(keyword, value)
 
     def _while_statement(self) -> ast.WhileStmt:
+        keyword = self._previous()
         self._consume(TokenType.LEFT_PAREN, "expected '(' after 'while'")
         condition = self._expression()
         self._consume(TokenType.RIGHT_PAREN, "expected ')' after while condition")
         body = self._statement()
-        return ast.WhileStmt(condition, body)
+        return ast.WhileStmt(condition, body, keyword)
 
     def _for_statement(self) -> ast.Stmt:
         # desugar for into while
+        keyword = self._previous()
         self._consume(TokenType.LEFT_PAREN, "expected '(' after 'for'")
 
         initializer: ast.Stmt | None
@@ -151,7 +300,7 @@ class Parser:
             body = ast.BlockStmt([body, ast.ExpressionStmt(increment)])
         if condition is None:
             condition = ast.LiteralExpr(True)
-        body = ast.WhileStmt(condition, body)
+        body = ast.WhileStmt(condition, body, keyword)
         if initializer is not None:
             body = ast.BlockStmt([initializer, body])
 
@@ -171,6 +320,19 @@ class Parser:
         self._consume(TokenType.RIGHT_BRACE, "expected '}' after block")
         return statements
 
+    def _skip_block(self) -> None:
+        # brace-match up to and including the '}' closing an already-open block
+        depth = 1
+        while not self._is_at_end():
+            token_type = self._advance().type
+            if token_type == TokenType.LEFT_BRACE:
+                depth += 1
+            elif token_type == TokenType.RIGHT_BRACE:
+                depth -= 1
+                if depth == 0:
+                    return
+        raise self._error(self._peek(), "expected '}' after block")
+
     # -- expressions (pratt / precedence climbing) --
 
     def _expression(self) -> ast.Expr:
@@ -298,53 +460,187 @@ class Parser:
 
         raise self._error(self._peek(), "expected expression")
 
-    # -- helpers --
 
-    def _match(self, *types: TokenType) -> bool:
-        for t in types:
-            if self._check(t):
-                self._advance()
-                return True
-        return False
+class Recognizer(_TokenCursor):
+    """Checks the syntax of a function body without building any nodes.
 
-    def _check(self, token_type: TokenType) -> bool:
-        if self._is_at_end():
-            return False
-        return self._peek().type == token_type
+    It accepts exactly what Parser does and records the same errors at the
+    same tokens, recovering the same way. Expressions return whether they
+    could be an assignment target, the one thing Parser checks on its nodes.
+    """
 
-    def _advance(self) -> Token:
-        if not self._is_at_end():
-            self.current += 1
-        return self._previous()
+    # binary operators by precedence, loosest first, as Parser's _or to _factor
+    _LEVELS: tuple[tuple[TokenType, ...], ...] = (
+        (TokenType.OR,),
+        (TokenType.AND,),
+        (TokenType.BANG_EQUAL, TokenType.EQUAL_EQUAL),
+        (TokenType.GREATER, TokenType.GREATER_EQUAL, TokenType.LESS, TokenType.LESS_EQUAL),
+        (TokenType.MINUS, TokenType.PLUS),
+        (TokenType.SLASH, TokenType.STAR, TokenType.PERCENT),
+    )
 
-    def _peek(self) -> Token:
-        return self.tokens[self.current]
+    def block(self) -> None:
+        """Check the rest of a block whose '{' was consumed, up to its '}'."""
+        while not self._check(TokenType.RIGHT_BRACE) and not self._is_at_end():
+            self._declaration()
+        self._consume(TokenType.RIGHT_BRACE, "expected '}' after block")
 
-    def _previous(self) -> Token:
-        return self.tokens[self.current - 1]
+    def _declaration(self) -> None:
+        try:
+            if self._match(TokenType.CLASS):
+                self._class_declaration()
+            elif self._match(TokenType.FN):
+                self._function("function")
+            elif self._match(TokenType.LET):
+                self._let_declaration()
+            else:
+                self._statement()
+        except ParseError:
+            self._synchronize()
 
-    def _is_at_end(self) -> bool:
-        return self._peek().type == TokenType.EOF
+    def _class_declaration(self) -> None:
+        self._consume(TokenType.IDENTIFIER, "expected class name")
+        if self._match(TokenType.LESS):
+            self._consume(TokenType.IDENTIFIER, "expected superclass name")
+        self._consume(TokenType.LEFT_BRACE, "expected '{' before class body")
+        while not self._check(TokenType.RIGHT_BRACE) and not self._is_at_end():
+            self._function("method")
+        self._consume(TokenType.RIGHT_BRACE, "expected '}' after class body")
 
-    def _consume(self, token_type: TokenType, message: str) -> Token:
-        if self._check(token_type):
-            return self._advance()
-        raise self._error(self._peek(), message)
+    def _function(self, kind: str) -> None:
+        self._consume(TokenType.IDENTIFIER, f"expected {kind} name")
+        self._consume(TokenType.LEFT_PAREN, f"expected '(' after {kind} name")
+        if not self._check(TokenType.RIGHT_PAREN):
+            params = 0
+            while True:
+                if params >= 255:
+                    self._error(self._peek(), "cannot have more than 255 parameters")
+                self._consume(TokenType.IDENTIFIER, "expected parameter name")
+                params += 1
+                if not self._match(TokenType.COMMA):
+                    break
+        self._consume(TokenType.RIGHT_PAREN, f"expected ')' after {kind} parameters")
+        self._consume(TokenType.LEFT_BRACE, f"expected '{{' before {kind} body")
+        self.block()
 
-    def _error(self, token: Token, message: str) -> ParseError:
-        err = ParseError(token, message)
-        self.errors.append(err)
-        return err
+    def _let_declaration(self) -> None:
+        self._consume(TokenType.IDENTIFIER, "expected variable name")
+        if self._match(TokenType.EQUAL):
+            self._expression()
+        self._consume(TokenType.SEMICOLON, "expected ';' after variable declaration")
 
-    def _synchronize(self) -> None:
-        self._advance()
-        while not self._is_at_end():
-            if self._previous().type == TokenType.SEMICOLON:
-                return
-            if self._peek().type in (
-                TokenType.CLASS, TokenType.FN, TokenType.LET,
-                TokenType.FOR, TokenType.IF, TokenType.WHILE,
-                TokenType.PRINT, TokenType.RETURN,
-            ):
-                return
-            self._advance()
+    def _statement(self) -> None:
+        if self._match(TokenType.IF):
+            self._consume(TokenType.LEFT_PAREN, "expected '(' after 'if'")
+            self._expression()
+            self._consume(TokenType.RIGHT_PAREN, "expected ')' after if condition")
+            self._statement()
+            if self._match(TokenType.ELSE):
+                self._statement()
+        elif self._match(TokenType.PRINT):
+            self._consume(TokenType.LEFT_PAREN, "expected '(' after 'print'")
+            self._expression()
+            self._consume(TokenType.RIGHT_PAREN, "expected ')' after print argument")
+            self._consume(TokenType.SEMICOLON, "expected ';' after print statement")
+        elif self._match(TokenType.RETURN):
+            if not self._check(TokenType.SEMICOLON):
+                self._expression()
+            self._consume(TokenType.SEMICOLON, "expected ';' after return value")
+        elif self._match(TokenType.WHILE):
+            self._consume(TokenType.LEFT_PAREN, "expected '(' after 'while'")
+            self._expression()
+            self._consume(TokenType.RIGHT_PAREN, "expected ')' after while condition")
+            self._statement()
+        elif self._match(TokenType.FOR):
+            self._for_statement()
+        elif self._match(TokenType.LEFT_BRACE):
+            self.block()
+        else:
+            self._expression_statement()
+
+    def _for_statement(self) -> None:
+        self._consume(TokenType.LEFT_PAREN, "expected '(' after 'for'")
+        if self._match(TokenType.SEMICOLON):
+            pass
+        elif self._match(TokenType.LET):
+            self._let_declaration()
+        else:
+            self._expression_statement()
+        if not self._check(TokenType.SEMICOLON):
+            self._expression()
+        self._consume(TokenType.SEMICOLON, "expected ';' after loop condition")
+        if not self._check(TokenType.RIGHT_PAREN):
+            self._expression()
+        self._consume(TokenType.RIGHT_PAREN, "expected ')' after for clauses")
+        self._statement()
+
+    def _expression_statement(self) -> None:
+        self._expression()
+        self._consume(TokenType.SEMICOLON, "expected ';' after expression")
+
+    def _expression(self) -> bool:
+        target = self._binary(0)
+        if self._match(TokenType.EQUAL):
+            equals = self._previous()
+            self._expression()
+            if not target:
+                self._error(equals, "invalid assignment target")
+            return False
+        return target
+
+    def _binary(self, level: int) -> bool:
+        if level == len(self._LEVELS):
+            return self._unary()
+        target = self._binary(level + 1)
+        while self._match(*self._LEVELS[level]):
+            self._binary(level + 1)
+            target = False
+        return target
+
+    def _unary(self) -> bool:
+        if self._match(TokenType.BANG, TokenType.MINUS):
+            self._unary()
+            return False
+        return self._call()
+
+    def _call(self) -> bool:
+        target = self._primary()
+        while True:
+            if self._match(TokenType.LEFT_PAREN):
+                self._finish_call()
+                target = False
+            elif self._match(TokenType.DOT):
+                self._consume(TokenType.IDENTIFIER, "expected property name after '.'")
+                target = True
+            else:
+                return target
+
+    def _finish_call(self) -> None:
+        if not self._check(TokenType.RIGHT_PAREN):
+            arguments = 0
+            while True:
+                if arguments >= 255:
+                    self._error(self._peek(), "cannot have more than 255 arguments")
+                self._expression()
+                arguments += 1
+                if not self._match(TokenType.COMMA):
+                    break
+        self._consume(TokenType.RIGHT_PAREN, "expected ')' after arguments")
+
+    def _primary(self) -> bool:
+        if self._match(TokenType.IDENTIFIER):
+            return True
+        if self._match(
+            TokenType.FALSE, TokenType.TRUE, TokenType.NIL,
+            TokenType.NUMBER, TokenType.STRING, TokenType.THIS,
+        ):
+            return False
+        if self._match(TokenType.SUPER):
+            self._consume(TokenType.DOT, "expected '.' after 'super'")
+            self._consume(TokenType.IDENTIFIER, "expected superclass method name")
+            return False
+        if self._match(TokenType.LEFT_PAREN):
+            self._expression()
+            self._consume(TokenType.RIGHT_PAREN, "expected ')' after expression")
+            return False
+        raise self._error(self._peek(), "expected expression")
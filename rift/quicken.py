@@ -0,0 +1,234 @@
+"""Self-specializing ("quickened") AST nodes for the tree-walker.
+
+After a ``BinaryExpr``, ``UnaryExpr``, ``GetExpr``, ``SetExpr`` or ``CallExpr`` has been
+evaluated once, the interpreter rewrites the node in place (``__class__``
+swap) into a subclass specialized for the operand types it just saw, for
+example float-plus-float or a call to one particular function. The
+specialized ``execute`` skips the generic type ladder and re-checks only its
+guard. On a guard miss the node reverts to its generic class and is marked
+unstable so it is not specialized again.
+
+Specialized classes subclass the node they replace, so every other consumer
+of the AST (resolver, compilers, JIT) still matches them as the original
+node type.
+"""
+
+from __future__ import annotations
+
+import operator
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+from rift import ast_nodes as ast
+from rift.callable import NativeFunction, RiftClass, RiftFunction
+from rift.errors import RiftRuntimeError
+from rift.inline_cache import GetCache, SetCache
+from rift.instance import RiftInstance
+from rift.tokens import TokenType
+
+if TYPE_CHECKING:
+    from rift.interpreter import Interpreter
+
+_FLOAT_OPS: dict[TokenType, Callable[[float, float], object]] = {
+    TokenType.PLUS: operator.add,
+    TokenType.MINUS: operator.sub,
+    TokenType.STAR: operator.mul,
+    TokenType.GREATER: operator.gt,
+    TokenType.GREATER_EQUAL: operator.ge,
+    TokenType.LESS: operator.lt,
+    TokenType.LESS_EQUAL: operator.le,
+}
+_FLOAT_DIVISION: dict[TokenType, Callable[[float, float], object]] = {
+    TokenType.SLASH: operator.truediv,
+    TokenType.PERCENT: operator.mod,
+}
+
+
+class Quickened:
+    """Mixin of every specialized node class."""
+
+    generic: type
+
+    def execute(self, interpreter: Interpreter) -> object:
+        raise NotImplementedError
+
+    def deoptimize(self) -> None:
+        self.__class__ = self.generic
+        self.__dict__["unstable"] = True
+
+
+def _stable(node: object) -> bool:
+    return "unstable" not in node.__dict__
+
+
+# -- binary / unary --
+
+
+class FloatBinaryExpr(Quickened, ast.BinaryExpr):
+    generic = ast.BinaryExpr
+    fn: Callable[[float, float], object]
+
+    def execute(self, interpreter: Interpreter) -> object:
+        # the operands are dispatched here, as Interpreter._binary_expr does
+        handlers = interpreter._expr_handlers
+        left = handlers[type(self.left)](self.left)
+        right = handlers[type(self.right)](self.right)
+        if type(left) is float and type(right) is float:
+            return self.fn(left, right)
+        self.deoptimize()
+        return interpreter._eval_binary(self.operator, left, right)
+
+
+class FloatDivisionExpr(Quickened, ast.BinaryExpr):
+    generic = ast.BinaryExpr
+    fn: Callable[[float, float], object]
+
+    def execute(self, interpreter: Interpreter) -> object:
+        handlers = interpreter._expr_handlers
+        left = handlers[type(self.left)](self.left)
+        right = handlers[type(self.right)](self.right)
+        if type(left) is float and type(right) is float:
+            if right:
+                return self.fn(left, right)
+        else:
+            self.deoptimize()
+        # the generic path reports the zero divisor or operand type error
+        return interpreter._eval_binary(self.operator, left, right)
+
+
+class StringConcatExpr(Quickened, ast.BinaryExpr):
+    generic = ast.BinaryExpr
+
+    def execute(self, interpreter: Interpreter) -> object:
+        handlers = interpreter._expr_handlers
+        left = handlers[type(self.left)](self.left)
+        right = handlers[type(self.right)](self.right)
+        if type(left) is str and type(right) is str:
+            return left + right
+        self.deoptimize()
+        return interpreter._eval_binary(self.operator, left, right)
+
+
+class FloatNegateExpr(Quickened, ast.UnaryExpr):
+    generic = ast.UnaryExpr
+
+    def execute(self, interpreter: Interpreter) -> object:
+        value = interpreter._evaluate(self.operand)
+        if type(value) is float:
+            return -value
+        self.deoptimize()
+        interpreter._check_number_operand(self.operator, value)
+        return None  # unreachable: the check raises
+
+
+def quicken_binary(expr: ast.BinaryExpr, left: object, right: object) -> None:
+    if not _stable(expr):
+        return
+    op = expr.operator.type
+    if type(left) is float and type(right) is float:
+        if op in _FLOAT_OPS:
+            expr.__class__ = FloatBinaryExpr
+            expr.__dict__["fn"] = _FLOAT_OPS[op]
+        elif op in _FLOAT_DIVISION:
+            expr.__class__ = FloatDivisionExpr
+            expr.__dict__["fn"] = _FLOAT_DIVISION[op]
+    elif type(left) is str and type(right) is str and op == TokenType.PLUS:
+        expr.__class__ = StringConcatExpr
+
+
+def quicken_unary(expr: ast.UnaryExpr, value: object) -> None:
+    if _stable(expr) and expr.operator.type == TokenType.MINUS and type(value) is float:
+        expr.__class__ = FloatNegateExpr
+
+
+# -- property access --
+
+
+class InstanceGetExpr(Quickened, ast.GetExpr):
+    generic = ast.GetExpr
+    cache: GetCache
+
+    def execute(self, interpreter: Interpreter) -> object:
+        obj = interpreter._evaluate(self.object)
+        if type(obj) is RiftInstance:
+            cache = self.cache
+            if obj.shape is cache.shape:
+                return obj.values[cache.slot]
+            return cache.get(obj)
+        self.deoptimize()
+        return interpreter._get_property(obj, self.name)
+
+
+class InstanceSetExpr(Quickened, ast.SetExpr):
+    generic = ast.SetExpr
+    cache: SetCache
+
+    def execute(self, interpreter: Interpreter) -> object:
+        obj = interpreter._evaluate(self.object)
+        if type(obj) is RiftInstance:
+            value = interpreter._evaluate(self.value)
+            cache = self.cache
+            if obj.shape is cache.shape:
+                obj.values[cache.slot] = value
+            else:
+                cache.set(obj, value)
+            return value
+        self.deoptimize()
+        raise RiftRuntimeError(self.name, "only instances have fields")
+
+
+def quicken_get(expr: ast.GetExpr, obj: object, interpreter: Interpreter) -> None:
+    if _stable(expr) and type(obj) is RiftInstance:
+        expr.__class__ = InstanceGetExpr
+        expr.__dict__["cache"] = GetCache(expr.name, interpreter.inline_caches)
+
+
+def quicken_set(expr: ast.SetExpr, obj: object, interpreter: Interpreter) -> None:
+    if _stable(expr) and type(obj) is RiftInstance:
+        expr.__class__ = InstanceSetExpr
+        expr.__dict__["cache"] = SetCache(expr.name, interpreter.inline_caches)
+
+
+# -- calls --
+
+
+class KnownCallExpr(Quickened, ast.CallExpr):
+    """Call site that has only seen one native function or class."""
+
+    generic = ast.CallExpr
+    target: NativeFunction | RiftClass
+
+    def execute(self, interpreter: Interpreter) -> object:
+        callee = interpreter._evaluate(self.callee)
+        args = interpreter._arguments(self.arguments)
+        if callee is self.target:
+            return callee.call(interpreter, args)
+        self.deoptimize()
+        return interpreter._call_function(callee, args, self.paren)
+
+
+class FunctionCallExpr(Quickened, ast.CallExpr):
+    """Call site that has only seen closures of one function declaration."""
+
+    generic = ast.CallExpr
+    target: ast.FunctionStmt
+
+    def execute(self, interpreter: Interpreter) -> object:
+        callee = interpreter._evaluate(self.callee)
+        args = interpreter._arguments(self.arguments)
+        if type(callee) is RiftFunction and callee.declaration is self.target:
+            return callee.call(interpreter, args)
+        self.deoptimize()
+        return interpreter._call_function(callee, args, self.paren)
+
+
+def quicken_call(expr: ast.CallExpr, callee: object) -> None:
+    """Specialize a call site that just called ``callee`` successfully."""
+    if not _stable(expr):
+        return
+    if type(callee) is RiftFunction:
+        expr.__class__ = FunctionCallExpr
+        expr.__dict__["target"] = callee.declaration
+    elif isinstance(callee, NativeFunction | RiftClass):
+        expr.__class__ = KnownCallExpr
+        expr.__dict__["target"] = callee
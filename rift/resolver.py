@@ -1,10 +1,32 @@
+"""Static resolution of local variables.
+
+The resolver binds every name reference either to a local, as a (depth, slot)
+pair, or to a global's cell, and decides which scopes need an environment of
+their own at run time:
+
+- function bodies, and the scopes holding ``this`` and ``super``, always get
+  one, since closures and bound methods outlive the call;
+- a block whose variables some closure captures gets one per execution, so
+  each loop iteration has fresh bindings for its closures to keep;
+- any other block is folded into the nearest enclosing environment, which
+  reserves a slot for each of its variables. A block that declares nothing
+  costs nothing at all. If a closure may keep that environment, the block
+  clears its slots on exit, so the closure keeps no more than the block did.
+
+Whether a variable is captured is only known once the code after it has been
+resolved, so slots are laid out when a top-level statement (or a lazily
+parsed body) is complete, and the references found in it are patched then.
+"""
+
 from __future__ import annotations
 
+from dataclasses import dataclass, field
 from enum import Enum, auto
 from typing import TYPE_CHECKING
 
 from rift import ast_nodes as ast
-from rift.errors import ParseError
+from rift.errors import DeferredParseError, ParseError
+from rift.parser import LazyFunctionStmt
 from rift.tokens import Token
 
 if TYPE_CHECKING:
@@ -24,13 +46,46 @@ class _ClassType(Enum):
     SUBCLASS = auto()
 
 
+@dataclass(eq=False)
+class _Variable:
+    declaration: ast.Declaration | None  # None for parameters, 'this' and 'super'
+    defined: bool = False
+    captured: bool = False
+    slot: int = -1
+
+
+@dataclass(eq=False)
+class _Scope:
+    """One lexical scope."""
+
+    parent: _Scope | None
+    # the function body this scope is part of; None outside any function
+    function: _Scope | None = None
+    # the block it is, if any; other scopes always get an environment
+    block: ast.BlockStmt | None = None
+    body: ast.FunctionStmt | None = None
+    variables: dict[str, _Variable] = field(default_factory=dict)
+    children: list[_Scope] = field(default_factory=list)
+    # the scope whose environment holds this scope's variables, once laid out
+    frame: _Scope | None = None
+    size: int = 0  # slots, if this scope is a frame
+    # a function or class declared in this scope, or in a scope nested in it
+    # within the same function, may keep its environment alive
+    kept: bool = False
+
+
 class Resolver:
     def __init__(self, interpreter: Interpreter) -> None:
         self.interpreter = interpreter
-        self.scopes: list[dict[str, bool]] = []
+        self.scopes: list[_Scope] = []
         self._current_function = _FunctionType.NONE
         self._current_class = _ClassType.NONE
         self.errors: list[ParseError] = []
+        # local references waiting for the layout:
+        # (expr, scope it is in, scope declaring it, variable)
+        self._references: list[tuple[ast.Resolved, _Scope, _Scope, _Variable]] = []
+        # scopes below this depth were laid out by an earlier resolver
+        self._base = 0
 
     def resolve(self, statements: list[ast.Stmt]) -> None:
         for stmt in statements:
@@ -39,16 +94,18 @@ class Resolver:
     def _resolve_stmt(self, stmt: ast.Stmt) -> None:
         match stmt:
             case ast.BlockStmt(statements):
-                self._begin_scope()
+                self._begin_scope(block=stmt)
                 self.resolve(statements)
                 self._end_scope()
             case ast.LetStmt(name, initializer):
-                self._declare(name)
+                self._declare(name, stmt)
                 if initializer is not None:
                     self._resolve_expr(initializer)
                 self._define(name)
-            case ast.FunctionStmt(name, _, _):
-                self._declare(name)
+            # matching on more fields would read, and so parse, a lazy body
+            case ast.FunctionStmt(name):
+                self._closure_made()
+                self._declare(name, stmt)
                 self._define(name)
                 self._resolve_function(stmt, _FunctionType.FUNCTION)
             case ast.ExpressionStmt(expression):
@@ -75,7 +132,8 @@ class Resolver:
             case ast.ClassStmt(name, superclass, methods):
                 enclosing_class = self._current_class
                 self._current_class = _ClassType.CLASS
-                self._declare(name)
+                self._closure_made()
+                self._declare(name, stmt)
                 self._define(name)
 
                 if superclass is not None:
@@ -86,10 +144,10 @@ class Resolver:
                     self._current_class = _ClassType.SUBCLASS
                     self._resolve_expr(superclass)
                     self._begin_scope()
-                    self.scopes[-1]["super"] = True
+                    self.scopes[-1].variables["super"] = _Variable(None, defined=True)
 
                 self._begin_scope()
-                self.scopes[-1]["this"] = True
+                self.scopes[-1].variables["this"] = _Variable(None, defined=True)
 
                 for method in methods:
                     ft = _FunctionType.METHOD
@@ -105,10 +163,12 @@ class Resolver:
     def _resolve_expr(self, expr: ast.Expr) -> None:
         match expr:
             case ast.VariableExpr(name):
-                if self.scopes and self.scopes[-1].get(name.lexeme) is False:
-                    self.errors.append(
-                        ParseError(name, "cannot read variable in its own initializer")
-                    )
+                if self.scopes:
+                    variable = self.scopes[-1].variables.get(name.lexeme)
+                    if variable is not None and not variable.defined:
+                        self.errors.append(
+                            ParseError(name, "cannot read variable in its own initializer")
+                        )
                 self._resolve_local(expr, name)
             case ast.AssignExpr(name, value):
                 self._resolve_expr(value)
@@ -152,39 +212,140 @@ class Resolver:
                 self._resolve_local(expr, keyword)
 
     def _resolve_function(self, function: ast.FunctionStmt, fn_type: _FunctionType) -> None:
+        if isinstance(function, LazyFunctionStmt) and not function.parsed:
+            self._defer(function, fn_type)
+            return
+        self._resolve_body(function, function.body, fn_type)
+
+    def _resolve_body(
+        self, function: ast.FunctionStmt, body: list[ast.Stmt], fn_type: _FunctionType
+    ) -> None:
         enclosing = self._current_function
         self._current_function = fn_type
-        self._begin_scope()
+        self._begin_scope(body=function)
+        function.frame_escapes = False
         for param in function.params:
-            self._declare(param)
+            self._declare(param, None)
             self._define(param)
-        self.resolve(function.body)
+        self.resolve(body)
         self._end_scope()
         self._current_function = enclosing
 
-    def _resolve_local(self, expr: ast.Expr, name: Token) -> None:
-        for i in range(len(self.scopes) - 1, -1, -1):
-            if name.lexeme in self.scopes[i]:
-                self.interpreter.resolve(expr, len(self.scopes) - 1 - i)
+    def _defer(self, function: LazyFunctionStmt, fn_type: _FunctionType) -> None:
+        # the body must see the scopes as they are now, not as they are when
+        # it is first called: later declarations must stay invisible to it
+        visible = [(scope, dict(scope.variables)) for scope in self.scopes]
+        current_class = self._current_class
+        interpreter = self.interpreter
+        # the slots around the body are laid out before it is parsed, so
+        # assume it captures everything it can see
+        for _, variables in visible:
+            for variable in variables.values():
+                variable.captured = True
+
+        def resolve_body(body: list[ast.Stmt]) -> None:
+            resolver = Resolver(interpreter)
+            resolver.scopes = [
+                _Scope(scope.parent, scope.function, variables=variables, frame=scope.frame)
+                for scope, variables in visible
+            ]
+            resolver._base = len(resolver.scopes)
+            resolver._current_class = current_class
+            resolver._resolve_body(function, body, fn_type)
+            if resolver.errors:
+                raise DeferredParseError(resolver.errors[0].token, resolver.errors[0].msg)
+
+        function.on_parse.append(resolve_body)
+
+    def _resolve_local(self, expr: ast.Resolved, name: Token) -> None:
+        for scope in reversed(self.scopes):
+            variable = scope.variables.get(name.lexeme)
+            if variable is not None:
+                current = self.scopes[-1]
+                if scope.function is not current.function:
+                    variable.captured = True
+                self._references.append((expr, current, scope, variable))
                 return
+        self.interpreter.resolve_global(expr, name.lexeme)
+
+    def _closure_made(self) -> None:
+        # functions and methods declared here keep the environment chain
+        for scope in reversed(self.scopes):
+            scope.kept = True
+            if scope is scope.function:
+                break
+        if self.scopes and (function := self.scopes[-1].function) is not None:
+            assert function.body is not None
+            function.body.frame_escapes = True
 
-    def _declare(self, name: Token) -> None:
+    def _declare(self, name: Token, declaration: ast.Declaration | None) -> None:
         if not self.scopes:
             return
         scope = self.scopes[-1]
-        if name.lexeme in scope:
+        if name.lexeme in scope.variables:
             self.errors.append(
                 ParseError(name, f"variable '{name.lexeme}' already declared in this scope")
             )
-        scope[name.lexeme] = False
+        scope.variables[name.lexeme] = _Variable(declaration)
 
     def _define(self, name: Token) -> None:
         if not self.scopes:
             return
-        self.scopes[-1][name.lexeme] = True
+        self.scopes[-1].variables[name.lexeme].defined = True
 
-    def _begin_scope(self) -> None:
-        self.scopes.append({})
+    def _begin_scope(
+        self, block: ast.BlockStmt | None = None, body: ast.FunctionStmt | None = None
+    ) -> None:
+        parent = self.scopes[-1] if self.scopes else None
+        scope = _Scope(parent, None, block, body)
+        if parent is not None:
+            scope.function = parent.function
+            parent.children.append(scope)
+        if body is not None:
+            scope.function = scope
+        self.scopes.append(scope)
 
     def _end_scope(self) -> None:
-        self.scopes.pop()
+        scope = self.scopes.pop()
+        if len(self.scopes) == self._base:
+            # nothing can capture from the new scopes any more
+            _layout(scope, None)
+            self._patch()
+
+    def _patch(self) -> None:
+        for expr, current, scope, variable in self._references:
+            frame, depth = current.frame, 0
+            while frame is not scope.frame:
+                assert frame is not None and frame.parent is not None
+                frame, depth = frame.parent.frame, depth + 1
+            self.interpreter.resolve(expr, depth, variable.slot)
+        self._references.clear()
+
+
+def _layout(scope: _Scope, frame: _Scope | None) -> None:
+    """Give ``scope`` an environment if it needs one and number its slots."""
+    variables = scope.variables.values()
+    own = (
+        scope.block is None
+        or any(variable.captured for variable in variables)
+        # nothing local to fold into
+        or (frame is None and bool(variables))
+    )
+    if own:
+        frame = scope
+    scope.frame = frame
+    first = 0 if frame is None else frame.size
+    for variable in variables:
+        assert frame is not None
+        variable.slot = frame.size
+        frame.size += 1
+        if variable.declaration is not None:
+            variable.declaration.slot = variable.slot
+    for child in scope.children:
+        _layout(child, frame)
+    if scope.block is not None:
+        scope.block.scope_size = scope.size if own else None
+        if not own and variables and frame is not None and frame.kept:
+            scope.block.clear_on_exit = range(first, first + len(variables))
+    if scope.body is not None:
+        scope.body.frame_size = scope.size
@@ -0,0 +1,131 @@
+"""Cooperative scheduling of many Rift scripts on one asyncio event loop.
+
+Each script runs on its own ``StacklessInterpreter`` through ``run_sliced``:
+after every ``slice`` loop iterations and calls the script pauses and awaits
+``asyncio.sleep(0)``, so other scripts (and any other tasks on the loop) get
+their turn. No threads or processes are involved; a script that never loops
+or calls finishes in one slice.
+
+    scheduler = Scheduler()
+    results = await asyncio.gather(*(scheduler.run(src, deadline=1.0) for src in scripts))
+
+Output is captured per script, and each result reports the CPU time spent in
+that script's slices. A deadline is checked whenever the script pauses, so it
+is overshot by at most one slice.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import io
+import time
+from dataclasses import dataclass, field
+
+from rift import ast_nodes as ast
+from rift.errors import ParseError, RiftRuntimeError, ScanError
+from rift.parser import Parser
+from rift.resolver import Resolver
+from rift.scanner import Scanner
+from rift.stackless import StacklessInterpreter
+from rift.vm import DEFAULT_MAX_DEPTH
+
+# back-edges and calls a script runs before giving up the event loop
+DEFAULT_SLICE = 1000
+
+
+@dataclass
+class ScriptResult:
+    """Outcome of one ``Scheduler.run``."""
+
+    ok: bool
+    output: str
+    errors: list[str] = field(default_factory=list)
+    cpu_time: float = 0.0  # seconds of CPU spent in this script's slices
+    slices: int = 0
+    timed_out: bool = False
+
+
+class Scheduler:
+    """Runs Rift scripts as asyncio tasks that share one thread fairly."""
+
+    def __init__(self, slice: int = DEFAULT_SLICE, max_depth: int = DEFAULT_MAX_DEPTH) -> None:
+        self.slice = slice
+        self.max_depth = max_depth
+
+    async def run(
+        self,
+        source: str,
+        slice: int | None = None,
+        deadline: float | None = None,
+        fuel: int | None = None,
+        lazy: bool = False,
+    ) -> ScriptResult:
+        """Run one script to completion, yielding to the event loop between slices.
+
+        ``deadline`` is in seconds of wall-clock time from the call; ``fuel``
+        caps the script's total work as with ``Interpreter(fuel=...)``.
+        """
+        loop = asyncio.get_running_loop()
+        give_up = None if deadline is None else loop.time() + deadline
+        size = self.slice if slice is None else slice
+        interpreter = StacklessInterpreter(self.max_depth)
+        if fuel is not None:
+            interpreter.fuel = fuel
+        output = io.StringIO()
+        result = ScriptResult(ok=False, output="")
+
+        started = time.thread_time()
+        statements = _front_end(source, interpreter, lazy, result.errors)
+        result.cpu_time += time.thread_time() - started
+        if statements is None:
+            return result
+
+        run = interpreter.run_sliced(statements, size)
+        try:
+            while True:
+                started = time.thread_time()
+                try:
+                    with contextlib.redirect_stdout(output):
+                        finished = next(run, True) is True
+                except RiftRuntimeError as e:
+                    result.errors.append(str(e))
+                    break
+                finally:
+                    result.cpu_time += time.thread_time() - started
+                    result.slices += 1
+                if finished:
+                    result.ok = True
+                    break
+                if give_up is not None and loop.time() >= give_up:
+                    result.timed_out = True
+                    result.errors.append(f"deadline of {deadline}s exceeded")
+                    break
+                await asyncio.sleep(0)
+        finally:
+            run.close()
+            result.output = output.getvalue()
+        return result
+
+
+def _front_end(
+    source: str, interpreter: StacklessInterpreter, lazy: bool, errors: list[str]
+) -> list[ast.Stmt] | None:
+    """Scan, parse and resolve like ``rift.__main__.run``, collecting errors."""
+    scanner = Scanner(source)
+    scanner.scan_tokens()
+    found: list[ScanError | ParseError] = list(scanner.errors)
+    statements: list[ast.Stmt] = []
+    if not found:
+        parser = Parser(scanner.tokens, lazy)
+        try:
+            statements = parser.parse()
+        except ParseError:
+            pass
+        found.extend(parser.errors)
+    if not found:
+        resolver = Resolver(interpreter)
+        resolver.resolve(statements)
+        found.extend(resolver.errors)
+    errors.extend(str(e) for e in found)
+    return None if found else statements
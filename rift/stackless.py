@@ -0,0 +1,379 @@
+"""Stackless tree-walker: Rift calls do not consume Python stack.
+
+Statements and expressions that contain a call are evaluated by generators.
+Instead of recursing, a generator yields the child generator it needs; the
+driver loop in ``_drive`` keeps the suspended generators on an explicit,
+heap-allocated stack and sends each child's result back to its parent.
+A Rift call therefore costs one list entry instead of several Python frames,
+and recursion depth is bounded by ``max_depth`` rather than the Python
+recursion limit.
+
+Call-free subtrees (the bulk of most programs) still run on the inherited
+recursive evaluator, whose depth is bounded by the source nesting.
+
+Because every Rift frame is a suspended generator, a run can also be paused
+and resumed: ``run_sliced`` steps loops as well as calls and has a step
+yield ``None`` once a time slice of back-edges and calls is used up, which
+leaves the whole stack in place until the caller resumes it (see
+``rift.scheduler``).
+"""
+
+from __future__ import annotations
+
+import math
+from collections.abc import Generator
+from typing import Final, TypeAlias
+
+from rift import ast_nodes as ast
+from rift.callable import NativeFunction, RiftClass, RiftFunction
+from rift.completion import NORMAL
+from rift.environment import Environment
+from rift.errors import RiftRuntimeError
+from rift.fuse import fuse
+from rift.instance import RiftInstance
+from rift.interpreter import Interpreter
+from rift.stdlib import stringify
+from rift.tokens import Token, TokenType
+from rift.vm import DEFAULT_MAX_DEPTH
+
+# a suspended evaluation: yields child steps (or None to pause the run), is
+# sent their results
+Step: TypeAlias = Generator["Step | None", object, object]
+
+# returned by _advance when a step paused the run
+PAUSED: Final = object()
+
+
+class StacklessInterpreter(Interpreter):
+    """Engine that keeps Rift frames on an explicit stack of generators."""
+
+    def __init__(self, max_depth: int = DEFAULT_MAX_DEPTH) -> None:
+        # tiered bodies run as nested Python closures, which would use the
+        # Python stack again; tail calls are unnecessary with heap frames
+        super().__init__(tiering=False, tco=False)
+        self.max_depth = max_depth
+        self._depth = 0
+        # nodes that must run as steps: calls, plus loops while time-slicing
+        self._stepped: tuple[type, ...] = (ast.CallExpr,)
+        # back-edges and calls left before a step pauses the run
+        self._slice: float = math.inf
+
+    def interpret(self, statements: list[ast.Stmt]) -> None:
+        if self.fusion:
+            fuse(statements, self)
+        for stmt in statements:
+            if self._is_plain(stmt):
+                self._execute(stmt)
+            else:
+                self._drive(self._stmt_step(stmt))
+
+    def run_sliced(self, statements: list[ast.Stmt], size: int) -> Generator[None, None, None]:
+        """Run ``statements`` like interpret(), pausing every ``size`` back-edges and calls.
+
+        Each pause is a yield to the caller, who resumes the run by advancing
+        the generator again or abandons it by closing the generator.
+        """
+        if ast.WhileStmt not in self._stepped:
+            self._stepped = (ast.CallExpr, ast.WhileStmt)
+        if self.fusion:
+            fuse(statements, self)
+        self._slice = size
+        try:
+            for stmt in statements:
+                if self._is_plain(stmt):
+                    self._execute(stmt)
+                    continue
+                stack = [self._stmt_step(stmt)]
+                try:
+                    while self._advance(stack) is PAUSED:
+                        yield
+                        self._slice = size
+                finally:
+                    # unwind steps left suspended by an abandoned run
+                    for step in reversed(stack):
+                        step.close()
+        finally:
+            self._slice = math.inf
+
+    def _drive(self, root: Step) -> object:
+        value = self._advance([root])
+        assert value is not PAUSED, "only run_sliced pauses"
+        return value
+
+    def _advance(self, stack: list[Step]) -> object:
+        """Run the steps on ``stack`` until it empties or one of them pauses.
+
+        Returns the root step's value, or PAUSED with the stack left in place
+        to resume from.
+        """
+        value: object = None
+        error: RiftRuntimeError | None = None
+        while stack:
+            step = stack[-1]
+            try:
+                if error is not None:
+                    pending, error = error, None
+                    child = step.throw(pending)
+                else:
+                    child = step.send(value)
+            except StopIteration as stop:
+                stack.pop()
+                value = stop.value
+                continue
+            except RiftRuntimeError as exc:
+                stack.pop()
+                if not stack:
+                    raise
+                error = exc
+                continue
+            if child is None:
+                return PAUSED
+            stack.append(child)
+            value = None
+        return value
+
+    # -- call analysis --
+
+    def _is_plain(self, node: ast.Stmt | ast.Expr) -> bool:
+        """Whether ``node`` contains no stepped node; cached on the node.
+
+        The cache records the ``_stepped`` types it was computed for, so it
+        goes stale when ``run_sliced`` adds loops to them.
+        """
+        cached = node.__dict__.get("plain")
+        if cached is not None and cached[0] is self._stepped:
+            return bool(cached[1])
+        plain = not any(isinstance(n, self._stepped) for n in _walk(node))
+        node.__dict__["plain"] = (self._stepped, plain)
+        return plain
+
+    # -- statements --
+
+    def _stmt_step(self, stmt: ast.Stmt) -> Step:
+        # finishes with the statement's completion, like Interpreter._execute
+        match stmt:
+            case ast.ExpressionStmt(expression):
+                yield self._expr_step(expression)
+            case ast.PrintStmt(expression):
+                value = yield self._expr_step(expression)
+                print(stringify(value))
+            case ast.LetStmt(_, initializer):
+                assert initializer is not None
+                value = yield self._expr_step(initializer)
+                self._define(stmt, value)
+            case ast.BlockStmt(statements, scope_size=size, clear_on_exit=cleared):
+                environment = self._environment
+                if size is not None:
+                    environment = Environment(environment, [None] * size)
+                completion = yield self._block_step(statements, environment)
+                if cleared is not None:
+                    for slot in cleared:
+                        environment.slots[slot] = None
+                return completion
+            case ast.IfStmt(condition, then_branch, else_branch):
+                if self._is_truthy((yield from self._value(condition))):
+                    return (yield from self._run(then_branch))
+                if else_branch is not None:
+                    return (yield from self._run(else_branch))
+            case ast.WhileStmt(condition, body, keyword):
+                while self._is_truthy((yield from self._value(condition))):
+                    completion = yield from self._run(body)
+                    if completion is not NORMAL:
+                        return completion
+                    self._burn(keyword)
+                    self._slice -= 1
+                    if self._slice <= 0:
+                        yield None
+            case ast.ReturnStmt(_, value_expr):
+                assert value_expr is not None
+                return (yield self._expr_step(value_expr))
+            case _:
+                return self._execute(stmt)
+        return NORMAL
+
+    def _block_step(self, statements: list[ast.Stmt], environment: Environment) -> Step:
+        previous = self._environment
+        try:
+            self._environment = environment
+            for stmt in statements:
+                completion = yield from self._run(stmt)
+                if completion is not NORMAL:
+                    return completion
+        finally:
+            self._environment = previous
+        return NORMAL
+
+    def _run(self, stmt: ast.Stmt) -> Generator[Step, object, object]:
+        # delegates one level only: the statement itself is a child step
+        if self._is_plain(stmt):
+            return self._execute(stmt)
+        return (yield self._stmt_step(stmt))
+
+    def _value(self, expr: ast.Expr) -> Generator[Step, object, object]:
+        if self._is_plain(expr):
+            return self._evaluate(expr)
+        return (yield self._expr_step(expr))
+
+    # -- expressions --
+
+    def _expr_step(self, expr: ast.Expr) -> Step:
+        match expr:
+            case ast.GroupingExpr(expression):
+                return (yield from self._value(expression))
+            case ast.UnaryExpr(operator, operand):
+                value = yield from self._value(operand)
+                if operator.type == TokenType.MINUS:
+                    self._check_number_operand(operator, value)
+                    return -value  # type: ignore[operator]
+                return not self._is_truthy(value)
+            case ast.BinaryExpr(left_node, operator, right_node):
+                left = yield from self._value(left_node)
+                right = yield from self._value(right_node)
+                return self._eval_binary(operator, left, right)
+            case ast.AssignExpr(name, value_expr):
+                value = yield from self._value(value_expr)
+                if expr.depth >= 0:
+                    self._environment.assign_at(expr.depth, expr.slot, value)
+                else:
+                    expr.cell.assign(name, value)  # type: ignore[union-attr]
+                return value
+            case ast.LogicalExpr(left_node, operator, right_node):
+                left = yield from self._value(left_node)
+                if operator.type == TokenType.OR:
+                    if self._is_truthy(left):
+                        return left
+                elif not self._is_truthy(left):
+                    return left
+                return (yield from self._value(right_node))
+            case ast.CallExpr(ast.GetExpr(obj_expr, name), arguments, paren):
+                obj = yield from self._value(obj_expr)
+                method = None
+                if isinstance(obj, RiftInstance) and name.lexeme not in obj.shape.slots:
+                    method = obj.klass.find_method(name.lexeme)
+                if type(method) is not RiftFunction:
+                    # not a method call: a field, an undefined property or a compiled method
+                    callee = self._get_property(obj, name)
+                    args = []
+                    for argument in arguments:
+                        args.append((yield from self._value(argument)))
+                    return (yield from self._call(callee, args, paren))
+                assert isinstance(obj, RiftInstance)
+                args = []
+                for argument in arguments:
+                    args.append((yield from self._value(argument)))
+                if len(args) != method.arity():
+                    raise RiftRuntimeError(
+                        paren, f"expected {method.arity()} arguments but got {len(args)}"
+                    )
+                return (yield self._function_step(method, args, paren, obj))
+            case ast.CallExpr(callee_expr, arguments, paren):
+                callee = yield from self._value(callee_expr)
+                args = []
+                for argument in arguments:
+                    args.append((yield from self._value(argument)))
+                return (yield from self._call(callee, args, paren))
+            case ast.GetExpr(obj_expr, name):
+                obj = yield from self._value(obj_expr)
+                return self._get_property(obj, name)
+            case ast.SetExpr(obj_expr, name, value_expr):
+                obj = yield from self._value(obj_expr)
+                if not isinstance(obj, RiftInstance):
+                    raise RiftRuntimeError(name, "only instances have fields")
+                value = yield from self._value(value_expr)
+                obj.set(name, value)
+                return value
+        return self._evaluate(expr)
+
+    def _call(self, callee: object, args: list[object], paren: Token) -> Step:
+        if type(callee) is RiftFunction:
+            if len(args) != callee.arity():
+                raise RiftRuntimeError(
+                    paren, f"expected {callee.arity()} arguments but got {len(args)}"
+                )
+            return (yield self._function_step(callee, args, paren))
+        if isinstance(callee, RiftClass):
+            initializer = callee.initializer
+            if initializer is None or type(initializer) is not RiftFunction:
+                return self._call_function(callee, args, paren)
+            if len(args) != initializer.arity():
+                raise RiftRuntimeError(
+                    paren, f"expected {initializer.arity()} arguments but got {len(args)}"
+                )
+            instance = RiftInstance(callee)
+            yield self._function_step(initializer, args, paren, instance)
+            return instance
+        # natives and other callables do not call back into Rift code
+        if isinstance(callee, NativeFunction | RiftFunction):
+            return self._call_function(callee, args, paren)
+        raise RiftRuntimeError(paren, "can only call functions and classes")
+
+    def _function_step(
+        self,
+        function: RiftFunction,
+        args: list[object],
+        paren: Token,
+        this: RiftInstance | None = None,
+    ) -> Step:
+        """Call ``function``, as a method of ``this`` if given (see ``RiftFunction.call``)."""
+        if self._depth >= self.max_depth:
+            raise RiftRuntimeError(paren, "stack overflow")
+        self._burn(function.declaration.name)
+        self._slice -= 1
+        if self._slice <= 0:
+            yield None
+        pool = None if function.declaration.frame_escapes else self.frame_pool
+        closure = function.closure
+        if this is not None:
+            closure = (
+                Environment(closure, [this]) if pool is None else pool.acquire(closure, [this])
+            )
+        env = function.frame(args, pool, closure)
+        self._depth += 1
+        try:
+            completion = yield self._block_step(function.declaration.body, env)
+        finally:
+            self._depth -= 1
+        result = closure.slots[0] if function.is_initializer else completion
+        if pool is not None:
+            pool.release(env)
+            if this is not None:
+                pool.release(closure)
+        return None if result is NORMAL else result
+
+
+def _walk(node: ast.Stmt | ast.Expr) -> Generator[ast.Stmt | ast.Expr, None, None]:
+    """Yield a node and every node it executes (not function or method bodies)."""
+    yield node
+    match node:
+        case ast.ExpressionStmt(expr) | ast.PrintStmt(expr) | ast.GroupingExpr(expr):
+            yield from _walk(expr)
+        case ast.LetStmt(_, expr) | ast.ReturnStmt(_, expr):
+            if expr is not None:
+                yield from _walk(expr)
+        case ast.BlockStmt(statements):
+            for stmt in statements:
+                yield from _walk(stmt)
+        case ast.IfStmt(condition, then_branch, else_branch):
+            yield from _walk(condition)
+            yield from _walk(then_branch)
+            if else_branch is not None:
+                yield from _walk(else_branch)
+        case ast.WhileStmt(condition, body):
+            yield from _walk(condition)
+            yield from _walk(body)
+        case ast.UnaryExpr(_, operand):
+            yield from _walk(operand)
+        case ast.BinaryExpr(left, _, right) | ast.LogicalExpr(left, _, right):
+            yield from _walk(left)
+            yield from _walk(right)
+        case ast.AssignExpr(_, value):
+            yield from _walk(value)
+        case ast.CallExpr(callee, arguments, _):
+            yield from _walk(callee)
+            for argument in arguments:
+                yield from _walk(argument)
+        case ast.GetExpr(obj, _):
+            yield from _walk(obj)
+        case ast.SetExpr(obj, _, value):
+            yield from _walk(obj)
+            yield from _walk(value)
@@ -4,8 +4,8 @@ import time
 from typing import TYPE_CHECKING
 
 from rift.callable import NativeFunction
-from rift.environment import Environment
 from rift.instance import RiftInstance
+from rift.tiering import GlobalEnvironment
 
 if TYPE_CHECKING:
     pass
@@ -65,7 +65,7 @@ def _stringify(value: object) -> str:
     return str(value)
 
 
-def define_natives(environment: Environment) -> None:
+def define_natives(environment: GlobalEnvironment) -> None:
     environment.define("clock", NativeFunction("clock", _clock, 0))
     environment.define("len", NativeFunction("len", _len_fn, 1))
     environment.define("str", NativeFunction("str", _str_fn, 1))
@@ -76,3 +76,4 @@ def define_natives(environment: Environment) -> None:
 
 # re-export for use elsewhere
 stringify = _stringify
+type_name = _type_fn
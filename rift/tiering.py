@@ -0,0 +1,155 @@
+"""Method-level tiered execution for the tree-walker.
+
+Every ``RiftFunction`` counts its invocations in a ``FunctionProfile`` (shared
+with the bound copies ``bind`` makes). When a function crosses
+``HOT_FUNCTION`` calls, its body is compiled by the ``ClosureCompiler`` with
+speculation enabled and later calls run the compiled body instead of walking
+the AST.
+
+Speculation assumes that a global holding a function, class or native when
+the body was compiled keeps that value, which lets call sites skip the
+callable and arity checks. Each such global is an ``Assumption`` held by
+its ``GlobalCell``; redefining or assigning the global (for example
+re-running a ``class`` statement) invalidates it. Invalidation deoptimizes
+every body compiled against it: new calls go back to the tree-walker and the
+function can tier up again later. Activations already running keep working
+because speculative code re-checks the assumption before using the value.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from rift.environment import Environment
+from rift.errors import RiftRuntimeError
+from rift.tokens import Token
+
+if TYPE_CHECKING:
+    from rift import ast_nodes as ast
+    from rift.interpreter import Interpreter
+
+# calls before a function body is compiled
+HOT_FUNCTION = 100
+
+
+@dataclass(eq=False)
+class CompiledBody:
+    body: Callable[[Environment], object]  # returns a completion
+    valid: bool = True
+
+
+@dataclass(eq=False)
+class FunctionProfile:
+    """Call counter and current compiled tier of one function."""
+
+    calls: int = 0
+    tier: CompiledBody | None = None
+
+
+@dataclass(eq=False)
+class Assumption:
+    """A global that still holds the value compiled code specialized on."""
+
+    name: str
+    valid: bool = True
+    dependents: list[CompiledBody] = field(default_factory=list)
+
+    def invalidate(self) -> None:
+        self.valid = False
+        for body in self.dependents:
+            body.valid = False
+        self.dependents.clear()
+
+
+# value of a global cell that was interned but never defined
+UNDEFINED = object()
+
+
+class GlobalCell:
+    """One global variable, shared by every reference the resolver bound to it."""
+
+    __slots__ = ("assumption", "name", "value")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.value: object = UNDEFINED
+        self.assumption: Assumption | None = None
+
+    def __repr__(self) -> str:
+        return f"<global {self.name}>"
+
+    def get(self, token: Token) -> object:
+        value = self.value
+        if value is UNDEFINED:
+            raise self.undefined(token)
+        return value
+
+    def assign(self, token: Token, value: object) -> None:
+        if self.value is UNDEFINED:
+            raise self.undefined(token)
+        self.define(value)
+
+    def define(self, value: object) -> None:
+        if self.assumption is not None:
+            self.assumption.invalidate()
+            self.assumption = None
+        self.value = value
+
+    def assume(self) -> Assumption:
+        if self.assumption is None:
+            self.assumption = Assumption(self.name)
+        return self.assumption
+
+    def undefined(self, token: Token) -> RiftRuntimeError:
+        return RiftRuntimeError(token, f"undefined variable '{self.name}'")
+
+
+class GlobalEnvironment(Environment):
+    """The global scope: one interned cell per name.
+
+    The resolver binds every global reference to its name's cell, so reads
+    and writes skip the name lookup. A cell exists as soon as some code
+    mentions the name and stays ``UNDEFINED`` until the name is defined.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.cells: dict[str, GlobalCell] = {}
+
+    def cell(self, name: str) -> GlobalCell:
+        cell = self.cells.get(name)
+        if cell is None:
+            cell = self.cells[name] = GlobalCell(name)
+        return cell
+
+    def define(self, name: str, value: object) -> None:
+        self.cell(name).define(value)
+
+    def get(self, name: Token) -> object:
+        return self.cell(name.lexeme).get(name)
+
+    def assign(self, name: Token, value: object) -> None:
+        self.cell(name.lexeme).assign(name, value)
+
+
+class Tiering:
+    """Compiles hot function bodies for one interpreter."""
+
+    def __init__(self, interpreter: Interpreter) -> None:
+        self._interpreter = interpreter
+
+    def compile(self, declaration: ast.FunctionStmt) -> CompiledBody:
+        body = declaration.compiled
+        if body is not None and body.valid:
+            return body
+        # imported here: the closure compiler itself builds on Interpreter
+        from rift.closure_compiler import ClosureCompiler
+
+        compiler = ClosureCompiler(self._interpreter, speculate=True)
+        body = CompiledBody(compiler.compile_function_body(declaration))
+        for assumption in compiler.assumed:
+            assumption.dependents.append(body)
+        declaration.compiled = body
+        return body
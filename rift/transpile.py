@@ -0,0 +1,869 @@
+"""Rift-to-Python transpiler.
+
+A resolved program is translated into Python source and run through
+``compile()``/``exec`` so CPython's own bytecode interpreter does the work:
+
+- Rift functions become Python functions and closures become Python closures
+  (``nonlocal`` for captured variables that are assigned). A captured variable
+  declared inside a loop gets a fresh one-element list ("box") per iteration
+  and inner functions receive the box through a small factory, so every
+  closure sees its own iteration's variable as it does in the tree-walker.
+- Rift classes become Python classes (metaclass ``RiftClassType``); fields
+  and methods live under ``r_``-prefixed attributes so the instance dict is
+  probed before the class, like ``RiftInstance.get``.
+- Operators keep Rift semantics: operands are type-checked inline and the
+  failure path raises ``RiftRuntimeError`` at the original operator token.
+  Undefined globals and properties surface as Python NameError/AttributeError
+  and are mapped back to their Rift tokens through a per-line table.
+- Fuel is only charged when the engine runs metered: each loop iteration and
+  function entry then calls ``_fuel`` (``Interpreter._burn``). Unmetered code
+  and ``rift transpile`` output carry no accounting at all.
+
+Every Rift name is mangled (``x`` -> ``x_3`` for locals, ``x_g`` for globals),
+so user identifiers never collide with Python keywords, builtins or the
+runtime helpers, which are all underscore names without such a suffix.
+"""
+
+from __future__ import annotations
+
+import functools
+import math
+import sys
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from types import FunctionType, MethodType, TracebackType
+
+from rift import ast_nodes as ast
+from rift.callable import NativeFunction
+from rift.errors import RiftRuntimeError
+from rift.interpreter import Interpreter
+from rift.stdlib import define_natives, stringify, type_name
+from rift.tiering import GlobalEnvironment
+from rift.tokens import Token, TokenType
+
+# -- runtime --
+
+
+class RiftClassType(type):
+    """Metaclass of every class generated from a Rift ``class`` statement."""
+
+    rift_name: str
+
+    def __repr__(cls) -> str:
+        return f"<class {cls.rift_name}>"
+
+
+class RiftObject(metaclass=RiftClassType):
+    rift_name = "object"
+
+    def __repr__(self) -> str:
+        return f"<{type(self).rift_name} instance>"
+
+
+def _rift_fn_name(py_name: str) -> str:
+    # mangled names are "<rift name>_<n>" or "<rift name>_g"
+    return py_name.rsplit("_", 1)[0]
+
+
+def _str(value: object) -> str:
+    if type(value) is FunctionType:
+        return f"<fn {_rift_fn_name(value.__name__)}>"
+    if type(value) is MethodType:
+        return f"<fn {_rift_fn_name(value.__func__.__name__)}>"
+    return stringify(value)
+
+
+def _type(value: object) -> str:
+    if isinstance(value, RiftObject):
+        return type(value).rift_name
+    return type_name(value)
+
+
+def _tokens(spec: tuple[tuple[str, int, int], ...]) -> list[Token]:
+    return [Token(TokenType.IDENTIFIER, lexeme, None, line, col) for lexeme, line, col in spec]
+
+
+def _fail(token: Token, msg: str) -> object:
+    raise RiftRuntimeError(token, msg)
+
+
+def _bad_num(token: Token) -> object:
+    raise RiftRuntimeError(token, "operands must be numbers")
+
+
+def _bad_add(token: Token) -> object:
+    raise RiftRuntimeError(token, "operands must be two numbers or two strings")
+
+
+def _bad_neg(token: Token) -> object:
+    raise RiftRuntimeError(token, "operand must be a number")
+
+
+def _bad_div(a: object, b: object, token: Token) -> object:
+    if type(a) is not float or type(b) is not float:
+        raise RiftRuntimeError(token, "operands must be numbers")
+    raise RiftRuntimeError(token, "division by zero")
+
+
+def _bad_mod(a: object, b: object, token: Token) -> object:
+    if type(a) is not float or type(b) is not float:
+        raise RiftRuntimeError(token, "operands must be numbers")
+    raise RiftRuntimeError(token, "modulo by zero")
+
+
+def _raiser(token: Token, msg: str, *args: object) -> object:
+    # returned by _callable so call errors surface after argument evaluation
+    raise RiftRuntimeError(token, msg)
+
+
+def _instantiate(cls: type[RiftObject], *args: object) -> object:
+    instance = object.__new__(cls)
+    init = getattr(cls, "r_init", None)
+    if init is not None:
+        init(instance, *args)
+    return instance
+
+
+def _callable(fn: object, token: Token, argc: int) -> Callable[..., object]:
+    """Slow path of a call site: validate the callee, return what to invoke."""
+    kind = type(fn)
+    if kind is FunctionType:
+        arity = fn.__code__.co_argcount  # type: ignore[attr-defined]
+    elif kind is MethodType:
+        arity = fn.__func__.__code__.co_argcount - 1  # type: ignore[attr-defined]
+    elif isinstance(fn, type) and issubclass(fn, RiftObject):
+        init = getattr(fn, "r_init", None)
+        arity = 0 if init is None else init.__code__.co_argcount - 1
+        if arity == argc:
+            return functools.partial(_instantiate, fn)
+    elif isinstance(fn, NativeFunction):
+        arity = fn.arity()
+        if arity == argc:
+            return fn.func
+    else:
+        return functools.partial(_raiser, token, "can only call functions and classes")
+    if arity != argc:
+        return functools.partial(_raiser, token, f"expected {arity} arguments but got {argc}")
+    return fn  # type: ignore[return-value]
+
+
+def _get(obj: object, attr: str, token: Token) -> object:
+    if isinstance(obj, RiftObject):
+        try:
+            return getattr(obj, attr)
+        except AttributeError:
+            raise RiftRuntimeError(token, f"undefined property '{attr[2:]}'") from None
+    raise RiftRuntimeError(token, "only instances have properties")
+
+
+def _inst(obj: object, token: Token) -> RiftObject:
+    if isinstance(obj, RiftObject):
+        return obj
+    raise RiftRuntimeError(token, "only instances have fields")
+
+
+def _setf(obj: RiftObject, attr: str, value: object) -> object:
+    setattr(obj, attr, value)
+    return value
+
+
+def _setbox(box: list[object], value: object) -> object:
+    box[0] = value
+    return value
+
+
+def _super(superclass: RiftClassType, this: RiftObject, attr: str, token: Token) -> object:
+    method = getattr(superclass, attr, None)
+    if method is None:
+        raise RiftRuntimeError(token, f"undefined property '{attr[2:]}'")
+    return MethodType(method, this)
+
+
+def _class(
+    name: str, superclass: object, token: Token | None, methods: dict[str, object]
+) -> RiftClassType:
+    if superclass is None:
+        base: type = RiftObject
+    elif isinstance(superclass, RiftClassType):
+        base = superclass
+    else:
+        assert token is not None
+        raise RiftRuntimeError(token, "superclass must be a class")
+    return RiftClassType(name, (base,), {"rift_name": name, **methods})
+
+
+_HELPERS: dict[str, object] = {
+    "_Fn": FunctionType,
+    "_Meth": MethodType,
+    "_str": _str,
+    "_tokens": _tokens,
+    "_fail": _fail,
+    "_bad_num": _bad_num,
+    "_bad_add": _bad_add,
+    "_bad_neg": _bad_neg,
+    "_bad_div": _bad_div,
+    "_bad_mod": _bad_mod,
+    "_callable": _callable,
+    "_get": _get,
+    "_inst": _inst,
+    "_setf": _setf,
+    "_setbox": _setbox,
+    "_super": _super,
+    "_class": _class,
+    "_ADDABLE": (float, str),
+}
+
+
+def bootstrap(namespace: dict[str, object]) -> None:
+    """Install the runtime helpers and Rift natives into a module namespace."""
+    namespace.update(_HELPERS)
+
+    def gassign(py_name: str, value: object, token: Token) -> object:
+        if py_name not in namespace:
+            raise RiftRuntimeError(token, f"undefined variable '{token.lexeme}'")
+        namespace[py_name] = value
+        return value
+
+    namespace["_gassign"] = gassign
+    natives = GlobalEnvironment()
+    define_natives(natives)
+    natives.define("str", NativeFunction("str", _str, 1))
+    natives.define("type", NativeFunction("type", _type, 1))
+    for name, cell in natives.cells.items():
+        namespace[f"{name}_g"] = cell.value
+
+
+# -- analysis --
+
+
+@dataclass(eq=False)
+class _Func:
+    """One generated Python function: a Rift function, method or the top level."""
+
+    parent: _Func | None
+    kind: str = "function"  # "main" | "function" | "method" | "initializer"
+    loop_depth: int = 0
+    # bindings of the parent referenced by this function or its descendants
+    free: set[_Binding] = field(default_factory=set)
+    # bindings of enclosing functions assigned from this function
+    assigned: set[_Binding] = field(default_factory=set)
+    temps: int = 0
+
+    def factory_params(self) -> list[_Binding]:
+        return sorted((b for b in self.free if b.boxed), key=lambda b: b.py_name)
+
+    def nonlocals(self) -> list[_Binding]:
+        return sorted((b for b in self.assigned if not b.boxed), key=lambda b: b.py_name)
+
+
+@dataclass(eq=False)
+class _Binding:
+    name: str
+    py_name: str
+    owner: _Func
+    in_loop: bool
+    captured: bool = False
+
+    @property
+    def boxed(self) -> bool:
+        # captured and re-declared on every iteration: needs a per-iteration cell
+        return self.captured and self.in_loop
+
+
+class _Analyzer:
+    """Mirrors the Resolver's scoping rules to bind every name to a Python name."""
+
+    def __init__(self) -> None:
+        self.main = _Func(None, "main")
+        self.decls: dict[int, _Binding] = {}  # id(decl node or param token) -> binding
+        self.refs: dict[int, _Binding | None] = {}  # id(expr) -> binding, None = global
+        self.funcs: dict[int, _Func] = {}  # id(FunctionStmt) -> function
+        self.supers: dict[int, _Binding] = {}  # id(ClassStmt) -> 'super' binding
+        self.global_defs: set[str] = set()
+        self._scopes: list[dict[str, _Binding]] = []
+        self._func = self.main
+        self._counter = 0
+
+    def run(self, statements: list[ast.Stmt]) -> None:
+        for stmt in statements:
+            self._stmt(stmt)
+
+    def _stmt(self, stmt: ast.Stmt) -> None:
+        match stmt:
+            case ast.ExpressionStmt(expression) | ast.PrintStmt(expression):
+                self._expr(expression)
+            case ast.LetStmt(name, initializer):
+                if initializer is not None:
+                    self._expr(initializer)
+                self._declare(stmt, name.lexeme)
+            case ast.BlockStmt(statements):
+                self._scopes.append({})
+                for inner in statements:
+                    self._stmt(inner)
+                self._scopes.pop()
+            case ast.IfStmt(condition, then_branch, else_branch):
+                self._expr(condition)
+                self._stmt(then_branch)
+                if else_branch is not None:
+                    self._stmt(else_branch)
+            case ast.WhileStmt(condition, body):
+                self._expr(condition)
+                self._func.loop_depth += 1
+                self._stmt(body)
+                self._func.loop_depth -= 1
+            case ast.FunctionStmt(name, _, _):
+                self._declare(stmt, name.lexeme)
+                self._function(stmt, "function")
+            case ast.ReturnStmt(_, value):
+                if value is not None:
+                    self._expr(value)
+            case ast.ClassStmt(name, superclass, methods):
+                if superclass is not None:
+                    self._expr(superclass)
+                self._declare(stmt, name.lexeme)
+                if superclass is not None:
+                    binding = self._new_binding("super")
+                    self.supers[id(stmt)] = binding
+                    self._scopes.append({"super": binding})
+                for method in methods:
+                    kind = "initializer" if method.name.lexeme == "init" else "method"
+                    self._function(method, kind)
+                if superclass is not None:
+                    self._scopes.pop()
+
+    def _function(self, decl: ast.FunctionStmt, kind: str) -> None:
+        func = _Func(self._func, kind)
+        self.funcs[id(decl)] = func
+        enclosing = self._func
+        self._func = func
+        scope: dict[str, _Binding] = {}
+        if kind != "function":
+            scope["this"] = _Binding("this", "this", func, False)
+        for param in decl.params:
+            binding = self._new_binding(param.lexeme)
+            self.decls[id(param)] = binding
+            scope[param.lexeme] = binding
+        self._scopes.append(scope)
+        for stmt in decl.body:
+            self._stmt(stmt)
+        self._scopes.pop()
+        self._func = enclosing
+
+    def _expr(self, expr: ast.Expr) -> None:
+        match expr:
+            case ast.VariableExpr(name) | ast.ThisExpr(name):
+                self._reference(expr, name.lexeme, assign=False)
+            case ast.AssignExpr(name, value):
+                self._expr(value)
+                self._reference(expr, name.lexeme, assign=True)
+            case ast.BinaryExpr(left, _, right) | ast.LogicalExpr(left, _, right):
+                self._expr(left)
+                self._expr(right)
+            case ast.UnaryExpr(_, operand):
+                self._expr(operand)
+            case ast.GroupingExpr(expression):
+                self._expr(expression)
+            case ast.CallExpr(callee, arguments, _):
+                self._expr(callee)
+                for arg in arguments:
+                    self._expr(arg)
+            case ast.GetExpr(obj, _):
+                self._expr(obj)
+            case ast.SetExpr(obj, _, value):
+                self._expr(obj)
+                self._expr(value)
+            case ast.SuperExpr(keyword, _):
+                self._reference(expr, "super", assign=False)
+                self._reference(keyword, "this", assign=False)
+            case ast.LiteralExpr(_):
+                pass
+
+    def _declare(self, node: object, name: str) -> None:
+        if not self._scopes:
+            self.global_defs.add(f"{name}_g")
+            return
+        binding = self._new_binding(name)
+        self.decls[id(node)] = binding
+        self._scopes[-1][name] = binding
+
+    def _new_binding(self, name: str) -> _Binding:
+        self._counter += 1
+        return _Binding(name, f"{name}_{self._counter}", self._func, self._func.loop_depth > 0)
+
+    def _reference(self, node: object, name: str, *, assign: bool) -> None:
+        for scope in reversed(self._scopes):
+            binding = scope.get(name)
+            if binding is None:
+                continue
+            self.refs[id(node)] = binding
+            if binding.owner is not self._func:
+                binding.captured = True
+                inner = self._func
+                while inner.parent is not binding.owner:
+                    assert inner.parent is not None
+                    inner = inner.parent
+                inner.free.add(binding)
+                if assign:
+                    self._func.assigned.add(binding)
+            return
+        self.refs[id(node)] = None
+
+
+# -- emission --
+
+
+@dataclass
+class Transpiled:
+    """Generated source plus what the engine needs to map errors back to Rift."""
+
+    source: str
+    # generated line number -> {python name: token} for globals and this.<field>
+    names: dict[int, dict[str, Token]]
+
+
+class Transpiler:
+    def __init__(self, metered: bool = False) -> None:
+        self._metered = metered
+        self._lines: list[str] = []
+        self._names: dict[int, dict[str, Token]] = {}
+        self._tokens: list[Token] = []
+        self._token_index: dict[int, int] = {}
+        self._indent = 0
+        self._analysis = _Analyzer()
+        self._func = self._analysis.main
+        self._factories = 0
+        self._pending_names: dict[str, Token] = {}
+
+    def transpile(self, statements: list[ast.Stmt]) -> Transpiled:
+        self._analysis.run(statements)
+        self._line("def _rift_main():")
+        self._indent += 1
+        if self._analysis.global_defs:
+            self._line("global " + ", ".join(sorted(self._analysis.global_defs)))
+        tokens_at = len(self._lines)
+        self._line("_T = None")  # patched once every token is known
+        self._body(statements)
+        self._indent -= 1
+        spec = ", ".join(f"({t.lexeme!r}, {t.line}, {t.column})" for t in self._tokens)
+        self._lines[tokens_at] = f"    _T = _tokens(({spec}{',' if self._tokens else ''}))"
+        return Transpiled("\n".join(self._lines) + "\n", self._names)
+
+    # -- output helpers --
+
+    def _line(self, text: str) -> None:
+        self._lines.append("    " * self._indent + text)
+        if self._pending_names:
+            self._names[len(self._lines)] = self._pending_names
+            self._pending_names = {}
+
+    def _tok(self, token: Token) -> str:
+        index = self._token_index.get(id(token))
+        if index is None:
+            index = len(self._tokens)
+            self._tokens.append(token)
+            self._token_index[id(token)] = index
+        return f"_T[{index}]"
+
+    def _temp(self) -> str:
+        self._func.temps += 1
+        return f"_t{self._func.temps}"
+
+    def _body(self, statements: list[ast.Stmt]) -> None:
+        start = len(self._lines)
+        for stmt in statements:
+            self._stmt(stmt)
+        if len(self._lines) == start:
+            self._line("pass")
+
+    # -- statements --
+
+    def _stmt(self, stmt: ast.Stmt) -> None:
+        match stmt:
+            case ast.ExpressionStmt(expression):
+                self._expression_stmt(expression)
+            case ast.PrintStmt(expression):
+                self._line(f"print(_str({self._expr(expression)[0]}))")
+            case ast.LetStmt(_, initializer):
+                value = "None" if initializer is None else self._expr(initializer)[0]
+                self._bind(stmt, stmt.name.lexeme, value)
+            case ast.BlockStmt(statements):
+                for inner in statements:
+                    self._stmt(inner)
+            case ast.IfStmt(condition, then_branch, else_branch):
+                self._line(f"if {self._condition(condition)}:")
+                self._nested(then_branch)
+                if else_branch is not None:
+                    self._line("else:")
+                    self._nested(else_branch)
+            case ast.WhileStmt(condition, body, keyword):
+                self._line(f"while {self._condition(condition)}:")
+                self._nested(body)
+                if self._metered:
+                    self._line(f"    _fuel({self._tok(keyword)})")
+            case ast.FunctionStmt(name, _, _):
+                binding = self._analysis.decls.get(id(stmt))
+                if binding is not None and binding.boxed:
+                    self._line(f"{binding.py_name} = [None]")
+                value = self._function(stmt)
+                self._bind(stmt, name.lexeme, value, prebox=True)
+            case ast.ReturnStmt(_, value):
+                if self._func.kind == "initializer":
+                    self._line("return this")
+                elif value is None:
+                    self._line("return None")
+                else:
+                    self._line(f"return {self._expr(value)[0]}")
+            case ast.ClassStmt(name, superclass, methods):
+                self._class(stmt, name, superclass, methods)
+
+    def _nested(self, stmt: ast.Stmt) -> None:
+        self._indent += 1
+        self._body([stmt])
+        self._indent -= 1
+
+    def _expression_stmt(self, expr: ast.Expr) -> None:
+        match expr:
+            case ast.AssignExpr(name, value):
+                binding = self._analysis.refs[id(expr)]
+                if binding is not None:
+                    target = f"{binding.py_name}[0]" if binding.boxed else binding.py_name
+                    self._line(f"{target} = {self._expr(value)[0]}")
+                    return
+            case ast.SetExpr(obj, name, value):
+                if isinstance(obj, ast.ThisExpr):
+                    self._line(f"this.r_{name.lexeme} = {self._expr(value)[0]}")
+                    return
+                temp = self._temp()
+                self._line(f"{temp} = _inst({self._expr(obj)[0]}, {self._tok(name)})")
+                self._line(f"{temp}.r_{name.lexeme} = {self._expr(value)[0]}")
+                return
+        self._line(self._expr(expr)[0])
+
+    def _bind(self, decl: object, name: str, value: str, *, prebox: bool = False) -> None:
+        binding = self._analysis.decls.get(id(decl))
+        if binding is None:
+            if value != f"{name}_g":
+                self._line(f"{name}_g = {value}")
+        elif not binding.boxed:
+            if value != binding.py_name:
+                self._line(f"{binding.py_name} = {value}")
+        elif prebox:
+            self._line(f"{binding.py_name}[0] = {value}")
+        else:
+            self._line(f"{binding.py_name} = [{value}]")
+
+    def _function(self, decl: ast.FunctionStmt) -> str:
+        """Emit the def (inside a factory if needed); return the value expression."""
+        func = self._analysis.funcs[id(decl)]
+        binding = self._analysis.decls.get(id(decl))
+        factory = func.factory_params()
+        if binding is not None and not binding.boxed and not factory:
+            def_name = binding.py_name  # def binds the variable directly
+        elif binding is None and func.kind == "function":
+            def_name = f"{decl.name.lexeme}_g"
+        else:
+            self._analysis._counter += 1
+            def_name = f"{decl.name.lexeme}_{self._analysis._counter}"
+
+        if factory:
+            self._factories += 1
+            maker = f"_mk{self._factories}"
+            self._line(f"def {maker}({', '.join(b.py_name for b in factory)}):")
+            self._indent += 1
+
+        params = [self._analysis.decls[id(p)].py_name for p in decl.params]
+        if func.kind != "function":
+            params.insert(0, "this")
+        self._line(f"def {def_name}({', '.join(params)}):")
+        self._indent += 1
+        enclosing = self._func
+        self._func = func
+        nonlocals = func.nonlocals()
+        if nonlocals:
+            self._line("nonlocal " + ", ".join(b.py_name for b in nonlocals))
+        if self._metered:
+            self._line(f"_fuel({self._tok(decl.name)})")
+        for param in decl.params:
+            param_binding = self._analysis.decls[id(param)]
+            if param_binding.boxed:  # pragma: no cover - params are never loop-local
+                self._line(f"{param_binding.py_name} = [{param_binding.py_name}]")
+        self._body(decl.body)
+        if func.kind == "initializer":
+            self._line("return this")
+        self._func = enclosing
+        self._indent -= 1
+
+        if factory:
+            self._line(f"return {def_name}")
+            self._indent -= 1
+            return f"{maker}({', '.join(b.py_name for b in factory)})"
+        return def_name
+
+    def _class(
+        self,
+        stmt: ast.ClassStmt,
+        name: Token,
+        superclass: ast.VariableExpr | None,
+        methods: list[ast.FunctionStmt],
+    ) -> None:
+        super_value = "None"
+        super_token = "None"
+        if superclass is not None:
+            super_value = self._expr(superclass)[0]
+            super_token = self._tok(superclass.name)
+        binding = self._analysis.decls.get(id(stmt))
+        if binding is not None and binding.boxed:
+            self._line(f"{binding.py_name} = [None]")
+        if superclass is not None:
+            super_binding = self._analysis.supers[id(stmt)]
+            if super_binding.boxed:
+                self._line(f"{super_binding.py_name} = [{super_value}]")
+                super_value = f"{super_binding.py_name}[0]"
+            else:
+                self._line(f"{super_binding.py_name} = {super_value}")
+                super_value = super_binding.py_name
+        entries = [f"'r_{m.name.lexeme}': {self._function(m)}" for m in methods]
+        value = f"_class({name.lexeme!r}, {super_value}, {super_token}, {{{', '.join(entries)}}})"
+        self._bind(stmt, name.lexeme, value, prebox=True)
+
+    # -- expressions --
+
+    def _condition(self, expr: ast.Expr) -> str:
+        code, kind = self._expr(expr)
+        if kind == "bool":
+            return code
+        temp = self._temp()
+        return f"(({temp} := {code}) is not None and {temp} is not False)"
+
+    def _expr(self, expr: ast.Expr) -> tuple[str, str]:
+        """Return (python expression, static kind: "bool" | "num" | "any")."""
+        match expr:
+            case ast.LiteralExpr(value):
+                if isinstance(value, bool):
+                    return repr(value), "bool"
+                if isinstance(value, float):
+                    return repr(value), "num"
+                return repr(value), "any"
+            case ast.GroupingExpr(expression):
+                code, kind = self._expr(expression)
+                return f"({code})", kind
+            case ast.UnaryExpr(operator, operand):
+                code, kind = self._expr(operand)
+                if operator.type == TokenType.BANG:
+                    if kind == "bool":
+                        return f"(not {code})", "bool"
+                    t = self._temp()
+                    return f"(({t} := {code}) is None or {t} is False)", "bool"
+                t = self._temp()
+                return (
+                    f"(-{t} if type({t} := {code}) is float else _bad_neg({self._tok(operator)}))",
+                    "num",
+                )
+            case ast.BinaryExpr(left, operator, right):
+                return self._binary(operator, self._expr(left)[0], self._expr(right)[0])
+            case ast.VariableExpr(name):
+                return self._read(expr, name), "any"
+            case ast.AssignExpr(name, value):
+                code = self._expr(value)[0]
+                binding = self._analysis.refs[id(expr)]
+                if binding is None:
+                    return f"_gassign('{name.lexeme}_g', {code}, {self._tok(name)})", "any"
+                if binding.boxed:
+                    return f"_setbox({binding.py_name}, {code})", "any"
+                return f"({binding.py_name} := {code})", "any"
+            case ast.LogicalExpr(left, operator, right):
+                left_code = self._expr(left)[0]
+                right_code = self._expr(right)[0]
+                t = self._temp()
+                truthy = f"({t} := {left_code}) is not None and {t} is not False"
+                if operator.type == TokenType.OR:
+                    return f"({t} if {truthy} else {right_code})", "any"
+                return f"({right_code} if {truthy} else {t})", "any"
+            case ast.CallExpr(callee, arguments, paren):
+                return self._call(callee, arguments, paren), "any"
+            case ast.GetExpr(obj, name):
+                if isinstance(obj, ast.ThisExpr):
+                    self._pending_names[f"r_{name.lexeme}"] = name
+                    return f"this.r_{name.lexeme}", "any"
+                return f"_get({self._expr(obj)[0]}, 'r_{name.lexeme}', {self._tok(name)})", "any"
+            case ast.SetExpr(obj, name, value):
+                target = (
+                    "this"
+                    if isinstance(obj, ast.ThisExpr)
+                    else f"_inst({self._expr(obj)[0]}, {self._tok(name)})"
+                )
+                return f"_setf({target}, 'r_{name.lexeme}', {self._expr(value)[0]})", "any"
+            case ast.ThisExpr(_):
+                return "this", "any"
+            case ast.SuperExpr(_, method):
+                binding = self._analysis.refs[id(expr)]
+                assert binding is not None
+                superclass = f"{binding.py_name}[0]" if binding.boxed else binding.py_name
+                return (
+                    f"_super({superclass}, this, 'r_{method.lexeme}', {self._tok(method)})",
+                    "any",
+                )
+        raise AssertionError(f"unknown expression {expr!r}")
+
+    def _read(self, expr: ast.Expr, name: Token) -> str:
+        binding = self._analysis.refs[id(expr)]
+        if binding is None:
+            py_name = f"{name.lexeme}_g"
+            self._pending_names[py_name] = name
+            return py_name
+        return f"{binding.py_name}[0]" if binding.boxed else binding.py_name
+
+    def _binary(self, op: Token, a: str, b: str) -> tuple[str, str]:
+        if op.type == TokenType.EQUAL_EQUAL:
+            return f"({a} == {b})", "bool"
+        if op.type == TokenType.BANG_EQUAL:
+            return f"({a} != {b})", "bool"
+        x = self._temp()
+        y = self._temp()
+        tok = self._tok(op)
+        both_numbers = f"type({x} := {a}) is type({y} := {b}) is float"
+        match op.type:
+            case TokenType.PLUS:
+                same_type = f"type({x} := {a}) is type({y} := {b}) and type({x}) in _ADDABLE"
+                return f"({x} + {y} if {same_type} else _bad_add({tok}))", "any"
+            case TokenType.SLASH:
+                return (
+                    f"({x} / {y} if {both_numbers} and {y} else _bad_div({x}, {y}, {tok}))",
+                    "num",
+                )
+            case TokenType.PERCENT:
+                return (
+                    f"({x} % {y} if {both_numbers} and {y} else _bad_mod({x}, {y}, {tok}))",
+                    "num",
+                )
+        symbol = {
+            TokenType.MINUS: "-",
+            TokenType.STAR: "*",
+            TokenType.GREATER: ">",
+            TokenType.GREATER_EQUAL: ">=",
+            TokenType.LESS: "<",
+            TokenType.LESS_EQUAL: "<=",
+        }[op.type]
+        kind = "num" if op.type in (TokenType.MINUS, TokenType.STAR) else "bool"
+        return f"({x} {symbol} {y} if {both_numbers} else _bad_num({tok}))", kind
+
+    def _call(self, callee: ast.Expr, arguments: list[ast.Expr], paren: Token) -> str:
+        argc = len(arguments)
+        fn = self._temp()
+        callee_code = self._expr(callee)[0]
+        if isinstance(callee, ast.GetExpr | ast.SuperExpr):
+            fast = f"type({fn} := {callee_code}) is _Meth and {fn}.__func__.__code__.co_argcount == {argc + 1}"
+        else:
+            fast = f"type({fn} := {callee_code}) is _Fn and {fn}.__code__.co_argcount == {argc}"
+        args = ", ".join(self._expr(a)[0] for a in arguments)
+        return f"({fn} if {fast} else _callable({fn}, {self._tok(paren)}, {argc}))({args})"
+
+
+def transpile(statements: list[ast.Stmt], metered: bool = False) -> Transpiled:
+    return Transpiler(metered).transpile(statements)
+
+
+def to_module(statements: list[ast.Stmt], source_name: str) -> str:
+    """Standalone, runnable Python module for inspection (``rift transpile``)."""
+    header = (
+        f"# Generated by rift transpile from {source_name}. Do not edit.\n"
+        "from rift.transpile import bootstrap\n"
+        "\n"
+        "bootstrap(globals())\n"
+        "\n"
+        "\n"
+    )
+    footer = '\n\nif __name__ == "__main__":\n    _rift_main()\n'
+    return header + transpile(statements).source + footer
+
+
+class PyInterpreter(Interpreter):
+    """Engine that transpiles each program to Python and execs it."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.namespace: dict[str, object] = {"__name__": "rift_transpiled"}
+        bootstrap(self.namespace)
+        self.namespace["_fuel"] = self._burn
+        self._chunks = 0
+        self._names: dict[str, dict[int, dict[str, Token]]] = {}
+
+    def resolve(self, expr: ast.Resolved, depth: int, slot: int) -> None:
+        # the transpiler does its own binding analysis
+        pass
+
+    def resolve_global(self, expr: ast.Resolved, name: str) -> None:
+        pass
+
+    def interpret(self, statements: list[ast.Stmt]) -> None:
+        result = transpile(statements, metered=self.fuel != math.inf)
+        self._chunks += 1
+        filename = f"<rift-py-{self._chunks}>"
+        self._names[filename] = result.names
+        exec(compile(result.source, filename, "exec"), self.namespace)  # noqa: S102
+        main = self.namespace["_rift_main"]
+        assert callable(main)
+        try:
+            main()
+        except (NameError, AttributeError) as exc:
+            error = self._translate(exc, exc.__traceback__)
+            if error is None:
+                raise
+            raise error from None
+
+    def _translate(
+        self, exc: NameError | AttributeError, tb: TracebackType | None
+    ) -> RiftRuntimeError | None:
+        """Map a NameError/AttributeError in generated code to the Rift token."""
+        names: dict[str, Token] | None = None
+        while tb is not None:
+            table = self._names.get(tb.tb_frame.f_code.co_filename)
+            if table is not None:
+                names = table.get(tb.tb_lineno)
+            tb = tb.tb_next
+        if names is None or exc.name is None or exc.name not in names:
+            return None
+        token = names[exc.name]
+        if isinstance(exc, NameError):
+            return RiftRuntimeError(token, f"undefined variable '{token.lexeme}'")
+        return RiftRuntimeError(token, f"undefined property '{token.lexeme}'")
+
+
+def main(argv: list[str] | None = None) -> int:
+    """``rift transpile script.rf [-o out.py]``"""
+    import argparse
+
+    from rift.parser import Parser
+    from rift.resolver import Resolver
+    from rift.scanner import Scanner
+
+    parser = argparse.ArgumentParser(prog="rift transpile")
+    parser.add_argument("script")
+    parser.add_argument("-o", "--output", help="write to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    with open(args.script, encoding="utf-8") as f:
+        source = f.read()
+    scanner = Scanner(source)
+    scanner.scan_tokens()
+    errors: list[object] = list(scanner.errors)
+    statements: list[ast.Stmt] = []
+    if not errors:
+        parser_ = Parser(scanner.tokens)
+        statements = parser_.parse()
+        errors.extend(parser_.errors)
+    if not errors:
+        resolver = Resolver(PyInterpreter())
+        resolver.resolve(statements)
+        errors.extend(resolver.errors)
+    if errors:
+        for err in errors:
+            print(err, file=sys.stderr)
+        return 1
+    module = to_module(statements, args.script)
+    if args.output is None:
+        sys.stdout.write(module)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(module)
+    return 0
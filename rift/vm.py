@@ -0,0 +1,538 @@
+"""Stack virtual machine that executes bytecode produced by rift.compiler."""
+
+from __future__ import annotations
+
+from rift import ast_nodes as ast
+from rift.callable import NativeFunction
+from rift.compiler import (
+    OP_ADD,
+    OP_CALL,
+    OP_CLASS,
+    OP_CLOSE_UPVALUE,
+    OP_CLOSURE,
+    OP_CONSTANT,
+    OP_DEFINE_GLOBAL,
+    OP_DIVIDE,
+    OP_EQUAL,
+    OP_FALSE,
+    OP_GET_GLOBAL,
+    OP_GET_LOCAL,
+    OP_GET_PROPERTY,
+    OP_GET_SUPER,
+    OP_GET_UPVALUE,
+    OP_GREATER,
+    OP_GREATER_EQUAL,
+    OP_INHERIT,
+    OP_INVOKE,
+    OP_JUMP,
+    OP_JUMP_IF_FALSE,
+    OP_JUMP_IF_TRUE,
+    OP_LESS,
+    OP_LESS_EQUAL,
+    OP_LOOP,
+    OP_METHOD,
+    OP_MODULO,
+    OP_MULTIPLY,
+    OP_NEGATE,
+    OP_NIL,
+    OP_NOT,
+    OP_NOT_EQUAL,
+    OP_POP,
+    OP_POP_JUMP_IF_FALSE,
+    OP_PRINT,
+    OP_RETURN,
+    OP_SET_GLOBAL,
+    OP_SET_LOCAL,
+    OP_SET_PROPERTY,
+    OP_SET_UPVALUE,
+    OP_SUBTRACT,
+    OP_SUPER_INVOKE,
+    OP_TRUE,
+    Compiler,
+    FunctionProto,
+)
+from rift.errors import OutOfFuelError, RiftRuntimeError
+from rift.interpreter import Interpreter
+from rift.stdlib import stringify, type_name
+from rift.tiering import UNDEFINED
+from rift.tokens import Token
+
+DEFAULT_MAX_DEPTH = 10_000
+
+
+class Upvalue:
+    """A captured variable: points at a stack slot while open, owns the value once closed."""
+
+    __slots__ = ("closed", "is_open", "location")
+
+    def __init__(self, location: int) -> None:
+        self.location = location
+        self.closed: object = None
+        self.is_open = True
+
+
+class Closure:
+    __slots__ = ("proto", "upvalues")
+
+    def __init__(self, proto: FunctionProto, upvalues: list[Upvalue]) -> None:
+        self.proto = proto
+        self.upvalues = upvalues
+
+    def __repr__(self) -> str:
+        return f"<fn {self.proto.name}>"
+
+
+class BoundMethod:
+    __slots__ = ("method", "receiver")
+
+    def __init__(self, receiver: VMInstance, method: Closure) -> None:
+        self.receiver = receiver
+        self.method = method
+
+    def __repr__(self) -> str:
+        return f"<fn {self.method.proto.name}>"
+
+
+class VMClass:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        # inherited methods are copied down by OP_INHERIT, so lookup is one probe
+        self.methods: dict[str, Closure] = {}
+
+    def __repr__(self) -> str:
+        return f"<class {self.name}>"
+
+
+class VMInstance:
+    __slots__ = ("fields", "klass")
+
+    def __init__(self, klass: VMClass) -> None:
+        self.klass = klass
+        self.fields: dict[str, object] = {}
+
+    def __repr__(self) -> str:
+        return f"<{self.klass.name} instance>"
+
+
+class CallFrame:
+    __slots__ = ("base", "closure", "ip")
+
+    def __init__(self, closure: Closure, base: int) -> None:
+        self.closure = closure
+        self.ip = 0
+        self.base = base  # stack index of slot 0 (the callee or 'this')
+
+
+def _vm_type(value: object) -> str:
+    if isinstance(value, VMInstance):
+        return value.klass.name
+    return type_name(value)
+
+
+class VM(Interpreter):
+    """Bytecode engine. Shares globals and natives with the tree-walker.
+
+    Each interpret() call compiles the statements into a script prototype and
+    runs it to completion. Rift calls push CallFrames instead of recursing in
+    Python, so call depth is bounded by max_depth rather than the Python stack.
+    """
+
+    def __init__(self, max_depth: int = DEFAULT_MAX_DEPTH) -> None:
+        super().__init__()
+        self.globals.define("type", NativeFunction("type", _vm_type, 1))
+        self.max_depth = max_depth
+        self._stack: list[object] = []
+        self._frames: list[CallFrame] = []
+        self._open_upvalues: dict[int, Upvalue] = {}
+
+    def interpret(self, statements: list[ast.Stmt]) -> None:
+        proto = Compiler(self.globals).compile(statements)
+        script = Closure(proto, [])
+        self._stack.append(script)
+        self._frames.append(CallFrame(script, 0))
+        try:
+            self._run()
+        finally:
+            self._stack.clear()
+            self._frames.clear()
+            self._open_upvalues.clear()
+
+    def resolve(self, expr: ast.Resolved, depth: int, slot: int) -> None:
+        # the compiler assigns its own stack slots
+        pass
+
+    def resolve_global(self, expr: ast.Resolved, name: str) -> None:
+        # and interns global cells itself
+        pass
+
+    def _run(self) -> None:
+        stack = self._stack
+        frames = self._frames
+        push = stack.append
+        pop = stack.pop
+
+        frame = frames[-1]
+        closure = frame.closure
+        proto = closure.proto
+        code = proto.code
+        constants = proto.constants
+        upvalues = closure.upvalues
+        ip = frame.ip
+        base = frame.base
+
+        while True:
+            op = code[ip]
+            ip += 1
+
+            if op == OP_GET_LOCAL:
+                push(stack[base + code[ip]])
+                ip += 1
+            elif op == OP_CONSTANT:
+                push(constants[code[ip]])
+                ip += 1
+            elif op == OP_GET_GLOBAL:
+                cell = constants[code[ip]]
+                ip += 1
+                value = cell.value  # type: ignore[attr-defined]
+                if value is UNDEFINED:
+                    raise cell.undefined(proto.tokens[ip - 2])  # type: ignore[attr-defined]
+                push(value)
+            elif op == OP_POP_JUMP_IF_FALSE:
+                value = pop()
+                if value is None or value is False:
+                    ip = code[ip]
+                else:
+                    ip += 1
+            elif op == OP_LESS:
+                b = pop()
+                a = stack[-1]
+                if type(a) is not float or type(b) is not float:
+                    raise RiftRuntimeError(proto.tokens[ip - 1], "operands must be numbers")
+                stack[-1] = a < b
+            elif op == OP_ADD:
+                b = pop()
+                a = stack[-1]
+                if (type(a) is float and type(b) is float) or (
+                    type(a) is str and type(b) is str
+                ):
+                    stack[-1] = a + b  # type: ignore[operator]
+                else:
+                    raise RiftRuntimeError(
+                        proto.tokens[ip - 1], "operands must be two numbers or two strings"
+                    )
+            elif op == OP_SUBTRACT:
+                b = pop()
+                a = stack[-1]
+                if type(a) is not float or type(b) is not float:
+                    raise RiftRuntimeError(proto.tokens[ip - 1], "operands must be numbers")
+                stack[-1] = a - b
+            elif op == OP_SET_LOCAL:
+                stack[base + code[ip]] = stack[-1]
+                ip += 1
+            elif op == OP_POP:
+                pop()
+            elif op == OP_GET_UPVALUE:
+                up = upvalues[code[ip]]
+                push(stack[up.location] if up.is_open else up.closed)
+                ip += 1
+            elif op == OP_CALL:
+                argc = code[ip]
+                ip += 1
+                frame.ip = ip
+                if self._call_value(stack[-1 - argc], argc, proto.tokens[ip - 2]):
+                    frame = frames[-1]
+                    closure = frame.closure
+                    proto = closure.proto
+                    code = proto.code
+                    constants = proto.constants
+                    upvalues = closure.upvalues
+                    ip = 0
+                    base = frame.base
+            elif op == OP_RETURN:
+                result = pop()
+                if self._open_upvalues:
+                    self._close_upvalues(base)
+                frames.pop()
+                del stack[base:]
+                if not frames:
+                    return
+                push(result)
+                frame = frames[-1]
+                closure = frame.closure
+                proto = closure.proto
+                code = proto.code
+                constants = proto.constants
+                upvalues = closure.upvalues
+                ip = frame.ip
+                base = frame.base
+            elif op == OP_JUMP:
+                ip = code[ip]
+            elif op == OP_LOOP:
+                self.fuel -= 1
+                if self.fuel < 0:
+                    raise OutOfFuelError(proto.tokens[ip - 1])
+                ip = code[ip]
+            elif op == OP_GET_PROPERTY:
+                instance = stack[-1]
+                if type(instance) is not VMInstance:
+                    raise RiftRuntimeError(proto.tokens[ip - 1], "only instances have properties")
+                name = constants[code[ip]]
+                ip += 1
+                fields = instance.fields
+                if name in fields:
+                    stack[-1] = fields[name]
+                else:
+                    method = instance.klass.methods.get(name)  # type: ignore[call-overload]
+                    if method is None:
+                        raise RiftRuntimeError(
+                            proto.tokens[ip - 2], f"undefined property '{name}'"
+                        )
+                    stack[-1] = BoundMethod(instance, method)
+            elif op == OP_SET_PROPERTY:
+                value = pop()
+                instance = stack[-1]
+                if type(instance) is not VMInstance:
+                    raise RiftRuntimeError(proto.tokens[ip - 1], "only instances have fields")
+                instance.fields[constants[code[ip]]] = value  # type: ignore[index]
+                ip += 1
+                stack[-1] = value
+            elif op == OP_INVOKE:
+                name = constants[code[ip]]
+                argc = code[ip + 1]
+                ip += 2
+                frame.ip = ip
+                if self._invoke(name, argc, proto.tokens[ip - 3], proto.tokens[ip - 2]):  # type: ignore[arg-type]
+                    frame = frames[-1]
+                    closure = frame.closure
+                    proto = closure.proto
+                    code = proto.code
+                    constants = proto.constants
+                    upvalues = closure.upvalues
+                    ip = 0
+                    base = frame.base
+            elif op == OP_SET_UPVALUE:
+                up = upvalues[code[ip]]
+                if up.is_open:
+                    stack[up.location] = stack[-1]
+                else:
+                    up.closed = stack[-1]
+                ip += 1
+            elif op == OP_SET_GLOBAL:
+                cell = constants[code[ip]]
+                ip += 1
+                if cell.value is UNDEFINED:  # type: ignore[attr-defined]
+                    raise cell.undefined(proto.tokens[ip - 2])  # type: ignore[attr-defined]
+                cell.value = stack[-1]  # type: ignore[attr-defined]
+            elif op == OP_DEFINE_GLOBAL:
+                constants[code[ip]].value = pop()  # type: ignore[attr-defined]
+                ip += 1
+            elif op == OP_NIL:
+                push(None)
+            elif op == OP_TRUE:
+                push(True)
+            elif op == OP_FALSE:
+                push(False)
+            elif op == OP_EQUAL:
+                b = pop()
+                stack[-1] = stack[-1] == b
+            elif op == OP_NOT_EQUAL:
+                b = pop()
+                stack[-1] = stack[-1] != b
+            elif op == OP_GREATER:
+                b = pop()
+                a = stack[-1]
+                if type(a) is not float or type(b) is not float:
+                    raise RiftRuntimeError(proto.tokens[ip - 1], "operands must be numbers")
+                stack[-1] = a > b
+            elif op == OP_GREATER_EQUAL:
+                b = pop()
+                a = stack[-1]
+                if type(a) is not float or type(b) is not float:
+                    raise RiftRuntimeError(proto.tokens[ip - 1], "operands must be numbers")
+                stack[-1] = a >= b
+            elif op == OP_LESS_EQUAL:
+                b = pop()
+                a = stack[-1]
+                if type(a) is not float or type(b) is not float:
+                    raise RiftRuntimeError(proto.tokens[ip - 1], "operands must be numbers")
+                stack[-1] = a <= b
+            elif op == OP_MULTIPLY:
+                b = pop()
+                a = stack[-1]
+                if type(a) is not float or type(b) is not float:
+                    raise RiftRuntimeError(proto.tokens[ip - 1], "operands must be numbers")
+                stack[-1] = a * b
+            elif op == OP_DIVIDE:
+                b = pop()
+                a = stack[-1]
+                if type(a) is not float or type(b) is not float:
+                    raise RiftRuntimeError(proto.tokens[ip - 1], "operands must be numbers")
+                if b == 0:
+                    raise RiftRuntimeError(proto.tokens[ip - 1], "division by zero")
+                stack[-1] = a / b
+            elif op == OP_MODULO:
+                b = pop()
+                a = stack[-1]
+                if type(a) is not float or type(b) is not float:
+                    raise RiftRuntimeError(proto.tokens[ip - 1], "operands must be numbers")
+                if b == 0:
+                    raise RiftRuntimeError(proto.tokens[ip - 1], "modulo by zero")
+                stack[-1] = a % b
+            elif op == OP_NOT:
+                value = stack[-1]
+                stack[-1] = value is None or value is False
+            elif op == OP_NEGATE:
+                value = stack[-1]
+                if type(value) is not float:
+                    raise RiftRuntimeError(proto.tokens[ip - 1], "operand must be a number")
+                stack[-1] = -value
+            elif op == OP_JUMP_IF_FALSE:
+                value = stack[-1]
+                if value is None or value is False:
+                    ip = code[ip]
+                else:
+                    ip += 1
+            elif op == OP_JUMP_IF_TRUE:
+                value = stack[-1]
+                if value is None or value is False:
+                    ip += 1
+                else:
+                    ip = code[ip]
+            elif op == OP_PRINT:
+                print(stringify(pop()))
+            elif op == OP_CLOSURE:
+                fn_proto = constants[code[ip]]
+                assert isinstance(fn_proto, FunctionProto)
+                ip += 1
+                captured: list[Upvalue] = []
+                for _ in range(fn_proto.upvalue_count):
+                    if code[ip]:
+                        captured.append(self._capture_upvalue(base + code[ip + 1]))
+                    else:
+                        captured.append(upvalues[code[ip + 1]])
+                    ip += 2
+                push(Closure(fn_proto, captured))
+            elif op == OP_CLOSE_UPVALUE:
+                self._close_upvalues(len(stack) - 1)
+                pop()
+            elif op == OP_GET_SUPER:
+                superclass = pop()
+                instance = pop()
+                assert isinstance(superclass, VMClass) and isinstance(instance, VMInstance)
+                name = constants[code[ip]]
+                ip += 1
+                method = superclass.methods.get(name)  # type: ignore[call-overload]
+                if method is None:
+                    raise RiftRuntimeError(proto.tokens[ip - 2], f"undefined property '{name}'")
+                push(BoundMethod(instance, method))
+            elif op == OP_SUPER_INVOKE:
+                superclass = pop()
+                assert isinstance(superclass, VMClass)
+                name = constants[code[ip]]
+                argc = code[ip + 1]
+                ip += 2
+                frame.ip = ip
+                method = superclass.methods.get(name)  # type: ignore[call-overload]
+                if method is None:
+                    raise RiftRuntimeError(proto.tokens[ip - 2], f"undefined property '{name}'")
+                self._call_closure(method, argc, proto.tokens[ip - 3])
+                frame = frames[-1]
+                closure = frame.closure
+                proto = closure.proto
+                code = proto.code
+                constants = proto.constants
+                upvalues = closure.upvalues
+                ip = 0
+                base = frame.base
+            elif op == OP_CLASS:
+                push(VMClass(constants[code[ip]]))  # type: ignore[arg-type]
+                ip += 1
+            elif op == OP_INHERIT:
+                superclass = stack[-2]
+                if not isinstance(superclass, VMClass):
+                    raise RiftRuntimeError(proto.tokens[ip - 1], "superclass must be a class")
+                subclass = pop()
+                assert isinstance(subclass, VMClass)
+                subclass.methods.update(superclass.methods)
+            elif op == OP_METHOD:
+                method = pop()
+                klass = stack[-1]
+                assert isinstance(method, Closure) and isinstance(klass, VMClass)
+                klass.methods[constants[code[ip]]] = method  # type: ignore[index]
+                ip += 1
+            else:  # pragma: no cover - the compiler only emits known opcodes
+                raise AssertionError(f"unknown opcode {op}")
+
+    # -- calls --
+
+    def _call_value(self, callee: object, argc: int, paren: Token) -> bool:
+        """Call the value below the arguments. Returns True if a new frame was pushed."""
+        stack = self._stack
+        if type(callee) is Closure:
+            self._call_closure(callee, argc, paren)
+            return True
+        if type(callee) is BoundMethod:
+            stack[-1 - argc] = callee.receiver
+            self._call_closure(callee.method, argc, paren)
+            return True
+        if type(callee) is VMClass:
+            stack[-1 - argc] = VMInstance(callee)
+            initializer = callee.methods.get("init")
+            if initializer is not None:
+                self._call_closure(initializer, argc, paren)
+                return True
+            if argc != 0:
+                raise RiftRuntimeError(paren, f"expected 0 arguments but got {argc}")
+            return False
+        if isinstance(callee, NativeFunction):
+            if argc != callee.arity():
+                raise RiftRuntimeError(
+                    paren, f"expected {callee.arity()} arguments but got {argc}"
+                )
+            start = len(stack) - argc
+            result = callee.call(self, stack[start:])
+            del stack[start - 1 :]
+            stack.append(result)
+            return False
+        raise RiftRuntimeError(paren, "can only call functions and classes")
+
+    def _invoke(self, name: str, argc: int, paren: Token, name_token: Token) -> bool:
+        receiver = self._stack[-1 - argc]
+        if type(receiver) is not VMInstance:
+            raise RiftRuntimeError(name_token, "only instances have properties")
+        if name in receiver.fields:
+            value = receiver.fields[name]
+            self._stack[-1 - argc] = value
+            return self._call_value(value, argc, paren)
+        method = receiver.klass.methods.get(name)
+        if method is None:
+            raise RiftRuntimeError(name_token, f"undefined property '{name}'")
+        self._call_closure(method, argc, paren)
+        return True
+
+    def _call_closure(self, closure: Closure, argc: int, paren: Token) -> None:
+        if argc != closure.proto.arity:
+            raise RiftRuntimeError(
+                paren, f"expected {closure.proto.arity} arguments but got {argc}"
+            )
+        if len(self._frames) >= self.max_depth:
+            raise RiftRuntimeError(paren, "stack overflow")
+        self.fuel -= 1
+        if self.fuel < 0:
+            raise OutOfFuelError(closure.proto.name_token or paren)
+        self._frames.append(CallFrame(closure, len(self._stack) - argc - 1))
+
+    # -- upvalues --
+
+    def _capture_upvalue(self, location: int) -> Upvalue:
+        upvalue = self._open_upvalues.get(location)
+        if upvalue is None:
+            upvalue = Upvalue(location)
+            self._open_upvalues[location] = upvalue
+        return upvalue
+
+    def _close_upvalues(self, last: int) -> None:
+        for location in [loc for loc in self._open_upvalues if loc >= last]:
+            upvalue = self._open_upvalues.pop(location)
+            upvalue.closed = self._stack[location]
+            upvalue.is_open = False
@@ -3,6 +3,23 @@
 import sys
 from pathlib import Path
 
+import pytest
+
 root = Path(__file__).resolve().parent.parent
 if str(root) not in sys.path:
     sys.path.insert(0, str(root))
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption(
+        "--engine",
+        default="tree",
+        help="execution engine used by rift.__main__.run() (default: tree)",
+    )
+
+
+@pytest.fixture(autouse=True)
+def _default_engine(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> None:
+    import rift.__main__
+
+    monkeypatch.setattr(rift.__main__, "DEFAULT_ENGINE", request.config.getoption("--engine"))
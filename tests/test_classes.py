@@ -5,6 +5,9 @@ from __future__ import annotations
 import pytest
 
 from rift.__main__ import run
+from rift.callable import RiftClass
+from rift.instance import RiftInstance
+from rift.interpreter import Interpreter
 
 
 def test_class_init_and_method(capsys: pytest.CaptureFixture[str]) -> None:
@@ -59,3 +62,100 @@ def test_super_method_dispatch(capsys: pytest.CaptureFixture[str]) -> None:
     ok = run(src)
     assert ok is True
     assert capsys.readouterr().out.strip() == "sam noise bark"
+
+
+def test_fields_shadow_methods_and_keep_values(capsys: pytest.CaptureFixture[str]) -> None:
+    src = """
+    class P { init(x) { this.x = x; } m() { return "method"; } }
+    let a = P(1); let b = P(2);
+    b.y = 3; b.x = 20; a.m = "field";
+    print(a.x); print(b.x + b.y); print(a.m); print(b.m());
+    """
+    assert run(src) is True
+    assert capsys.readouterr().out == "1\n23\nfield\nmethod\n"
+
+
+def test_instances_built_alike_share_a_shape() -> None:
+    interpreter = Interpreter()
+    src = """
+    class P { init(x, y) { this.x = x; this.y = y; } }
+    class Q < P {}
+    let a = P(1, 2); let b = P(3, 4); let c = P(5, 6); c.z = 7;
+    let d = P(0, 0); d.y = 1; let q = Q(1, 2);
+    let e = P(0, 0); e.z = 0;
+    """
+    assert run(src, interpreter) is True
+    a, b, c, d, e, q = (interpreter.globals.cells[n].value for n in "abcdeq")
+    assert isinstance(a, RiftInstance) and isinstance(b, RiftInstance)
+    assert isinstance(c, RiftInstance) and isinstance(d, RiftInstance)
+    assert isinstance(e, RiftInstance) and isinstance(q, RiftInstance)
+    assert a.shape is b.shape is d.shape
+    assert a.shape.slots == {"x": 0, "y": 1} and d.values == [0.0, 1.0]
+    assert c.shape is e.shape and c.shape.slots == {"x": 0, "y": 1, "z": 2}
+    # each class has its own root shape
+    assert q.shape is not a.shape and q.shape.slots == a.shape.slots
+
+
+def test_deep_hierarchies_inherit_methods_and_initializer(
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    src = """
+    class A { init(n) { this.n = n; } who() { return "A"; } base() { return this.n; } }
+    class B < A { who() { return "B" + super.who(); } }
+    class C < B {}
+    class D < C { who() { return "D" + super.who(); } }
+    let d = D(7);
+    print(d.who()); print(d.base()); print(C(1).who());
+    D();
+    """
+    assert run(src) is False
+    captured = capsys.readouterr()
+    assert captured.out == "DBA\n7\nBA\n"
+    assert "expected 1 arguments but got 0" in captured.err
+
+
+def test_class_method_table_is_flattened() -> None:
+    interpreter = Interpreter()
+    src = "class A { init() {} m() {} } class B < A { m() {} n() {} }"
+    assert run(src, interpreter) is True
+    a, b = (interpreter.globals.cells[n].value for n in "AB")
+    assert isinstance(a, RiftClass) and isinstance(b, RiftClass)
+    assert sorted(b.methods) == ["init", "m", "n"]
+    assert b.initializer is a.initializer is a.methods["init"]
+    assert b.methods["m"] is not a.methods["m"]
+
+
+def test_method_calls_match_bound_method_calls(capsys: pytest.CaptureFixture[str]) -> None:
+    src = """
+    class P {
+      init(x) { this.x = x; }
+      get() { return this.x; }
+      add(n) { return P(this.x + n); }
+      maker() { fn f() { return this.x; } return f; }
+    }
+    let p = P(1);
+    let g = p.get;
+    p.x = 2;
+    print(g()); print(p.add(3).get()); print(p.maker()()); print(p.init(5).x);
+    fn twice() { return 2; }
+    p.get = twice;
+    print(p.get());
+    p.add();
+    """
+    assert run(src) is False
+    captured = capsys.readouterr()
+    assert captured.out == "2\n5\n2\n5\n2\n"
+    assert "expected 1 arguments but got 0" in captured.err
+
+
+def test_method_calls_do_not_bind() -> None:
+    interpreter = Interpreter(tiering=False)
+    src = """
+    class P { init() { this.x = 1; } get() { return this.x; } }
+    let p = P();
+    for (let i = 0; i < 100; i = i + 1) p.get();
+    """
+    assert run(src, interpreter) is True
+    # 'this' and the call frame of init and each get() share two environments
+    pool = interpreter.frame_pool
+    assert (pool.misses, pool.hits) == (2, 200)
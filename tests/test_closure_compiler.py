@@ -0,0 +1,33 @@
+"""Closure-compilation engine tests."""
+
+from __future__ import annotations
+
+import pytest
+
+from rift.__main__ import run
+from rift.closure_compiler import ClosureInterpreter, CompiledFunction
+
+
+def test_functions_are_compiled_once(capsys: pytest.CaptureFixture[str]) -> None:
+    interpreter = ClosureInterpreter()
+    assert run("fn sq(x) { return x * x; } print(sq(7));", interpreter) is True
+    fn = interpreter.globals.cells["sq"].value
+    assert isinstance(fn, CompiledFunction)
+    assert capsys.readouterr().out.strip() == "49"
+
+
+def test_bound_methods_stay_compiled(capsys: pytest.CaptureFixture[str]) -> None:
+    src = """
+    class Acc {
+      init() { this.total = 0; }
+      add(n) { this.total = this.total + n; return this; }
+    }
+    print(Acc().add(2).add(3).total);
+    """
+    assert run(src, engine="closure") is True
+    assert capsys.readouterr().out.strip() == "5"
+
+
+def test_runtime_error_keeps_operator_line(capsys: pytest.CaptureFixture[str]) -> None:
+    assert run('let s = "a";\nprint(-s);', engine="closure") is False
+    assert "[line 2] Runtime error: operand must be a number" in capsys.readouterr().err
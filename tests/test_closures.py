@@ -4,7 +4,10 @@ from __future__ import annotations
 
 import pytest
 
-from rift.__main__ import run
+from rift.__main__ import create_interpreter, run
+from rift.callable import RiftFunction
+from rift.instance import RiftInstance
+from rift.interpreter import Interpreter
 
 
 def test_closure_counter(capsys: pytest.CaptureFixture[str]) -> None:
@@ -54,3 +57,49 @@ def test_closure_instances_keep_separate_state(capsys: pytest.CaptureFixture[str
     assert ok is True
     out = [line.strip() for line in capsys.readouterr().out.splitlines() if line.strip()]
     assert out == ["1", "2", "1"]
+
+
+RECYCLING = """
+fn leaf(x) { return x + 1; }
+fn make(x) { let y = leaf(x); fn get() { return y; } return get; }
+let a = make(1); let b = make(10);
+print(a() + b()); print(leaf(leaf(1)));
+"""
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_frames_outlive_calls_only_when_captured(
+    capsys: pytest.CaptureFixture[str], lazy: bool
+) -> None:
+    assert run(RECYCLING, lazy=lazy) is True
+    assert capsys.readouterr().out == "13\n3\n"
+
+
+def test_frames_nothing_captures_are_recycled() -> None:
+    interpreter = Interpreter(tiering=False)
+    assert run(RECYCLING, interpreter) is True
+    # leaf and get run six times, one at a time; make's frames escape
+    pool = interpreter.frame_pool
+    assert (pool.misses, pool.hits, len(pool.free)) == (1, 5, 1)
+
+
+@pytest.mark.parametrize("engine", ["tree", "closure", "stackless"])
+def test_closures_do_not_keep_folded_block_locals(engine: str) -> None:
+    src = """
+    class Big {}
+    fn after() { { let big = Big(); } let x = 1; fn get() { return x; } return get; }
+    fn within() { let x = 2; fn get() { return x; } { let big = Big(); return get; } }
+    fn loop() {
+      fn get() { return 3; }
+      for (let i = 0; i < 60; i = i + 1) { let big = Big(); }
+      return get;
+    }
+    let a = after(); let b = within(); let c = loop();
+    print(a() + b() + c());
+    """
+    interpreter = create_interpreter(engine)
+    assert run(src, interpreter) is True
+    for name in "abc":
+        get = interpreter.globals.cells[name].value
+        assert isinstance(get, RiftFunction)
+        assert not any(isinstance(value, RiftInstance) for value in get.closure.slots)
@@ -0,0 +1,23 @@
+"""Every engine must produce the reference tree-walker's output."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from rift.__main__ import ENGINES, run
+
+EXAMPLES = sorted((Path(__file__).resolve().parent.parent / "examples").glob("*.rf"))
+
+
+@pytest.mark.parametrize("engine", sorted(ENGINES))
+@pytest.mark.parametrize("example", EXAMPLES, ids=lambda p: p.stem)
+def test_examples_match_tree_walker(
+    engine: str, example: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    source = example.read_text(encoding="utf-8")
+    assert run(source, engine="tree") is True
+    expected = capsys.readouterr().out
+    assert run(source, engine=engine) is True
+    assert capsys.readouterr().out == expected
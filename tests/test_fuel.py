@@ -0,0 +1,50 @@
+"""Fuel metering: a budget charged per loop iteration and per call."""
+
+from __future__ import annotations
+
+import pytest
+
+from rift.__main__ import create_interpreter, run
+from rift.errors import OutOfFuelError, RiftRuntimeError
+
+
+def test_endless_loop_runs_out_of_fuel(capsys: pytest.CaptureFixture[str]) -> None:
+    src = "let n = 0;\nwhile (true) {\n  n = n + 1;\n}"
+    assert run(src, create_interpreter(fuel=1000)) is False
+    assert "[line 2] Runtime error: out of fuel" in capsys.readouterr().err
+
+
+def test_endless_recursion_runs_out_of_fuel(capsys: pytest.CaptureFixture[str]) -> None:
+    src = "fn spin(n) {\n  return spin(n + 1);\n}\nspin(0);"
+    assert run(src, create_interpreter(fuel=100)) is False
+    assert "[line 1] Runtime error: out of fuel" in capsys.readouterr().err
+
+
+def test_every_engine_charges_the_same(capsys: pytest.CaptureFixture[str]) -> None:
+    # 200 + 100 iterations (both long enough for the loop JIT) and 12 calls
+    src = """
+    fn add(a, b) { return a + b; }
+    let s = 0;
+    for (let i = 0; i < 200; i = i + 1) s = s + 1;
+    let j = 0;
+    while (j < 100) j = j + 1;
+    for (let k = 0; k < 12; k = k + 1) s = add(s, k);
+    print(s);
+    """
+    interpreter = create_interpreter(fuel=10_000)
+    assert run(src, interpreter) is True
+    assert capsys.readouterr().out == "266\n"
+    assert interpreter.fuel == 10_000 - 200 - 100 - 12 - 12
+
+
+def test_out_of_fuel_is_a_runtime_error_and_refuelable(
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    assert issubclass(OutOfFuelError, RiftRuntimeError)
+    interpreter = create_interpreter(fuel=5)
+    assert run("fn f() {}\nf(); f(); f(); f(); f(); f();", interpreter) is False
+    assert "[line 1] Runtime error: out of fuel" in capsys.readouterr().err
+    interpreter.fuel = 10
+    assert run("f(); print(1);", interpreter) is True
+    assert capsys.readouterr().out == "1\n"
+    assert interpreter.fuel == 9
@@ -0,0 +1,174 @@
+"""Fused superinstruction nodes (rift/fuse.py)."""
+
+from __future__ import annotations
+
+import pytest
+
+from rift import ast_nodes as ast
+from rift.__main__ import run
+from rift.fuse import (
+    CountingLoopStmt,
+    LocalBinaryExpr,
+    LocalUpdateExpr,
+    NativeCallExpr,
+    ThisGetExpr,
+    ThisSetExpr,
+)
+from rift.interpreter import Interpreter
+from rift.parser import Parser
+from rift.resolver import Resolver
+from rift.scanner import Scanner
+
+
+def _program(src: str, lazy: bool = False) -> tuple[Interpreter, list[ast.Stmt]]:
+    interpreter = Interpreter(jit=False, tiering=False)
+    s = Scanner(src)
+    s.scan_tokens()
+    statements = Parser(s.tokens, lazy).parse()
+    Resolver(interpreter).resolve(statements)
+    return interpreter, statements
+
+
+def test_idioms_are_fused() -> None:
+    src = """
+    class C { init() { this.n = 0; } get() { return this.n; } }
+    fn f(n) { let s = 0; for (let i = 0; i < n; i = i + 1) s = s + clock() * 0; return s; }
+    """
+    interpreter, statements = _program(src)
+    interpreter.interpret(statements)
+    klass, fn = statements
+    assert isinstance(klass, ast.ClassStmt) and isinstance(fn, ast.FunctionStmt)
+    init, get = klass.methods
+    assert type(init.body[0].expression) is ThisSetExpr  # type: ignore[union-attr]
+    assert type(get.body[0].value) is ThisGetExpr  # type: ignore[union-attr]
+    block = fn.body[1]
+    assert isinstance(block, ast.BlockStmt)
+    loop = block.statements[1]
+    assert isinstance(loop, ast.WhileStmt) and isinstance(loop.body, ast.BlockStmt)
+    assert type(loop.condition) is LocalBinaryExpr
+    update, increment = loop.body.statements
+    assert isinstance(update, ast.ExpressionStmt) and isinstance(increment, ast.ExpressionStmt)
+    assert type(increment.expression) is LocalUpdateExpr
+    assert isinstance(update.expression, ast.AssignExpr)
+    assert isinstance(update.expression.value, ast.BinaryExpr)
+    assert isinstance(update.expression.value.right, ast.BinaryExpr)
+    assert type(update.expression.value.right.left) is NativeCallExpr
+
+
+def test_fused_nodes_keep_generic_semantics(capsys: pytest.CaptureFixture[str]) -> None:
+    src = """
+    class P { init() { this.v = "a"; } m() { return "m"; } both() { return this.v + this.m(); } }
+    fn f(a, b) { let s = a; s = s + b; return s; }
+    print(P().both()); print(f("x", "y")); print(f(1, 2));
+    fn g(a, b) { return a < b; }
+    print(g(1, 2)); print(g("a", 1));
+    """
+    assert run(src, Interpreter()) is False
+    captured = capsys.readouterr()
+    assert captured.out == "am\nxy\n3\ntrue\n"
+    assert "[line 5] Runtime error: operands must be numbers" in captured.err
+
+
+def test_native_call_falls_back_after_redefinition(capsys: pytest.CaptureFixture[str]) -> None:
+    src = """
+    fn t(x) { return str(x); }
+    print(t(1) + t(2));
+    fn str(x) { return "mine"; }
+    print(t(3));
+    """
+    assert run(src, Interpreter()) is True
+    assert capsys.readouterr().out == "12\nmine\n"
+
+
+def test_native_call_reads_callee_before_arguments(
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    src = """
+    fn other(x) { return "other"; }
+    fn g() { str = other; return 1; }
+    print(str(g()));
+    print(str(g()));
+    """
+    outputs = []
+    for fusion in (True, False):
+        assert run(src, Interpreter(fusion=fusion)) is True
+        outputs.append(capsys.readouterr().out)
+    assert outputs[0] == outputs[1] == "1\nother\n"
+
+
+def test_lazy_bodies_are_fused_when_parsed() -> None:
+    interpreter, statements = _program("fn f(i) { i = i + 1; return i; } f(1);", lazy=True)
+    interpreter.interpret(statements)
+    fn = statements[0]
+    assert isinstance(fn, ast.FunctionStmt)
+    assert type(fn.body[0].expression) is LocalUpdateExpr  # type: ignore[union-attr]
+
+
+def test_counting_loops_run_with_a_native_counter(capsys: pytest.CaptureFixture[str]) -> None:
+    src = """
+    fn f(n) { let s = 0; for (let i = 0; i < n; i = i + 1) { s = s + i; } return s; }
+    fn g() { let t = ""; for (let i = 10; i > 0; i = i - 3) t = t + str(i); return t; }
+    fn h(n) { for (let i = 0; i <= n; i = i + 1) if (i * i > n) return i; }
+    print(f(5)); print(g()); print(h(30));
+    """
+    interpreter, statements = _program(src)
+    interpreter.interpret(statements)
+    assert capsys.readouterr().out == "10\n10741\n6\n"
+    for fn in statements[:3]:
+        assert isinstance(fn, ast.FunctionStmt)
+        assert any(type(stmt) is CountingLoopStmt for stmt in fn.body)
+
+
+def test_counting_loop_bails_out_on_assignment_or_capture(
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    src = """
+    for (let i = 0; i < 6; i = i + 1) { if (i == 1) i = 3; print(i); }
+    for (let i = 0; i < 2; i = i + 1) { fn show() { print(i); } show(); }
+    for (let i = 0; i < 1; i = i + 1) { fn bump() { i = 5; } bump(); print(i); }
+    """
+    interpreter, statements = _program(src)
+    interpreter.interpret(statements)
+    assert capsys.readouterr().out == "0\n3\n4\n5\n0\n1\n5\n"
+    assert not any(type(stmt) is CountingLoopStmt for stmt in statements)
+
+
+def test_counting_loop_bails_out_on_assignment_in_limit(
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    src = """
+    fn g(x) { return 12; }
+    for (let i = 0; i < g(i = i + 2); i = i + 1) print(i);
+    """
+    outputs = []
+    for fusion in (True, False):
+        assert run(src, Interpreter(fusion=fusion)) is True
+        outputs.append(capsys.readouterr().out)
+    assert outputs[0] == outputs[1] == "2\n5\n8\n11\n"
+
+
+def test_counting_loop_keeps_generic_errors(capsys: pytest.CaptureFixture[str]) -> None:
+    src = """
+    for (let i = 0; i < 2; i = i + 1) print(i);
+    for (let i = "a"; i < 2; i = i + 1) print(i);
+    """
+    assert run(src, Interpreter()) is False
+    captured = capsys.readouterr()
+    assert captured.out == "0\n1\n"
+    assert "[line 3] Runtime error: operands must be numbers" in captured.err
+    assert run('for (let i = 0; i < "n"; i = i + 1) print(i);', Interpreter()) is False
+    assert "operands must be numbers" in capsys.readouterr().err
+
+
+def test_hot_counting_loop_is_handed_to_the_jit(capsys: pytest.CaptureFixture[str]) -> None:
+    interpreter = Interpreter()
+    s = Scanner("let s = 0; for (let i = 0; i < 200; i = i + 1) s = s + i; print(s);")
+    s.scan_tokens()
+    statements = Parser(s.tokens).parse()
+    Resolver(interpreter).resolve(statements)
+    interpreter.interpret(statements)
+    assert capsys.readouterr().out == "19900\n"
+    block = statements[1]
+    assert type(block) is CountingLoopStmt
+    assert interpreter._loop_jit is not None
+    assert interpreter._loop_jit.compiled(block.loop) is not None
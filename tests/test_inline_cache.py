@@ -0,0 +1,91 @@
+"""Property inline caches (rift/inline_cache.py)."""
+
+from __future__ import annotations
+
+import pytest
+
+from rift.__main__ import run, run_prompt
+from rift.inline_cache import MAX_SHAPES, GetCache, SetCache, report
+from rift.interpreter import Interpreter
+
+SHAPES = """
+class A { init() { this.v = "a"; } m() { return "A.m"; } }
+class B { init() { this.w = 0; this.v = "b"; } }
+class C < A { m() { return "C.m"; } }
+class D { v() { return "D.v"; } }
+class E { init() { this.v = "e"; } }
+fn v(o) { return o.v; }
+fn m(o) { return o.m(); }
+fn set(o) { o.v = "set"; return o.v; }
+let out = "";
+for (let i = 0; i < 2; i = i + 1) {
+  out = out + v(A()) + v(B()) + v(C()) + v(E()) + m(A()) + m(C());
+  out = out + set(A()) + set(B()) + set(D()) + set(E());
+}
+print(out);
+print(D().v());
+"""
+
+
+def test_polymorphic_and_megamorphic_sites_keep_semantics(
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    assert run(SHAPES) is True
+    once = "abaeA.mC.msetsetsetset"
+    assert capsys.readouterr().out == once * 2 + "\nD.v\n"
+
+
+def test_missing_property_is_still_an_error(capsys: pytest.CaptureFixture[str]) -> None:
+    src = "class P { init() { this.x = 1; } } fn x(o) { return o.y; } print(x(P())); x(P());"
+    assert run(src) is False
+    assert "undefined property 'y'" in capsys.readouterr().err
+
+
+def test_stats_count_hits_per_site(capsys: pytest.CaptureFixture[str]) -> None:
+    interpreter = Interpreter()
+    interpreter.inline_caches = []
+    assert run(SHAPES, interpreter) is True
+    capsys.readouterr()
+    sites = {
+        (type(cache), cache.name.line): cache
+        for cache in interpreter.inline_caches
+        if cache.hits + cache.misses
+    }
+    read_v = sites[GetCache, 7]
+    assert read_v.state == "polymorphic" and (read_v.hits, read_v.misses) == (3, 4)
+    write_v = sites[SetCache, 9]
+    # D's instances gain the field here; the others overwrite it
+    assert write_v.state == "polymorphic" and write_v.misses == 4
+    # the inline entry stays empty while counting, so every access is counted
+    assert all(cache.shape is None for cache in interpreter.inline_caches)
+    lines = report(interpreter.inline_caches).splitlines()
+    assert lines[-1].startswith("inline caches: ")
+    assert any(line.startswith("[line 7] get .v: 3/7 hits") for line in lines)
+
+
+def test_sites_give_up_past_max_shapes() -> None:
+    classes = "".join(f"class K{i} {{ init() {{ this.f = {i}; }} }}\n" for i in range(6))
+    calls = " + ".join(f"f(K{i}())" for i in range(6))
+    interpreter = Interpreter()
+    interpreter.inline_caches = []
+    assert run(classes + f"fn f(o) {{ return o.f; }} let s = {calls};", interpreter) is True
+    (site,) = [
+        c for c in interpreter.inline_caches if isinstance(c, GetCache) and c.hits + c.misses
+    ]
+    assert site.state == "megamorphic" and site.entries is None
+    assert site.misses == 6 - 1 and MAX_SHAPES < 6
+
+
+def test_prompt_reports_stats_on_exit(
+    capsys: pytest.CaptureFixture[str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    lines = iter(["class P { init() { this.x = 1; } }", "print(P().x);"])
+
+    def read(prompt: str) -> str:
+        for line in lines:
+            return line
+        raise EOFError
+
+    monkeypatch.setattr("builtins.input", read)
+    run_prompt(ic_stats=True)
+    assert capsys.readouterr().err.splitlines()[-1].startswith("inline caches: ")
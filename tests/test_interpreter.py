@@ -2,9 +2,17 @@
 
 from __future__ import annotations
 
+import sys
+
 import pytest
 
+from rift import ast_nodes as ast
 from rift.__main__ import run
+from rift.interpreter import Interpreter
+from rift.parser import Parser
+from rift.resolver import Resolver
+from rift.scanner import Scanner
+from rift.tiering import UNDEFINED
 
 
 def test_run_print(capsys: pytest.CaptureFixture[str]) -> None:
@@ -25,6 +33,20 @@ def test_run_function(capsys: pytest.CaptureFixture[str]) -> None:
     assert captured.out.strip() == "5"
 
 
+def test_return_unwinds_loops_and_blocks(capsys: pytest.CaptureFixture[str]) -> None:
+    run("""
+    fn find(limit) {
+      let i = 0;
+      while (true) { { if (i * i > limit) return i; } i = i + 1; }
+    }
+    fn nothing() { let x = 1; }
+    fn early() { return; print("unreachable"); }
+    print(find(50)); print(nothing()); print(early());
+    """)
+    captured = capsys.readouterr()
+    assert captured.out.split() == ["8", "nil", "nil"]
+
+
 def test_run_invalid_syntax_returns_false() -> None:
     ok = run("let x = ;")
     assert ok is False
@@ -45,3 +67,140 @@ def test_fibonacci_example(capsys: pytest.CaptureFixture[str]) -> None:
     run(fib_path.read_text())
     captured = capsys.readouterr()
     assert "55" in captured.out  # fib(10) = 55
+
+
+def test_resolver_numbers_slots_in_declaration_order() -> None:
+    s = Scanner("fn f(a, b) { let c = a; { let d = b; print(c + d); } }")
+    s.scan_tokens()
+    (fn,) = Parser(s.tokens).parse()
+    interpreter = Interpreter()
+    Resolver(interpreter).resolve([fn])
+    assert isinstance(fn, ast.FunctionStmt)
+    let_c, block = fn.body
+    assert isinstance(let_c, ast.LetStmt) and isinstance(block, ast.BlockStmt)
+    let_d, print_stmt = block.statements
+    assert isinstance(let_d, ast.LetStmt) and isinstance(print_stmt, ast.PrintStmt)
+    add = print_stmt.expression
+    assert isinstance(add, ast.BinaryExpr)
+    a, b, c, d = let_c.initializer, let_d.initializer, add.left, add.right
+    assert isinstance(a, ast.VariableExpr) and isinstance(b, ast.VariableExpr)
+    assert isinstance(c, ast.VariableExpr) and isinstance(d, ast.VariableExpr)
+    # nothing captures d, so the block shares the function's environment
+    assert [(v.depth, v.slot) for v in (a, b, c, d)] == [(0, 0), (0, 1), (0, 2), (0, 3)]
+    assert a.cell is b.cell is c.cell is d.cell is None
+    assert block.scope_size is None and fn.frame_size == 4
+
+
+def test_captured_block_variables_get_fresh_bindings(capsys: pytest.CaptureFixture[str]) -> None:
+    run("""
+    let fns = nil;
+    fn chain(prev, f) { fn call() { if (prev != nil) prev(); f(); } return call; }
+    for (let i = 0; i < 3; i = i + 1) {
+      let j = i * 10;
+      fn show() { print(j); }
+      fns = chain(fns, show);
+    }
+    { let k = "plain"; { let m = k + "!"; print(m); } }
+    fns();
+    """)
+    assert capsys.readouterr().out == "plain!\n0\n10\n20\n"
+
+
+def test_slots_survive_shadowing_and_closures(capsys: pytest.CaptureFixture[str]) -> None:
+    run("""
+    fn make() {
+      let a = "a"; let b = "b";
+      fn show() { print(a + b); }
+      { let b = "B"; let a = "A"; show(); print(a + b); }
+      class C { init() { this.v = b; } }
+      return C;
+    }
+    print(make()().v);
+    """)
+    assert capsys.readouterr().out == "ab\nAB\nb\n"
+
+
+def test_globals_resolve_to_interned_cells() -> None:
+    s = Scanner("fn f() { return g; } let g = 1; g = g + 1;")
+    s.scan_tokens()
+    fn, let_g, update = Parser(s.tokens).parse()
+    interpreter = Interpreter()
+    Resolver(interpreter).resolve([fn, let_g, update])
+    assert isinstance(fn, ast.FunctionStmt) and isinstance(update, ast.ExpressionStmt)
+    (ret,) = fn.body
+    assert isinstance(ret, ast.ReturnStmt)
+    read, assign = ret.value, update.expression
+    assert isinstance(assign, ast.AssignExpr)
+    cell = interpreter.globals.cells["g"]
+    assert isinstance(read, ast.VariableExpr)
+    assert read.cell is cell is assign.cell
+    assert read.depth == assign.depth == -1
+    assert cell.value is UNDEFINED
+    interpreter.interpret([let_g, update])
+    assert cell.value == 2.0
+
+
+def test_undefined_globals_fail_only_when_used(capsys: pytest.CaptureFixture[str]) -> None:
+    src = """
+    fn early() { return late; }
+    fn never() { return missing; }
+    let late = "ok";
+    print(early());
+    missing = 1;
+    """
+    assert run(src) is False
+    captured = capsys.readouterr()
+    assert captured.out == "ok\n"
+    assert "[line 6] Runtime error: undefined variable 'missing'" in captured.err
+
+
+def test_call_sites_check_each_new_callee(capsys: pytest.CaptureFixture[str]) -> None:
+    src = """
+    fn say(s) { print(s); return s; }
+    fn f0() { return "0"; }
+    fn f3(a, b, c) { return a + b + c; }
+    fn f4(a, b, c, d) { return a + b + c + d; }
+    print(f0() + f3(say("a"), say("b"), say("c")) + f4("w", "x", "y", "z"));
+    fn apply2(f) { return f(1, 2); }
+    fn add(a, b) { return a + b; }
+    fn sub(a, b) { return a - b; }
+    class Pair { init(a, b) { this.sum = a + b; } }
+    for (let i = 0; i < 3; i = i + 1) { print(apply2(add)); print(apply2(sub)); }
+    print(apply2(Pair).sum);
+    apply2(f3);
+    """
+    assert run(src) is False
+    captured = capsys.readouterr()
+    assert captured.out == "a\nb\nc\n0abcwxyz\n" + "3\n-1\n" * 3 + "3\n"
+    assert "expected 3 arguments but got 2" in captured.err
+
+
+# Rift recursion the match-based dispatch reached with 1000 Python frames to
+# spare: it spent five frames per Rift call
+BASELINE_DEPTH = 190
+
+
+@pytest.mark.parametrize(
+    "src",
+    [
+        "fn sum(n) { if (n == 0) return 0; return n + sum(n - 1); }\nprint(sum(N));",
+        (
+            "class C { sum(n) { if (n == 0) return 0; return n + this.sum(n - 1); } }\n"
+            "print(C().sum(N));"
+        ),
+    ],
+    ids=["function", "method"],
+)
+def test_recursion_depth_is_not_below_baseline(
+    src: str, capsys: pytest.CaptureFixture[str]
+) -> None:
+    depth, frame = 0, sys._getframe()
+    while frame.f_back is not None:
+        depth, frame = depth + 1, frame.f_back
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(depth + 1000)
+    try:
+        run(src.replace("N", str(BASELINE_DEPTH)))
+    finally:
+        sys.setrecursionlimit(limit)
+    assert capsys.readouterr().out == f"{BASELINE_DEPTH * (BASELINE_DEPTH + 1) // 2}\n"
@@ -0,0 +1,77 @@
+"""Tracing JIT tests for hot while-loops."""
+
+from __future__ import annotations
+
+import pytest
+
+from rift import ast_nodes as ast
+from rift.__main__ import run
+from rift.interpreter import Interpreter
+from rift.parser import Parser
+from rift.resolver import Resolver
+from rift.scanner import Scanner
+
+
+def _run(source: str) -> tuple[Interpreter, list[ast.Stmt]]:
+    s = Scanner(source)
+    s.scan_tokens()
+    statements = Parser(s.tokens).parse()
+    interpreter = Interpreter()
+    Resolver(interpreter).resolve(statements)
+    interpreter.interpret(statements)
+    return interpreter, statements
+
+
+def _loop(statements: list[ast.Stmt]) -> ast.WhileStmt:
+    return next(s for s in statements if isinstance(s, ast.WhileStmt))
+
+
+def test_hot_loop_is_compiled(capsys: pytest.CaptureFixture[str]) -> None:
+    interpreter, statements = _run(
+        "let i = 0; let s = 0; while (i < 1000) { let t = i * 2; s = s + t; i = i + 1; } print(s);"
+    )
+    assert capsys.readouterr().out == "999000\n"
+    assert interpreter._loop_jit is not None
+    compiled = interpreter._loop_jit.compiled(_loop(statements))
+    assert compiled is not None
+    assert "type(" not in compiled.source.split("try:")[1]
+
+
+def test_loop_with_calls_stays_in_tree_walker() -> None:
+    interpreter, statements = _run("fn f(x) { return x; } let i = 0; while (i < 100) i = f(i) + 1;")
+    assert interpreter._loop_jit is not None
+    assert interpreter._loop_jit.compiled(_loop(statements)) is None
+
+
+def test_type_change_falls_back(capsys: pytest.CaptureFixture[str]) -> None:
+    src = 'let i = 0; let x = 0; while (i < 100) { i = i + 1; if (i == 80) x = "s"; } print(x);'
+    assert run(src) is True
+    assert capsys.readouterr().out == "s\n"
+
+
+def test_runtime_error_writes_back_state(capsys: pytest.CaptureFixture[str]) -> None:
+    interpreter = Interpreter()
+    src = "let i = 0;\nwhile (i < 100) {\n  i = i + 1;\n  print(1 / (60 - i));\n}"
+    assert run(src, interpreter) is False
+    assert "[line 4] Runtime error: division by zero" in capsys.readouterr().err
+    assert interpreter.globals.cells["i"].value == 60.0
+
+
+@pytest.mark.parametrize("jit", [True, False])
+def test_division_evaluates_dividend_first(capsys: pytest.CaptureFixture[str], jit: bool) -> None:
+    loop = "while (i < 200) { s = s + (i = i + 1) / i; s = s + (i = i + 1) % i; }"
+    src = (
+        f"let i = 1; let s = 0; {loop} print(s);"
+        f"fn f() {{ let i = 1; let s = 0; {loop} return s; }} print(f());"
+    )
+    assert run(src, Interpreter(jit=jit)) is True
+    assert capsys.readouterr().out == "100\n100\n"
+
+
+def test_loops_of_later_runs_compile_afresh(capsys: pytest.CaptureFixture[str]) -> None:
+    # earlier runs' loops are collected, so new ones may reuse their ids
+    interpreter = Interpreter()
+    for k in range(200):
+        src = f"let i{k} = 0; let s{k} = 0; while (i{k} < 60) {{ s{k} = s{k} + {k}; i{k} = i{k} + 1; }}"
+        assert run(src + f" print(s{k});", interpreter) is True
+    assert capsys.readouterr().out.split() == [str(60 * k) for k in range(200)]
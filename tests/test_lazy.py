@@ -0,0 +1,118 @@
+"""Lazy parsing of function bodies (run(..., lazy=True) / --lazy)."""
+
+from __future__ import annotations
+
+import pytest
+
+from rift.__main__ import run, run_prompt
+from rift.interpreter import Interpreter
+from rift.parser import LazyFunctionStmt, Parser
+from rift.scanner import Scanner
+
+
+def _parse(src: str) -> Parser:
+    s = Scanner(src)
+    s.scan_tokens()
+    return Parser(s.tokens, lazy=True)
+
+
+def test_body_is_parsed_on_first_access() -> None:
+    p = _parse("fn f(a) { { let x = a; } return a; } print(1);")
+    fn, _ = p.parse()
+    assert isinstance(fn, LazyFunctionStmt) and not fn.parsed
+    assert [param.lexeme for param in fn.params] == ["a"]
+    assert len(fn.body) == 2
+    assert fn.parsed
+
+
+def test_lazy_program_matches_eager(capsys: pytest.CaptureFixture[str]) -> None:
+    src = """
+    fn make(n) { fn add(x) { return x + n; } return add; }
+    class A { init(v) { this.v = v; } get() { return this.v; } }
+    class B < A { get() { return super.get() * 2; } }
+    print(make(1)(2)); print(B(5).get());
+    """
+    assert run(src) is True
+    eager = capsys.readouterr().out
+    assert run(src, lazy=True) is True
+    assert capsys.readouterr().out == eager == "3\n10\n"
+
+
+def test_body_resolves_against_scopes_at_declaration(
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    # x is declared after f, so f's x is the global, as in eager mode
+    src = "let x = 1; { fn f() { return x; } let x = 2; print(f()); }"
+    assert run(src, lazy=True) is True
+    assert capsys.readouterr().out == "1\n"
+
+
+def test_errors_in_uncalled_bodies_are_reported_before_running(
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    src = 'fn never() { print(1 2); let = ; } print("ran");'
+    assert run(src, lazy=True) is False
+    captured = capsys.readouterr()
+    assert captured.out == ""
+    assert run(src) is False
+    assert capsys.readouterr().err == captured.err
+    assert "expected ')' after print argument" in captured.err
+    assert "expected variable name" in captured.err
+
+
+def test_recognizer_reports_what_the_parser_does() -> None:
+    src = """
+    class A < { m( {} }
+    fn f(a, b) { (a) = 1; a.b = c = 2; this = 3; for (;;) { if (a) print(a) else b; } }
+    fn g() { return super.x + -!f(1,)(); while (1) { fn h() { x. } } }
+    """
+    eager = Parser(_parse(src).tokens)
+    eager.parse()
+    lazy = _parse(src)
+    lazy.parse()
+    assert eager.errors and [str(e) for e in lazy.errors] == [str(e) for e in eager.errors]
+
+
+# the closure, vm and py engines compile every body before running, so only
+# the tree-walkers defer resolve errors all the way to the first call
+
+
+def test_resolve_error_in_called_body_is_reported_when_called(
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    src = 'fn g() { let a = 1; let a = 2; }\nprint("before");\ng();'
+    assert run(src, Interpreter(), lazy=True) is False
+    captured = capsys.readouterr()
+    assert captured.out == "before\n"
+    assert "already declared in this scope" in captured.err
+
+
+def test_resolve_error_in_called_body_is_reported(capsys: pytest.CaptureFixture[str]) -> None:
+    assert run("fn g() { let a = 1; let a = 2; } g();", lazy=True) is False
+    assert "already declared in this scope" in capsys.readouterr().err
+
+
+def test_unbalanced_braces_are_reported_eagerly(capsys: pytest.CaptureFixture[str]) -> None:
+    assert run('print("never"); fn g() { {', lazy=True) is False
+    captured = capsys.readouterr()
+    assert captured.out == ""
+    assert "expected '}' after block" in captured.err
+
+
+def test_prompt_honours_lazy(
+    capsys: pytest.CaptureFixture[str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    lines = iter(["fn g() { let a = 1; let a = 2; }", 'print("defined");', "g();"])
+
+    def read(prompt: str) -> str:
+        for line in lines:
+            return line
+        raise EOFError
+
+    monkeypatch.setattr("builtins.input", read)
+    run_prompt("tree", lazy=True)
+    captured = capsys.readouterr()
+    # g is defined, and its resolve error waits for the call
+    assert "defined\n" in captured.out
+    assert "already declared in this scope" in captured.err
+    assert "undefined variable" not in captured.err
@@ -0,0 +1,61 @@
+"""Quickening tests: nodes specialize on observed types and revert on a miss."""
+
+from __future__ import annotations
+
+import pytest
+
+from rift import ast_nodes as ast
+from rift.__main__ import run
+from rift.interpreter import Interpreter
+from rift.parser import Parser
+from rift.quicken import FloatBinaryExpr, FunctionCallExpr
+from rift.resolver import Resolver
+from rift.scanner import Scanner
+
+
+def _program(source: str) -> tuple[Interpreter, list[ast.Stmt]]:
+    s = Scanner(source)
+    s.scan_tokens()
+    statements = Parser(s.tokens).parse()
+    interpreter = Interpreter(jit=False, tiering=False, tco=False, fusion=False)
+    Resolver(interpreter).resolve(statements)
+    return interpreter, statements
+
+
+def _returned(fn: ast.Stmt) -> ast.Expr:
+    assert isinstance(fn, ast.FunctionStmt)
+    ret = fn.body[0]
+    assert isinstance(ret, ast.ReturnStmt) and ret.value is not None
+    return ret.value
+
+
+def test_binary_specializes_then_reverts(capsys: pytest.CaptureFixture[str]) -> None:
+    interpreter, statements = _program(
+        'fn add(a, b) { return a + b; } print(add(1, 2)); print(add("a", "b"));'
+    )
+    add_expr = _returned(statements[0])
+    interpreter.interpret(statements[:2])
+    assert type(add_expr) is FloatBinaryExpr
+    interpreter.interpret(statements[2:])
+    assert type(add_expr) is ast.BinaryExpr
+    assert capsys.readouterr().out == "3\nab\n"
+
+
+def test_call_site_guards_on_declaration(capsys: pytest.CaptureFixture[str]) -> None:
+    interpreter, statements = _program(
+        "fn one() { return 1; } fn two() { return 2; } fn call(f) { return f(); } print(call(one)); print(call(two));"
+    )
+    call_expr = _returned(statements[2])
+    interpreter.interpret(statements[:4])
+    assert type(call_expr) is FunctionCallExpr
+    interpreter.interpret(statements[4:])
+    assert type(call_expr) is ast.CallExpr
+    assert capsys.readouterr().out == "1\n2\n"
+
+
+def test_quickened_division_still_reports_zero(capsys: pytest.CaptureFixture[str]) -> None:
+    src = "fn div(a, b) { return a / b; }\nprint(div(1, 2));\nprint(div(1, 0));"
+    assert run(src, Interpreter(jit=False, tiering=False)) is False
+    captured = capsys.readouterr()
+    assert captured.out == "0.5\n"
+    assert "[line 1] Runtime error: division by zero" in captured.err
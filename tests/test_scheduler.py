@@ -0,0 +1,71 @@
+"""Cooperative scheduling of scripts on an asyncio event loop (rift.scheduler)."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable
+
+from rift.scheduler import Scheduler, ScriptResult
+
+LOOP = "let i = 0; while (i < {n}) {{ i = i + 1; }} print(i);"
+FIB = "fn fib(n) { if (n < 2) return n; return fib(n - 1) + fib(n - 2); } print(fib(12));"
+
+
+def _run_all(*runs: Awaitable[ScriptResult]) -> list[ScriptResult]:
+    async def main() -> list[ScriptResult]:
+        return list(await asyncio.gather(*runs))
+
+    return asyncio.run(main())
+
+
+def test_scripts_run_to_completion_with_their_own_output() -> None:
+    scheduler = Scheduler(slice=50)
+    loop, fib = _run_all(scheduler.run(LOOP.format(n=1000)), scheduler.run(FIB))
+    assert loop.ok and loop.output == "1000\n" and loop.errors == []
+    assert fib.ok and fib.output == "144\n"
+    # one pause per 50 back-edges, plus the final slice
+    assert loop.slices == 1000 // 50 + 1
+    assert loop.cpu_time > 0
+
+
+def test_scripts_interleave_with_each_other_and_other_tasks() -> None:
+    ticks: list[str] = []
+
+    async def ticker() -> None:
+        while len(ticks) < 5:
+            ticks.append("tick")
+            await asyncio.sleep(0)
+
+    async def main() -> tuple[ScriptResult, ...]:
+        scheduler = Scheduler(slice=10)
+        first = asyncio.ensure_future(scheduler.run(LOOP.format(n=200)))
+        second = asyncio.ensure_future(scheduler.run(LOOP.format(n=200)))
+        await ticker()
+        # the ticker finished while both scripts were still mid-loop
+        assert not first.done() and not second.done()
+        return await first, await second
+
+    first, second = asyncio.run(main())
+    assert first.ok and second.ok and first.output == second.output == "200\n"
+
+
+def test_deadline_stops_an_endless_script() -> None:
+    (result,) = _run_all(Scheduler().run("let n = 0;\nwhile (true) n = n + 1;", deadline=0.05))
+    assert not result.ok and result.timed_out
+    assert result.errors == ["deadline of 0.05s exceeded"]
+    assert result.slices > 1
+
+
+def test_errors_are_reported_per_script() -> None:
+    scheduler = Scheduler()
+    parse, runtime, fuel = _run_all(
+        scheduler.run("print(1 +);"),
+        scheduler.run('print("before");\nprint(-"x");'),
+        scheduler.run("while (true) {}", fuel=100),
+    )
+    assert parse.errors == ["[line 1] Parse error at ')': expected expression"]
+    assert parse.slices == 0
+    assert runtime.output == "before\n"
+    assert runtime.errors == ["[line 2] Runtime error: operand must be a number"]
+    assert fuel.errors == ["[line 1] Runtime error: out of fuel"]
+    assert not (parse.ok or runtime.ok or fuel.ok)
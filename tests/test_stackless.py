@@ -0,0 +1,54 @@
+"""Stackless engine tests: Rift recursion without Python recursion."""
+
+from __future__ import annotations
+
+import sys
+
+import pytest
+
+from rift.__main__ import create_interpreter, run
+from rift.parser import Parser
+from rift.resolver import Resolver
+from rift.scanner import Scanner
+from rift.stackless import StacklessInterpreter
+
+
+def test_recursion_deeper_than_python_limit(capsys: pytest.CaptureFixture[str]) -> None:
+    depth = sys.getrecursionlimit() * 5
+    src = f"fn count(n) {{ if (n == 0) return 0; return 1 + count(n - 1); }} print(count({depth}));"
+    assert run(src, StacklessInterpreter(max_depth=depth + 1)) is True
+    assert capsys.readouterr().out == f"{depth}\n"
+
+
+def test_max_depth_reports_stack_overflow(capsys: pytest.CaptureFixture[str]) -> None:
+    src = "fn f(n) {\n  return f(n + 1);\n}\nf(0);"
+    assert run(src, StacklessInterpreter(max_depth=50)) is False
+    assert "[line 2] Runtime error: stack overflow" in capsys.readouterr().err
+
+
+def test_initializers_and_returns_inside_loops(capsys: pytest.CaptureFixture[str]) -> None:
+    src = """
+    class Node { init(v, next) { this.v = v; this.next = next; } }
+    fn build(n) { if (n == 0) return nil; return Node(n, build(n - 1)); }
+    fn find(list, v) { while (list != nil) { if (list.v == v) return list; list = list.next; } return nil; }
+    print(find(build(3000), 7).v);
+    """
+    assert run(src, StacklessInterpreter()) is True
+    assert capsys.readouterr().out == "7\n"
+
+
+def test_create_interpreter_applies_max_depth() -> None:
+    interpreter = create_interpreter("stackless", 123)
+    assert isinstance(interpreter, StacklessInterpreter)
+    assert interpreter.max_depth == 123
+
+
+def test_reused_interpreter_pauses_every_new_loop() -> None:
+    # earlier runs' nodes are collected, so new ones may reuse their ids
+    interpreter = StacklessInterpreter()
+    for k in range(200):
+        src = f"let i{k} = 0; while (i{k} < 30) i{k} = i{k} + 1; print(1 + 2);"
+        statements = Parser(Scanner(src).scan_tokens()).parse()
+        Resolver(interpreter).resolve(statements)
+        pauses = sum(1 for _ in interpreter.run_sliced(statements, 10))
+        assert pauses == 3, k
@@ -0,0 +1,57 @@
+"""Proper tail call tests (tree and closure engines)."""
+
+from __future__ import annotations
+
+import sys
+
+import pytest
+
+from rift.__main__ import create_interpreter, run
+from rift.closure_compiler import ClosureInterpreter
+from rift.interpreter import Interpreter
+
+DEPTH = sys.getrecursionlimit() * 10
+
+
+@pytest.mark.parametrize("engine", [Interpreter, ClosureInterpreter])
+def test_self_recursion_runs_in_constant_stack(
+    engine: type[Interpreter], capsys: pytest.CaptureFixture[str]
+) -> None:
+    src = f"fn sum(n, acc) {{ if (n == 0) return acc; return sum(n - 1, acc + n); }} print(sum({DEPTH}, 0));"
+    assert run(src, engine()) is True
+    assert capsys.readouterr().out == f"{DEPTH * (DEPTH + 1) // 2}\n"
+
+
+@pytest.mark.parametrize("engine", [Interpreter, ClosureInterpreter])
+def test_mutual_recursion_and_methods(
+    engine: type[Interpreter], capsys: pytest.CaptureFixture[str]
+) -> None:
+    src = f"""
+    fn even(n) {{ if (n == 0) return true; return odd(n - 1); }}
+    fn odd(n) {{ if (n == 0) return false; return even(n - 1); }}
+    class Counter {{
+      init() {{ this.n = 0; }}
+      run(k) {{ if (k == 0) return this.n; this.n = this.n + 1; return this.run(k - 1); }}
+    }}
+    print(even({DEPTH + 1}));
+    print(Counter().run({DEPTH}));
+    """
+    assert run(src, engine()) is True
+    assert capsys.readouterr().out.split() == ["false", str(DEPTH)]
+
+
+def test_tail_position_errors_and_non_functions(capsys: pytest.CaptureFixture[str]) -> None:
+    src = 'class P { init(x) { this.x = x; } }\nfn make() { return P(1); }\nfn size() { return len("abc"); }\nprint(make().x);\nprint(size());\nfn bad() {\n  return size(1);\n}\nbad();'
+    assert run(src) is False
+    captured = capsys.readouterr()
+    assert captured.out == "1\n3\n"
+    assert "[line 7] Runtime error: expected 0 arguments but got 1" in captured.err
+
+
+def test_no_tco_nests_calls() -> None:
+    interpreter = create_interpreter("tree", tco=False)
+    src = (
+        f"fn sum(n, acc) {{ if (n == 0) return acc; return sum(n - 1, acc + n); }} sum({DEPTH}, 0);"
+    )
+    with pytest.raises(RecursionError):
+        run(src, interpreter)
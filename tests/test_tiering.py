@@ -0,0 +1,79 @@
+"""Tiered execution tests: hot functions compile, broken assumptions deopt."""
+
+from __future__ import annotations
+
+import pytest
+
+from rift.__main__ import run
+from rift.callable import RiftFunction
+from rift.interpreter import Interpreter
+from rift.tiering import HOT_FUNCTION
+
+
+def test_hot_function_tiers_up() -> None:
+    interpreter = Interpreter()
+    src = f"fn sq(x) {{ return x * x; }} let i = 0; while (i < {HOT_FUNCTION}) i = i + sq(1);"
+    assert run(src, interpreter) is True
+    sq = interpreter.globals.cells["sq"].value
+    assert isinstance(sq, RiftFunction)
+    assert sq.profile.tier is not None and sq.profile.tier.valid
+
+
+def test_bound_methods_share_the_counter() -> None:
+    interpreter = Interpreter()
+    src = f"class C {{ m() {{ return 1; }} }} let c = C(); let i = 0; while (i < {HOT_FUNCTION}) i = i + c.m();"
+    assert run(src, interpreter) is True
+    method = interpreter.globals.cells["C"].value.find_method("m")  # type: ignore[attr-defined]
+    assert method.profile.tier is not None
+
+
+def test_global_reassignment_deopts(capsys: pytest.CaptureFixture[str]) -> None:
+    interpreter = Interpreter()
+    src = f"""
+    fn g() {{ return 1; }}
+    fn f() {{ return g(); }}
+    let i = 0;
+    while (i < {HOT_FUNCTION}) i = i + f();
+    fn g() {{ return 2; }}
+    print(f());
+    """
+    assert run(src, interpreter) is True
+    assert capsys.readouterr().out == "2\n"
+    f = interpreter.globals.cells["f"].value
+    assert isinstance(f, RiftFunction) and f.profile.tier is None
+
+
+def test_deopt_inside_running_body(capsys: pytest.CaptureFixture[str]) -> None:
+    src = f"""
+    let calls = 0;
+    fn g() {{ calls = calls + 1; return 1; }}
+    fn h() {{ return 2; }}
+    fn f(swap) {{ let a = g(); if (swap) g = h; return a + g(); }}
+    let i = 0;
+    while (i < {HOT_FUNCTION}) {{ f(false); i = i + 1; }}
+    print(f(true));
+    """
+    assert run(src) is True
+    assert capsys.readouterr().out == "3\n"
+
+
+def test_class_redefinition_deopts(capsys: pytest.CaptureFixture[str]) -> None:
+    src = f"""
+    class P {{ v() {{ return "old"; }} }}
+    fn make() {{ return P(); }}
+    let i = 0;
+    while (i < {HOT_FUNCTION}) {{ make(); i = i + 1; }}
+    class P {{ v() {{ return "new"; }} }}
+    print(make().v());
+    """
+    assert run(src) is True
+    assert capsys.readouterr().out == "new\n"
+
+
+def test_functions_of_later_runs_compile_afresh(capsys: pytest.CaptureFixture[str]) -> None:
+    # earlier runs' declarations are collected, so new ones may reuse their ids
+    interpreter = Interpreter(jit=False)
+    for k in range(300):
+        src = f"fn f(x) {{ return x + {k}; }} let s = 0; for (let i = 0; i < 120; i = i + 1) s = f(0);"
+        assert run(src + " print(s);", interpreter) is True
+    assert capsys.readouterr().out.split() == [str(k) for k in range(300)]
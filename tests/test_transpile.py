@@ -0,0 +1,94 @@
+"""Rift-to-Python transpiler tests."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from rift.__main__ import run
+from rift.parser import Parser
+from rift.scanner import Scanner
+from rift.transpile import main, transpile
+
+
+def _transpile(source: str) -> str:
+    s = Scanner(source)
+    s.scan_tokens()
+    return transpile(Parser(s.tokens).parse()).source
+
+
+def test_names_are_mangled() -> None:
+    py = _transpile("let def = 1; fn f(class_) { let x = class_; return x; }")
+    assert "def_g = 1.0" in py
+    assert "def f_g(class__1):" in py
+
+
+def test_assigned_capture_is_nonlocal() -> None:
+    py = _transpile("fn mk() { let c = 0; fn inc() { c = c + 1; } return inc; }")
+    assert "nonlocal c_1" in py
+
+
+def test_closures_capture_per_iteration(capsys: pytest.CaptureFixture[str]) -> None:
+    src = """
+    let fns = nil;
+    let other = nil;
+    for (let i = 0; i < 2; i = i + 1) {
+      let j = i;
+      fn get() { j = j + 10; return j; }
+      if (fns == nil) fns = get; else other = get;
+    }
+    print(fns());
+    print(fns());
+    print(other());
+    """
+    assert run(src, engine="py") is True
+    assert capsys.readouterr().out.split() == ["10", "20", "11"]
+
+
+def test_classes_and_printing(capsys: pytest.CaptureFixture[str]) -> None:
+    src = """
+    class A { init(x) { this.x = x; } name() { return "A" + this.x; } }
+    class B < A { name() { return "B" + super.name(); } }
+    let b = B("!");
+    print(b.name());
+    print(type(b));
+    print(B);
+    print(b);
+    print(b.name);
+    """
+    assert run(src, engine="py") is True
+    assert capsys.readouterr().out.splitlines() == [
+        "BA!",
+        "B",
+        "<class B>",
+        "<B instance>",
+        "<fn name>",
+    ]
+
+
+@pytest.mark.parametrize(
+    ("src", "message"),
+    [
+        ("let a = 1;\nprint(missing);", "[line 2] Runtime error: undefined variable 'missing'"),
+        (
+            "class A { m() { return this.y; } }\n\nA().m();",
+            "[line 1] Runtime error: undefined property 'y'",
+        ),
+        ('let a = 1;\nprint(a - "x");', "[line 2] Runtime error: operands must be numbers"),
+    ],
+)
+def test_runtime_errors_keep_rift_lines(
+    src: str, message: str, capsys: pytest.CaptureFixture[str]
+) -> None:
+    assert run(src, engine="py") is False
+    assert message in capsys.readouterr().err
+
+
+def test_cli_writes_runnable_module(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    script = tmp_path / "hello.rf"
+    script.write_text('fn greet(n) { return "hi " + n; }\nprint(greet("rift"));\n')
+    out = tmp_path / "hello.py"
+    assert main([str(script), "-o", str(out)]) == 0
+    exec(compile(out.read_text(), str(out), "exec"), {"__name__": "__main__"})  # noqa: S102
+    assert capsys.readouterr().out == "hi rift\n"
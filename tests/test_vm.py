@@ -0,0 +1,75 @@
+"""Bytecode compiler and VM tests."""
+
+from __future__ import annotations
+
+import pytest
+
+from rift.__main__ import run
+from rift.compiler import Compiler, disassemble
+from rift.parser import Parser
+from rift.scanner import Scanner
+
+
+def _compile(source: str) -> str:
+    s = Scanner(source)
+    s.scan_tokens()
+    return disassemble(Compiler().compile(Parser(s.tokens).parse()))
+
+
+def test_locals_use_stack_slots() -> None:
+    listing = _compile("fn f(a) { let b = a; return b; }")
+    assert "GET_LOCAL 1" in listing
+    assert "GET_GLOBAL" not in listing.split("== f ==")[1]
+
+
+def test_method_call_compiles_to_invoke() -> None:
+    listing = _compile("class A { m() {} } A().m();")
+    assert "INVOKE 'm' 0" in listing
+
+
+def test_closures_capture_per_iteration(capsys: pytest.CaptureFixture[str]) -> None:
+    src = """
+    let first = nil;
+    let second = nil;
+    for (let i = 0; i < 2; i = i + 1) {
+      let j = i;
+      fn get() { return j; }
+      if (first == nil) first = get; else second = get;
+    }
+    print(first());
+    print(second());
+    """
+    assert run(src, engine="vm") is True
+    assert capsys.readouterr().out.split() == ["0", "1"]
+
+
+def test_super_invoke(capsys: pytest.CaptureFixture[str]) -> None:
+    src = """
+    class A { init(x) { this.x = x; } name() { return "A" + this.x; } }
+    class B < A { name() { return "B" + super.name(); } }
+    let b = B("!");
+    let m = b.name;
+    print(m());
+    print(type(b));
+    """
+    assert run(src, engine="vm") is True
+    assert capsys.readouterr().out.split() == ["BA!", "B"]
+
+
+def test_runtime_error_reports_line(capsys: pytest.CaptureFixture[str]) -> None:
+    assert run('let a = 1;\nprint(a - "x");', engine="vm") is False
+    assert "[line 2] Runtime error: operands must be numbers" in capsys.readouterr().err
+
+
+def test_arity_mismatch(capsys: pytest.CaptureFixture[str]) -> None:
+    assert run("class P { init(a) {} } P();", engine="vm") is False
+    assert "expected 1 arguments but got 0" in capsys.readouterr().err
+
+
+def test_deep_recursion_does_not_use_python_stack(capsys: pytest.CaptureFixture[str]) -> None:
+    src = """
+    fn count(n) { if (n == 0) return 0; return 1 + count(n - 1); }
+    print(count(3000));
+    """
+    assert run(src, engine="vm") is True
+    assert capsys.readouterr().out.strip() == "3000"